@@ -2,42 +2,151 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import shutil
+import ssl
+import subprocess
 import tarfile
-import tempfile
 import threading
 import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from pathlib import Path
 from typing import Dict, Iterable
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config as BotoConfig
 
 from .logging import get_logger
 
+try:
+    import blake3  # type: ignore
+except Exception:  # pragma: no cover
+    blake3 = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 log = get_logger("core")
 
+# Digest is only a local change-detection token, so prefer the fastest algorithm
+HASH_ALGO = "blake3" if blake3 is not None else "sha256"
+_HEAD_BYTES = 4096
+_MULTIPART_BYTES = 25 * 1024 * 1024
+# Verify-only hashes of files below this size are grouped into one worker task
+_SMALL_FILE_BYTES = 1024 * 1024
+_HASH_BATCH = 16
+# Concurrent PUTs keep the link busy when most files are small
+UPLOAD_WORKERS = 16
+# Multipart kicks in above 25 MiB and parts go up over parallel streams
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=_MULTIPART_BYTES,
+    multipart_chunksize=_MULTIPART_BYTES,
+    max_concurrency=20,
+    use_threads=True,
+)
+# CPython exposes OpenSSL-backed constructors as openssl_<name>; OpenSSL picks
+# the SHA-NI code path at runtime when the CPU supports it.
+SHA256_OPENSSL = getattr(hashlib.sha256, "__name__", "").startswith("openssl_")
 
-def _client():
-    return boto3.client(
-        "s3", config=BotoConfig(retries={"max_attempts": 5, "mode": "standard"})
+if HASH_ALGO == "sha256" and not SHA256_OPENSSL:
+    log.warning(
+        "hash_backend_slow",
+        extra={
+            "algo": HASH_ALGO,
+            "hint": "install blake3 or an OpenSSL-linked CPython",
+        },
+    )
+else:
+    log.info(
+        "hash_backend",
+        extra={
+            "algo": HASH_ALGO,
+            "sha256_openssl": SHA256_OPENSSL,
+            "openssl_version": ssl.OPENSSL_VERSION,
+        },
     )
 
 
+def _dumps(obj: Dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _loads(line: str) -> Dict:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+_S3_CLIENT = None
+_S3_CLIENT_LOCK = threading.Lock()
+
+
+def _client():
+    """Return the process-wide S3 client (boto3 clients are thread-safe).
+
+    Reusing it across PeriodicRunner iterations keeps pooled TLS connections,
+    endpoint resolution and credentials warm between runs.
+    """
+    global _S3_CLIENT
+    if _S3_CLIENT is None:
+        with _S3_CLIENT_LOCK:
+            if _S3_CLIENT is None:
+                _S3_CLIENT = boto3.client(
+                    "s3",
+                    config=BotoConfig(
+                        retries={"max_attempts": 5, "mode": "standard"},
+                        # Headroom for upload workers plus multipart part threads
+                        max_pool_connections=32,
+                    ),
+                )
+    return _S3_CLIENT
+
+
 def _iter_files(dirs: Iterable[Path]):
-    """Yield (root_dir, file_path) pairs for all files under provided roots.
+    """Yield (root_dir, file_path, stat) for all files under provided roots.
 
     root_dir is always one of the include_dirs entries (resolved). The file_path
-    may equal root_dir when the include directory itself is a single file.
+    may equal str(root_dir) when the include directory itself is a single file.
+    Walks with os.scandir so entry types come from the directory listing and
+    each file is stat'ed exactly once. Symlinked files are backed up with
+    their target's content; symlinked directories (and dangling links) are
+    not followed and are logged as symlink_skipped.
     """
     for root in dirs:
         if not root.exists():
             continue
         if root.is_file():
-            yield root, root
-        else:
-            for p in root.rglob("*"):
-                if p.is_file():
-                    yield root, p
+            yield root, str(root), root.stat()
+            continue
+        stack = [str(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_symlink():
+                            try:
+                                if entry.is_file():
+                                    yield root, entry.path, entry.stat()
+                                    continue
+                            except OSError:
+                                pass
+                            log.warning("symlink_skipped", extra={"path": entry.path})
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield root, entry.path, entry.stat(follow_symlinks=False)
+            except OSError as e:
+                log.warning("dir_scan_failed", extra={"error": str(e)})
 
 
 def _rel(base: Path, p: Path) -> str:
@@ -47,26 +156,292 @@ def _rel(base: Path, p: Path) -> str:
         return p.name
 
 
-def _hash_file(p: Path) -> str:
-    h = hashlib.sha256()
-    with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+def _hash_file(p: str | Path) -> str:
+    """Return the HASH_ALGO hex digest of a file.
+
+    Reads through the file object rather than mmap: a live file truncated
+    while mapped raises SIGBUS, which would kill the daemon.
+    """
+    with open(p, "rb") as f:
+        if blake3 is None and hasattr(hashlib, "file_digest"):
+            # 3.11+: hashing loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = blake3.blake3() if blake3 is not None else hashlib.sha256()
+        buf = bytearray(1024 * 1024)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            h.update(view[:n])
     return h.hexdigest()
 
 
-def load_manifest(path: Path) -> Dict[str, Dict]:
+def _head_digest(p: str | Path) -> str:
+    """Cheap fingerprint of a file's first 4 KiB, checked before a full hash."""
+    with open(p, "rb") as f:
+        return hashlib.blake2b(f.read(_HEAD_BYTES), digest_size=8).hexdigest()
+
+
+def _s3_etag(p: str | Path, size: int) -> str:
+    """Return the ETag S3 assigns when this file is uploaded with _TRANSFER_CONFIG.
+
+    Single-part objects use the MD5 of the body; multipart objects use the MD5
+    of the concatenated part MD5s suffixed with the part count.
+    """
+    with open(p, "rb") as f:
+        if size < _MULTIPART_BYTES:
+            return hashlib.md5(f.read(), usedforsecurity=False).hexdigest()
+        parts = [
+            hashlib.md5(chunk, usedforsecurity=False).digest()
+            for chunk in iter(lambda: f.read(_MULTIPART_BYTES), b"")
+        ]
+    combined = hashlib.md5(b"".join(parts), usedforsecurity=False).hexdigest()
+    return f"{combined}-{len(parts)}"
+
+
+def _list_remote(s3, bucket: str, prefix: str) -> Dict[str, tuple[int, str]]:
+    """Map existing object keys under prefix to (size, etag)."""
+    remote: Dict[str, tuple[int, str]] = {}
+    try:
+        for page in s3.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=prefix
+        ):
+            for obj in page.get("Contents", []):
+                remote[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+        log.info("remote_listed", extra={"objects": len(remote), "prefix": prefix})
+    except Exception as e:  # noqa: BLE001
+        log.warning("remote_list_failed", extra={"error": str(e)})
+    return remote
+
+
+def _stored_digest(entry: Dict) -> str | None:
+    """Return a manifest entry's digest if it was made with HASH_ALGO."""
+    if entry.get("algo") == HASH_ALGO:
+        return entry.get("digest")
+    if HASH_ALGO == "sha256":
+        return entry.get("sha256")  # legacy manifests
+    return None
+
+
+def _upload_file(s3, p: str, bucket: str, key: str, size: int) -> bool:
+    try:
+        s3.upload_file(p, bucket, key, Config=_TRANSFER_CONFIG)
+        log.info("file_uploaded", extra={"key": key, "size": size})
+        return True
+    except Exception as e:  # noqa: BLE001
+        log.error("file_upload_failed", extra={"path": p, "error": str(e)})
+        return False
+
+
+ARCHIVE_COMPRESSIONS = ("gzip", "none", "pigz")
+
+
+def _check_compression(compression: str) -> None:
+    # Unknown values would otherwise fall through to gzip unnoticed
+    if compression not in ARCHIVE_COMPRESSIONS:
+        raise ValueError(
+            f"archive_compression must be one of {ARCHIVE_COMPRESSIONS}, "
+            f"got {compression!r}"
+        )
+
+
+class _ArchiveStream:
+    """Read end of a pipe fed by a background tar writer.
+
+    upload_fileobj treats it as a non-seekable stream and sends it as multipart
+    parts, so the archive never touches local disk. compression is "gzip"
+    (stdlib, single core), "none" (for payloads that are already compressed)
+    or "pigz" (parallel gzip across all cores).
+    """
+
+    def __init__(self, dirs: Iterable[Path], compression: str = "gzip"):
+        self.compression = compression
+        r_fd, w_fd = os.pipe()
+        self._reader = os.fdopen(r_fd, "rb")
+        self.size = 0
+        self.files = 0
+        self.error: BaseException | None = None
+        self._writer = threading.Thread(
+            target=self._write, args=(list(dirs), w_fd), name="archive", daemon=True
+        )
+        self._writer.start()
+
+    def _write(self, dirs: list[Path], w_fd: int) -> None:
+        w = os.fdopen(w_fd, "wb")
+        pigz: subprocess.Popen | None = None
+        try:
+            out, mode = w, "w|gz" if self.compression == "gzip" else "w|"
+            if self.compression == "pigz":
+                pigz = subprocess.Popen(
+                    ["pigz", "-p", str(os.cpu_count() or 1)],
+                    stdin=subprocess.PIPE,
+                    stdout=w,
+                )
+                out = pigz.stdin
+            with tarfile.open(fileobj=out, mode=mode) as tar:
+                for d in dirs:
+                    if d.exists():
+                        tar.add(str(d), arcname=d.name, filter=self._count)
+            if pigz is not None:
+                pigz.stdin.close()
+                if pigz.wait() != 0:
+                    raise RuntimeError(f"pigz exited with {pigz.returncode}")
+        except BaseException as e:  # noqa: BLE001
+            # Recorded before closing the pipe so the reader never mistakes a
+            # failed archive for a complete one.
+            self.error = e
+        finally:
+            if pigz is not None and pigz.poll() is None:
+                pigz.kill()
+                pigz.wait()
+            try:
+                w.close()
+            except OSError:
+                pass  # reader already closed
+
+    def _count(self, info: tarfile.TarInfo) -> tarfile.TarInfo:
+        if info.isfile():
+            self.files += 1
+        return info
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._reader.read(size)
+        if not data and self.error is not None:
+            raise self.error
+        self.size += len(data)
+        return data
+
+    def close(self) -> None:
+        self._reader.close()  # unblocks the writer if the upload failed early
+        self._writer.join()
+
+
+def _backup_file(
+    s3,
+    p: str,
+    bucket: str,
+    key: str,
+    entry: Dict,
+    old: Dict,
+    need_upload: bool,
+    verify: bool,
+    remote: tuple[int, str] | None = None,
+) -> bool:
+    """Hash (when verifying) and upload one file; return True if uploaded."""
+    if verify:
+        old_digest = _stored_digest(old)
+        entry["head"] = _head_digest(p)
+        if (
+            need_upload
+            and old_digest
+            and old.get("size") == entry["size"]
+            and old.get("head") not in (None, entry["head"])
+        ):
+            # Same size but different leading bytes: changed, skip the full hash.
+            # The next run re-establishes the digest baseline.
+            return _upload_file(s3, p, bucket, key, entry["size"])
+        entry["digest"] = _hash_file(p)
+        entry["algo"] = HASH_ALGO
+        if old_digest:
+            # Also clears need_upload for touch-only changes (new mtime, same bytes)
+            need_upload = old_digest != entry["digest"]
+    if not need_upload:
+        return False
+    if (
+        remote is not None
+        and remote[0] == entry["size"]
+        and remote[1] == _s3_etag(p, entry["size"])
+    ):
+        return False  # identical object already in the bucket
+    return _upload_file(s3, p, bucket, key, entry["size"])
+
+
+def _backup_batch(jobs: list[tuple]) -> int:
+    """Run several small _backup_file jobs in one task; return uploads made.
+
+    For tiny files the per-task dispatch (future, queue lock, thread wake-up)
+    costs about as much as the hash itself, so they are hashed back to back.
+    """
+    return sum(_backup_file(*job) for job in jobs)
+
+
+def _log_scan_empty(dirs: list[Path], bucket: str, prefix: str) -> None:
+    log.warning(
+        "scan_empty",
+        extra={"dirs": [str(d) for d in dirs], "bucket": bucket, "prefix": prefix},
+    )
+
+
+def _read_manifest(path: Path) -> tuple[Dict[str, Dict], int]:
+    """Replay the manifest log; return (entries, number of log lines).
+
+    The manifest is JSON lines: one {"k": rel, ...entry} record per change and
+    {"k": rel, "deleted": true} tombstones, last record wins. Legacy manifests
+    (a single JSON object) load with a line count of 0 so they get rewritten.
+    Unparseable lines are skipped but still counted, and a log that does not
+    end in a newline (a torn append) reports 0 lines, so the next save
+    compacts instead of appending onto the partial record.
+    """
     if not path.exists():
-        return {}
+        return {}, 0
+    try:
+        text = path.read_text()
+    except Exception:
+        return {}, 0
+    data: Dict[str, Dict] = {}
+    lines = records = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        lines += 1
+        try:
+            rec = _loads(line)
+            rel = rec.pop("k")
+        except Exception:
+            continue
+        records += 1
+        if rec.get("deleted"):
+            data.pop(rel, None)
+        else:
+            data[rel] = rec
+    if records:
+        return data, (lines if text.endswith("\n") else 0)
     try:
-        return json.loads(path.read_text())
+        legacy = json.loads(text)
     except Exception:
-        return {}
+        return {}, 0
+    return (legacy if isinstance(legacy, dict) else {}), 0
+
+
+def load_manifest(path: Path) -> Dict[str, Dict]:
+    return _read_manifest(path)[0]
+
 
+def save_manifest(
+    path: Path,
+    data: Dict[str, Dict],
+    previous: Dict[str, Dict] | None = None,
+    log_lines: int = 0,
+) -> None:
+    """Persist the manifest, appending only what changed since previous.
 
-def save_manifest(path: Path, data: Dict[str, Dict]) -> None:
+    The log is compacted (rewritten with one line per entry) when there is no
+    usable previous log or when it would grow past twice the live entry count.
+    """
+    if previous is not None and log_lines:
+        changes = [
+            _dumps({"k": rel, **entry})
+            for rel, entry in data.items()
+            if previous.get(rel) != entry
+        ]
+        changes += [
+            _dumps({"k": rel, "deleted": True}) for rel in previous.keys() - data
+        ]
+        if log_lines + len(changes) <= 2 * len(data):
+            if changes:
+                with path.open("a") as f:
+                    f.write("\n".join(changes) + "\n")
+            return
     tmp = path.with_suffix(".tmp")
-    tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+    tmp.write_text("".join(_dumps({"k": rel, **e}) + "\n" for rel, e in data.items()))
     tmp.replace(path)
 
 
@@ -77,8 +452,35 @@ def run_backup_once(
     manifest_path: str | None = None,
     incremental: bool = True,
     archive: bool = False,
+    verify_content: bool = False,
+    archive_compression: str = "gzip",
 ) -> int:
-    start = time.time()
+    """Upload include_dirs to S3 once; return the number of objects uploaded.
+
+    Incremental mode treats mtime+size as the change signal. With
+    verify_content=True a content digest is also recorded per file and files whose
+    stat is unchanged are re-hashed so silent content edits still upload.
+    archive_compression is one of ARCHIVE_COMPRESSIONS (ValueError otherwise).
+    """
+    _check_compression(archive_compression)
+    return _run(
+        _resolve_dirs(include_dirs),
+        bucket,
+        prefix,
+        manifest_path=manifest_path,
+        incremental=incremental,
+        archive=archive,
+        verify_content=verify_content,
+        archive_compression=archive_compression,
+    )
+
+
+def _resolve_dirs(include_dirs: Iterable[str]) -> list[Path]:
+    """Resolve include_dirs to existing, de-duplicated directories.
+
+    Missing absolute paths are mapped to local fallbacks (/app/data -> ./data)
+    before being created as a last resort.
+    """
     raw_dirs = [Path(d) for d in include_dirs]
 
     mapped: list[Path] = []
@@ -134,103 +536,133 @@ def run_backup_once(
         if mapped_path and mapped_path not in seen:
             seen.add(mapped_path)
             mapped.append(mapped_path)
-    dirs = mapped
+    return mapped
+
+
+def _run(
+    dirs: list[Path],
+    bucket: str,
+    prefix: str,
+    manifest_path: str | None = None,
+    incremental: bool = True,
+    archive: bool = False,
+    verify_content: bool = False,
+    archive_compression: str = "gzip",
+) -> int:
+    start = time.time()
     prefix = prefix.rstrip("/") + "/" if prefix else ""
     s3 = _client()
     manifest_file = Path(manifest_path) if manifest_path else None
-    manifest = (
-        load_manifest(manifest_file)
+    manifest, manifest_lines = (
+        _read_manifest(manifest_file)
         if (manifest_file and incremental and not archive)
+        else ({}, 0)
+    )
+    # Without a local manifest (first run or lost file) compare against the
+    # bucket instead, so unchanged objects are not uploaded again.
+    remote = (
+        _list_remote(s3, bucket, prefix)
+        if incremental and not archive and not manifest
         else {}
     )
 
-    # Pre-scan files for counting
-    all_files = list(_iter_files(dirs))
-    log.info(
-        "scan_summary",
-        extra={
-            "dirs": len(dirs),
-            "files_found": len(all_files),
-            "bucket": bucket,
-            "prefix": prefix,
-            "mode": "archive"
-            if archive
-            else ("incremental" if incremental else "full"),
-        },
-    )
-    if not all_files:
-        log.warning(
-            "scan_empty",
-            extra={
-                "dirs": [str(d) for d in dirs],
-                "bucket": bucket,
-                "prefix": prefix,
-            },
-        )
+    mode = "archive" if archive else ("incremental" if incremental else "full")
 
     if archive:
+        if archive_compression == "pigz" and shutil.which("pigz") is None:
+            log.warning("pigz_not_found", extra={"fallback": "gzip"})
+            archive_compression = "gzip"
         ts = time.strftime("%Y%m%d_%H%M%S")
-        archive_name = f"{prefix}snapshot_{ts}.tar.gz"
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp_path = Path(tmp.name)
-        with tarfile.open(tmp_path, "w:gz") as tar:
-            for d in dirs:
-                if d.exists():
-                    tar.add(str(d), arcname=d.name)
-        size = tmp_path.stat().st_size
-        s3.upload_file(str(tmp_path), bucket, archive_name)
-        tmp_path.unlink(missing_ok=True)
+        ext = ".tar" if archive_compression == "none" else ".tar.gz"
+        archive_name = f"{prefix}snapshot_{ts}{ext}"
+        stream = _ArchiveStream(dirs, archive_compression)
+        try:
+            s3.upload_fileobj(stream, bucket, archive_name, Config=_TRANSFER_CONFIG)
+        finally:
+            stream.close()
+        size = stream.size
+        if not stream.files:
+            _log_scan_empty(dirs, bucket, prefix)
         log.info(
             "backup_archive_uploaded",
             extra={
                 "key": archive_name,
                 "size": size,
                 "duration_ms": int((time.time() - start) * 1000),
-                "files_included": len(all_files),
+                "files_included": stream.files,
             },
         )
         return 1
 
+    files_found = 0
     uploaded = 0
+    cur_root = root_str = None
+    cut = 0
+    base = ""
     new_manifest: Dict[str, Dict] = {}
-    for root, p in all_files:
-        # Compute relative key fragment: <root_basename>/<relative_path_inside_root>
-        if p == root:
-            rel = root.name  # single file include
-        else:
-            try:
-                rel_inside = p.relative_to(root).as_posix()
-            except Exception:
-                rel_inside = p.name
-            rel = f"{root.name}/{rel_inside}" if rel_inside else root.name
-        stat = p.stat()
-        entry = {"mtime": int(stat.st_mtime), "size": stat.st_size}
-        need_upload = True
-        if incremental and rel in manifest:
-            old = manifest[rel]
+    pending: set[Future] = set()
+    small_batch: list[tuple] = []
+    with ThreadPoolExecutor(
+        max_workers=UPLOAD_WORKERS, thread_name_prefix="upload"
+    ) as pool:
+        for root, p, stat in _iter_files(dirs):
+            files_found += 1
+            # Compute relative key fragment: <root_basename>/<relative_path_inside_root>
+            # _iter_files builds paths by joining onto str(root), so slicing
+            # off that prefix is exact; per-root values are computed once.
+            if root is not cur_root:
+                cur_root, root_str = root, str(root)
+                cut = len(os.path.join(root_str, ""))
+                base = root.name + "/"
+            if p == root_str:
+                rel = root.name  # single file include
+            elif os.sep == "/":
+                rel = base + p[cut:]
+            else:
+                rel = base + p[cut:].replace(os.sep, "/")
+            entry = {"mtime": int(stat.st_mtime), "size": stat.st_size}
+            need_upload = True
+            old = manifest.get(rel, {}) if incremental else {}
             if old.get("mtime") == entry["mtime"] and old.get("size") == entry["size"]:
                 need_upload = False
-        if need_upload and incremental:
-            entry["sha256"] = _hash_file(p)
-        if need_upload:
-            key = f"{prefix}{rel}".replace("\\", "/")
-            try:
-                s3.upload_file(str(p), bucket, key)
-                uploaded += 1
-                log.info("file_uploaded", extra={"key": key, "size": stat.st_size})
-            except Exception as e:  # noqa: BLE001
-                log.error("file_upload_failed", extra={"path": str(p), "error": str(e)})
-        new_manifest[rel] = entry
+                # Carry digests forward so a later verify run keeps its baseline
+                for k in ("digest", "algo", "head", "sha256"):
+                    if k in old:
+                        entry[k] = old[k]
+            verify = verify_content and incremental
+            if need_upload or verify:
+                key = f"{prefix}{rel}".replace("\\", "/")
+                job = (s3, p, bucket, key, entry, old, need_upload, verify)
+                if need_upload or entry["size"] >= _SMALL_FILE_BYTES:
+                    pending.add(pool.submit(_backup_file, *job, remote.get(key)))
+                else:
+                    small_batch.append(job)
+                    if len(small_batch) >= _HASH_BATCH:
+                        pending.add(pool.submit(_backup_batch, small_batch))
+                        small_batch = []
+                # Bound in-flight work so memory stays flat on very large trees
+                if len(pending) >= UPLOAD_WORKERS * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    uploaded += sum(f.result() for f in done)
+            new_manifest[rel] = entry
+        if small_batch:
+            pending.add(pool.submit(_backup_batch, small_batch))
+        uploaded += sum(f.result() for f in as_completed(pending))
+
+    if not files_found:
+        _log_scan_empty(dirs, bucket, prefix)
 
     if manifest_file and incremental:
-        save_manifest(manifest_file, new_manifest)
+        save_manifest(manifest_file, new_manifest, manifest, manifest_lines)
 
     log.info(
         "backup_completed",
         extra={
             "uploaded": uploaded,
             "total_tracked": len(new_manifest),
-            "total_files_scanned": len(all_files),
+            "total_files_scanned": files_found,
+            "dirs": len(dirs),
+            "mode": mode,
             "duration_ms": int((time.time() - start) * 1000),
             "bucket": bucket,
             "prefix": prefix,
@@ -240,8 +672,20 @@ def run_backup_once(
 
 
 class PeriodicRunner:
-    def __init__(self, *args, interval: int, **kwargs):
-        self.args = args
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str,
+        include_dirs: Iterable[str],
+        *,
+        interval: int,
+        **kwargs,
+    ):
+        _check_compression(kwargs.get("archive_compression", "gzip"))
+        self.bucket = bucket
+        self.prefix = prefix
+        # Resolved once: mapping/creating the roots does not change between runs
+        self.dirs = _resolve_dirs(include_dirs)
         self.kwargs = kwargs
         self.interval = interval
         self._stop = threading.Event()
@@ -249,7 +693,7 @@ class PeriodicRunner:
     def start(self):  # pragma: no cover
         while not self._stop.is_set():
             try:
-                run_backup_once(*self.args, **self.kwargs)
+                _run(self.dirs, self.bucket, self.prefix, **self.kwargs)
             except Exception as e:  # noqa: BLE001
                 log.error("periodic_run_failed", extra={"error": str(e)})
             if self._stop.wait(self.interval):
@@ -12,7 +12,12 @@ try:
 except Exception:  # pragma: no cover
     yaml = None  # type: ignore
 
-from .backup_core import PeriodicRunner, run_backup_once
+from .backup_core import (
+    ARCHIVE_COMPRESSIONS,
+    PeriodicRunner,
+    _client,
+    run_backup_once,
+)
 from .env import load_env
 from .logging import get_logger
 
@@ -88,6 +93,17 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Create a tar.gz snapshot instead of per-file upload",
     )
+    p.add_argument(
+        "--archive-compression",
+        choices=ARCHIVE_COMPRESSIONS,
+        help="Archive compression (override YAML; default gzip). "
+        "'none' suits already-compressed data, 'pigz' uses all cores",
+    )
+    p.add_argument(
+        "--verify-content",
+        action="store_true",
+        help="Hash files (BLAKE3 or SHA-256) to catch content changes that keep mtime+size",
+    )
     p.add_argument(
         "--once", action="store_true", help="Single run then exit even if interval > 0"
     )
@@ -126,14 +142,24 @@ def main() -> int:
 
     # Mode flags
     incremental = not args.no_incremental and not args.archive
+    archive_compression = args.archive_compression or s3_cfg.get(
+        "archive_compression", "gzip"
+    )
+    if archive_compression not in ARCHIVE_COMPRESSIONS:
+        log.error(
+            "invalid_archive_compression",
+            extra={
+                "value": archive_compression,
+                "allowed": list(ARCHIVE_COMPRESSIONS),
+            },
+        )
+        return 2
 
     # Early S3 connectivity / permission check
     if bucket:
         try:
-            import boto3  # local import to avoid unused at parse time
-
-            s3_client = boto3.client("s3")
-            s3_client.head_bucket(Bucket=bucket)
+            # Shared client: the connection opened here is reused by the first run
+            _client().head_bucket(Bucket=bucket)
             log.info("s3_bucket_check", extra={"bucket": bucket, "status": "ok"})
         except Exception as e:  # noqa: BLE001
             log.error(
@@ -148,6 +174,8 @@ def main() -> int:
         manifest_path=args.manifest,
         incremental=incremental,
         archive=args.archive,
+        verify_content=args.verify_content,
+        archive_compression=archive_compression,
     )
 
     if args.once or interval <= 0:
@@ -160,6 +188,8 @@ def main() -> int:
         manifest_path=args.manifest,
         incremental=incremental,
         archive=args.archive,
+        verify_content=args.verify_content,
+        archive_compression=archive_compression,
         interval=interval,
     )
     try:
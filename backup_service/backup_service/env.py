@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import json
 import os
+import re
 from typing import Iterable
 
 from .logging import configure_logging, get_logger
 
 log = get_logger("env")
 
+# KEY=value lines for the fallback .env parser; comments and blank lines never
+# match. Groups: key, optional matching quote, value.
+_DOTENV_LINE = re.compile(
+    r"^[ \t]*([A-Za-z_][A-Za-z0-9_.]*)[ \t]*=[ \t]*([\"']?)([^\r\n]*?)\2[ \t]*\r?$",
+    re.M,
+)
+
 
 def _set_missing(k: str, v: str | None) -> None:
     if v and k not in os.environ:
@@ -32,15 +40,10 @@ def load_env(
             if os.path.exists(env_path):
                 try:
                     with open(env_path) as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line or line.startswith("#") or "=" not in line:
-                                continue
-                            k, v = line.split("=", 1)
-                            k = k.strip()
-                            v = v.strip().strip('"').strip("'")
-                            if k and k not in os.environ:
-                                os.environ[k] = v
+                        parsed = {m[1]: m[3] for m in _DOTENV_LINE.finditer(f.read())}
+                    os.environ.update(
+                        {k: v for k, v in parsed.items() if k not in os.environ}
+                    )
                     log.info("dotenv_fallback_loaded", extra={"path": env_path})
                 except Exception as e:  # noqa: BLE001
                     log.warning("dotenv_fallback_failed", extra={"error": str(e)})
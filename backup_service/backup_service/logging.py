@@ -4,47 +4,45 @@ import json
 import logging
 import os
 import sys
-from datetime import datetime, timezone
+import time
+from functools import lru_cache
 from typing import Any, Dict
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 _configured = False
 
+# Attributes every LogRecord carries; anything else came in via `extra=`
+_STD_ATTRS = frozenset(vars(logging.makeLogRecord({})))
+
+
+@lru_cache(maxsize=4)
+def _utc_second(second: int) -> str:
+    # Records arrive in bursts within the same second; format each second once
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"))
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:  # noqa: D401
         data: Dict[str, Any] = {
-            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "ts": f"{_utc_second(int(record.created))}.{int(record.msecs):03d}Z",
             "level": record.levelname.lower(),
             "logger": record.name,
             "event": record.getMessage(),
         }
         if record.exc_info:
             data["exc_info"] = self.formatException(record.exc_info)
-        for k, v in record.__dict__.items():
-            if k not in {
-                "name",
-                "msg",
-                "args",
-                "levelname",
-                "levelno",
-                "pathname",
-                "filename",
-                "module",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-                "lineno",
-                "funcName",
-                "created",
-                "msecs",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "processName",
-                "process",
-            }:
-                data[k] = v
-        return json.dumps(data, separators=(",", ":"))
+        data.update((k, v) for k, v in record.__dict__.items() if k not in _STD_ATTRS)
+        return _dumps(data)
 
 
 def configure_logging(refresh: bool = False) -> None:
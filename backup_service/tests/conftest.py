@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Make the backup_service package importable when running tests without installation
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
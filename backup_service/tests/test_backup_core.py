@@ -0,0 +1,157 @@
+import hashlib
+import io
+import json
+import logging
+import tarfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+from backup_service import backup_core  # noqa: E402
+
+
+def _entry(size: int, mtime: float = 1.0) -> dict:
+    return {"size": size, "mtime": mtime}
+
+
+def _log_lines(path: Path) -> list[str]:
+    return path.read_text().splitlines()
+
+
+def test_manifest_appends_changes_and_tombstones(tmp_path: Path) -> None:
+    """Only changed entries and deletions are appended; replay restores state."""
+    path = tmp_path / "manifest.jsonl"
+    data = {f"f{i}": _entry(i) for i in range(4)}
+    backup_core.save_manifest(path, data)
+    loaded, lines = backup_core._read_manifest(path)
+    assert loaded == data and lines == 4
+
+    new = dict(loaded)
+    new["f0"] = _entry(100, mtime=2.0)
+    del new["f1"]
+    backup_core.save_manifest(path, new, previous=loaded, log_lines=lines)
+
+    tail = [json.loads(line) for line in _log_lines(path)[4:]]
+    assert tail == [{"k": "f0", **new["f0"]}, {"k": "f1", "deleted": True}]
+    assert backup_core.load_manifest(path) == new
+
+
+def test_manifest_compacts_past_twice_live_entries(tmp_path: Path) -> None:
+    """A log that would exceed 2x the live entries is rewritten one per entry."""
+    path = tmp_path / "manifest.jsonl"
+    data = {"a": _entry(1), "b": _entry(2)}
+    backup_core.save_manifest(path, data)
+    for mtime in (2.0, 3.0, 4.0):
+        previous, lines = backup_core._read_manifest(path)
+        data = {"a": _entry(1, mtime), "b": _entry(2)}
+        backup_core.save_manifest(path, data, previous=previous, log_lines=lines)
+        assert len(_log_lines(path)) <= 2 * len(data)
+
+    assert len(_log_lines(path)) == 2  # 2 + 1 + 1 > 4 forced a compaction
+    assert backup_core.load_manifest(path) == data
+
+
+def test_manifest_torn_line_and_legacy_json(tmp_path: Path) -> None:
+    """A torn append is skipped and forces compaction; legacy JSON still loads."""
+    path = tmp_path / "manifest.jsonl"
+    backup_core.save_manifest(path, {"a": _entry(1)})
+    with path.open("a") as f:
+        f.write('{"k":"b","si')  # crashed mid-append
+    loaded, lines = backup_core._read_manifest(path)
+    assert loaded == {"a": _entry(1)} and lines == 0
+
+    backup_core.save_manifest(path, loaded, previous=loaded, log_lines=lines)
+    assert backup_core._read_manifest(path) == ({"a": _entry(1)}, 1)
+
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"a": {"size": 1, "sha256": "ab"}}, indent=2))
+    assert backup_core._read_manifest(legacy) == ({"a": {"size": 1, "sha256": "ab"}}, 0)
+
+
+def test_s3_etag_single_and_multipart(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Multipart ETag is md5(concat(part md5s))-<parts>, as S3 computes it."""
+    monkeypatch.setattr(backup_core, "_MULTIPART_BYTES", 4)
+    p = tmp_path / "blob"
+    body = b"0123456789"
+    p.write_bytes(body)
+
+    parts = [body[0:4], body[4:8], body[8:]]
+    combined = hashlib.md5(b"".join(hashlib.md5(c).digest() for c in parts))
+    assert backup_core._s3_etag(p, len(body)) == f"{combined.hexdigest()}-3"
+    assert backup_core._s3_etag(p, 3) == hashlib.md5(body).hexdigest()
+
+
+def test_archive_stream_round_trip(tmp_path: Path) -> None:
+    """The streamed archive is a readable tar that counts regular files."""
+    src = tmp_path / "data"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "sub" / "b.txt").write_text("b")
+
+    stream = backup_core._ArchiveStream([src], compression="none")
+    body = b"".join(iter(lambda: stream.read(4096), b""))
+    stream.close()
+
+    with tarfile.open(fileobj=io.BytesIO(body)) as tar:
+        names = set(tar.getnames())
+    assert {"data/a.txt", "data/sub/b.txt"} <= names
+    assert stream.files == 2 and stream.size == len(body)
+
+
+def test_archive_stream_propagates_writer_error(tmp_path: Path) -> None:
+    """A failed tar writer surfaces in read() instead of ending the stream."""
+    src = tmp_path / "data"
+    src.mkdir()
+    (src / "a.txt").write_text("a")
+
+    class _FailingStream(backup_core._ArchiveStream):
+        def _count(self, info: tarfile.TarInfo) -> tarfile.TarInfo:
+            raise OSError("file vanished")
+
+    stream = _FailingStream([src], compression="gzip")
+    with pytest.raises(OSError, match="file vanished"):
+        while stream.read(4096):
+            pass
+    stream.close()
+
+
+def test_unknown_archive_compression_is_rejected(tmp_path: Path) -> None:
+    """A typo in archive_compression fails instead of silently using gzip."""
+    with pytest.raises(ValueError, match="bzip2"):
+        backup_core.run_backup_once(
+            "bucket", "p/", [str(tmp_path)], archive=True, archive_compression="bzip2"
+        )
+    with pytest.raises(ValueError):
+        backup_core.PeriodicRunner(
+            "bucket", "p/", [str(tmp_path)], interval=1, archive_compression="xz"
+        )
+
+
+def test_iter_files_follows_file_symlinks_only(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Linked files are backed up; linked dirs are skipped with a log line."""
+    root = tmp_path / "data"
+    (root / "sub").mkdir(parents=True)
+    (root / "sub" / "b.txt").write_text("bb")
+    outside = tmp_path / "outside.txt"
+    outside.write_text("linked")
+    (root / "linked.txt").symlink_to(outside)
+    (root / "linked_dir").symlink_to(root / "sub", target_is_directory=True)
+    (root / "dangling").symlink_to(tmp_path / "missing")
+
+    with caplog.at_level(logging.WARNING, logger="core"):
+        found = {
+            backup_core._rel(root, Path(path)): st.st_size
+            for _, path, st in backup_core._iter_files([root])
+        }
+
+    assert found == {"sub/b.txt": 2, "linked.txt": len("linked")}
+    skipped = {
+        Path(r.path).name for r in caplog.records if r.getMessage() == "symlink_skipped"
+    }
+    assert skipped == {"linked_dir", "dangling"}
@@ -7,14 +7,47 @@ Routers should call these helpers rather than embedding inline tracing logic.
 
 from __future__ import annotations
 
-import os
+import threading
+from functools import lru_cache
 from typing import Any, Sequence
 
 from langfuse import get_client, observe  # type: ignore
-from langfuse.langchain import CallbackHandler  # type: ignore
 
+from src.observability.langfuse_tracing import get_langchain_callback_handler
 from src.utils.logger import GLOBAL_LOGGER as log
-from src.utils.token_counter import count_tokens
+from src.utils.model_loader import chat_provider
+from src.utils.token_counter import count_tokens, count_tokens_batch
+
+# Token counts are pure in (provider, model, text); repeated short texts
+# (questions, prompts) hit the cache instead of re-running the tokenizer.
+# Longer texts (whole documents) rarely repeat, so they are counted directly
+# rather than pinned in the cache.
+_MEMO_MAX_CHARS = 2048
+_count_tokens_memo = lru_cache(maxsize=4096)(count_tokens)
+
+
+def _count_tokens(provider: str, model: str, text: str) -> int:
+    if len(text or "") <= _MEMO_MAX_CHARS:
+        return _count_tokens_memo(provider, model, text)
+    return count_tokens(provider, model, text)
+
+
+# Batches at least this large are tokenized in one count_tokens_batch() call
+# (tiktoken encodes them on its own thread pool) instead of text by text.
+_PARALLEL_BATCH = 64
+
+# Langfuse client is built once and reused
+_CLIENT: Any = None
+_LF_LOCK = threading.Lock()
+
+
+def _get_client() -> Any:
+    global _CLIENT
+    if _CLIENT is None:
+        with _LF_LOCK:
+            if _CLIENT is None:
+                _CLIENT = get_client()
+    return _CLIENT
 
 
 # ---------------------------- Embeddings ------------------------------------
@@ -27,10 +60,11 @@ def record_embedding_batch(
     updates the observation usage metadata following reference style.
     Returns approximate token count used for embeddings (simple heuristic).
     """
-    tokens = 0
     try:
-        for t in texts:
-            tokens += count_tokens(provider, model, t)
+        if len(texts) >= _PARALLEL_BATCH:
+            tokens = sum(count_tokens_batch(provider, model, texts))
+        else:
+            tokens = sum(_count_tokens(provider, model, t) for t in texts)
     except Exception:
         # fallback minimal
         total_chars = sum(len(t) for t in texts)
@@ -83,8 +117,8 @@ def record_analysis(
 ):
     """Add usage for an analysis style generation (structured parsing)."""
     try:
-        in_tokens = count_tokens(provider, model, input_snippet)
-        out_tokens = count_tokens(provider, model, output_snippet)
+        in_tokens = _count_tokens(provider, model, input_snippet)
+        out_tokens = _count_tokens(provider, model, output_snippet)
     except Exception:
         in_tokens = max(1, len(input_snippet) // 4)
         out_tokens = max(1, len(output_snippet) // 4)
@@ -111,9 +145,9 @@ def record_comparison(
     session_id: str | None = None,
 ):
     try:
-        lt = count_tokens(provider, model, left)
-        rt = count_tokens(provider, model, right)
-        out = count_tokens(provider, model, result_text)
+        lt = _count_tokens(provider, model, left)
+        rt = _count_tokens(provider, model, right)
+        out = _count_tokens(provider, model, result_text)
     except Exception:
         lt = max(1, len(left) // 4)
         rt = max(1, len(right) // 4)
@@ -141,10 +175,10 @@ def run_chat_rag(
     mirroring the reference pattern.
     """
     # Attach Langfuse handler using new API
-    client = get_client()  # ensure client initialized
+    client = _get_client()  # ensure client initialized
     # Pre-update with input/model to let Langfuse infer costs later
     try:
-        model_name = getattr(rag.llm, "_dp_model_name", None) or "unknown-model"
+        model_name = rag.model_name
     except Exception:
         model_name = "unknown-model"
     try:
@@ -156,10 +190,7 @@ def run_chat_rag(
             )
     except Exception:
         log.warning("FAILED TO UPDATE CURRENT GENERATION INPUT/MODEL")
-    try:
-        handler = CallbackHandler()
-    except Exception:
-        handler = None
+    handler = get_langchain_callback_handler()
     if not handler:
         log.warning("NO LANGFUSE HANDLER AVAILABLE; RUNNING WITHOUT CALLBACKS")
     result = rag.invoke(
@@ -169,9 +200,9 @@ def run_chat_rag(
     )
     # Post-update with usage_details so Langfuse shows tokens and infers cost
     try:
-        provider = os.getenv("CHAT_PROVIDER", os.getenv("LLM_PROVIDER", "openai"))
-        in_toks = count_tokens(provider, model_name, question)
-        out_toks = count_tokens(provider, model_name, str(result))
+        provider = chat_provider()
+        in_toks = _count_tokens(provider, model_name, question)
+        out_toks = _count_tokens(provider, model_name, str(result))
         if client and hasattr(client, "update_current_generation"):
             client.update_current_generation(
                 usage_details={
@@ -0,0 +1,120 @@
+"""Provider Batch API submission for bulk document analysis.
+
+One JSONL request per prompt is uploaded as a single batch job, polled until
+it reaches a terminal state, and the completions are mapped back by
+``custom_id``. Only OpenAI-compatible batch endpoints are supported (OpenAI
+and Groq); callers should check ``supports_batch`` and fall back to regular
+chain calls for other providers.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from src.utils.logger import GLOBAL_LOGGER as log
+
+# provider -> (base_url or None for the SDK default, API key env var)
+BATCH_PROVIDERS: Dict[str, tuple[str | None, str]] = {
+    "openai": (None, "OPENAI_API_KEY"),
+    "groq": ("https://api.groq.com/openai/v1", "GROQ_API_KEY"),
+}
+
+_CHAT_ENDPOINT = "/v1/chat/completions"
+_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+
+def supports_batch(provider: str | None) -> bool:
+    return (provider or "").lower() in BATCH_PROVIDERS
+
+
+def _client(provider: str) -> Any:
+    from openai import OpenAI  # type: ignore
+
+    base_url, key_env = BATCH_PROVIDERS[provider.lower()]
+    return OpenAI(api_key=os.getenv(key_env), base_url=base_url)
+
+
+def submit_batch(
+    requests: List[List[Dict[str, str]]],
+    model: str,
+    provider: str,
+    *,
+    max_tokens: int = 1000,
+    seed: int = 94032,
+    poll_interval: float = 10.0,
+    timeout: float = 3600.0,
+) -> List[str | None]:
+    """Run chat requests as one batch job and return completions in order.
+
+    ``requests`` holds one OpenAI-style message list per item. Items the
+    provider failed to answer come back as None. Raises TimeoutError (after
+    cancelling the job) when the batch does not finish within ``timeout``
+    seconds, and RuntimeError when the job ends in any state but completed.
+    """
+    client = _client(provider)
+    payload = "\n".join(
+        json.dumps(
+            {
+                "custom_id": str(i),
+                "method": "POST",
+                "url": _CHAT_ENDPOINT,
+                "body": {
+                    "model": model,
+                    "messages": messages,
+                    "max_completion_tokens": max_tokens,
+                    "seed": seed,
+                },
+            }
+        )
+        for i, messages in enumerate(requests)
+    )
+    batch_file = client.files.create(
+        file=("batch.jsonl", io.BytesIO(payload.encode("utf-8"))), purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=_CHAT_ENDPOINT,
+        completion_window="24h",
+    )
+    log.info(
+        "Batch job submitted",
+        provider=provider,
+        model=model,
+        batch_id=batch.id,
+        requests=len(requests),
+    )
+
+    deadline = time.monotonic() + timeout
+    while batch.status not in _TERMINAL:
+        if time.monotonic() > deadline:
+            try:
+                client.batches.cancel(batch.id)
+            except Exception:
+                pass
+            raise TimeoutError(f"Batch {batch.id} did not finish in {timeout}s")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+
+    results: List[str | None] = [None] * len(requests)
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        rec = json.loads(line)
+        body = (rec.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if choices:
+            results[int(rec["custom_id"])] = choices[0]["message"]["content"]
+    log.info(
+        "Batch job completed",
+        batch_id=batch.id,
+        answered=sum(r is not None for r in results),
+        requests=len(requests),
+    )
+    return results
@@ -0,0 +1,58 @@
+"""Offline bulk analysis: analyze many documents in one provider batch job.
+
+Usage:
+    python -m src.ai.document_analyzer.bulk report1.pdf notes.txt --out out.jsonl
+
+Each input file becomes one JSON line ``{"file": ..., "analysis": {...}}``.
+Batch jobs can take minutes to hours, so this runs outside the API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Sequence
+
+from src.utils.document_ops import load_documents
+from src.utils.logger import GLOBAL_LOGGER as log
+
+
+def _read_text(path: Path) -> str:
+    return "\n".join(d.page_content for d in load_documents([path]))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Analyze documents in bulk via the provider Batch API."
+    )
+    parser.add_argument("files", nargs="+", type=Path, help="PDF/DOCX/TXT files")
+    parser.add_argument(
+        "--out", type=Path, default=None, help="JSONL output file (default: stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    # Heavy import (LLM clients) only once arguments are valid
+    from src.ai.document_analyzer.data_analysis import DocumentAnalyzer
+
+    files: List[Path] = list(args.files)
+    texts = [_read_text(p) for p in files]
+    results = DocumentAnalyzer().analyze_documents(texts)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        for path, analysis in zip(files, results):
+            out.write(
+                json.dumps({"file": str(path), "analysis": analysis}, default=str)
+                + "\n"
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    log.info("Bulk analysis written", documents=len(files), out=str(args.out or "-"))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
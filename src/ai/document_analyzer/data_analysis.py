@@ -1,22 +1,38 @@
 import os
 import sys
-from typing import Any, Dict
+from collections.abc import Mapping
+from typing import Any, Dict, List
 
+from langchain_core.output_parsers import StrOutputParser
 from langfuse import get_client  # type: ignore
-from langfuse.langchain import CallbackHandler  # type: ignore
 from pydantic import BaseModel
 
 from llm_observability.src.tracing import record_analysis
+from src.ai.document_analyzer.batch import submit_batch, supports_batch
 from src.ai.parsing.output_parsing import (
     build_structured_chain,
+    build_text_parser,
+    get_format_instructions,
     get_pydantic_parser,
 )
 from src.ai.prompt.prompt_library import PROMPT_REGISTRY  # type: ignore
+from src.observability.langfuse_tracing import (
+    get_langchain_callback_handler,
+    submit_observability,
+)
 from src.schemas.ai.models import Metadata
+from src.utils.config_loader import load_config
 from src.utils.exception.custom_exception import DocumentPortalException
 from src.utils.logger import GLOBAL_LOGGER as log
-from src.utils.model_loader import ModelLoader
-from src.utils.token_counter import count_tokens
+from src.utils.model_loader import chat_provider, get_llm, llm_meta
+from src.utils.response_cache import get_response_cache, make_key
+from src.utils.token_counter import count_tokens_batch
+
+# Resolved once at import; every analyzer shares the same template
+_ANALYSIS_PROMPT = PROMPT_REGISTRY["document_analysis"]
+
+# LangChain message type -> OpenAI chat role for batch request bodies
+_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
 
 
 class DocumentAnalyzer:
@@ -27,13 +43,35 @@ class DocumentAnalyzer:
 
     def __init__(self):
         try:
-            self.loader = ModelLoader()
-            self.llm = self.loader.load_llm()
+            self.llm = get_llm()
 
             # Prepare prompt, parser, and robust chain once
-            self.prompt = PROMPT_REGISTRY["document_analysis"]
+            self.prompt = _ANALYSIS_PROMPT
             self.pyd_parser = get_pydantic_parser(Metadata)
             self.chain = build_structured_chain(self.prompt, self.llm, Metadata)
+            # Raw-text path: keeps the model's own output for token accounting;
+            # malformed text is repaired by the fixing/retry parsers, not
+            # regenerated
+            self._text_chain = self.prompt | self.llm | StrOutputParser()
+            self._parse_text = build_text_parser(self.prompt, self.llm, Metadata)
+
+            # Content-addressed (model, prompt version, document) result cache
+            self._cache = get_response_cache()
+
+            # Per-request constants, resolved once per analyzer
+            self._format_instructions = get_format_instructions(Metadata)
+            self._provider = chat_provider()
+            self._model_name = llm_meta(self.llm).model_name or "unknown-model"
+            # DP_OBSERVE=0 runs lean: no Langfuse handler, client or usage updates
+            self._observe = os.getenv("DP_OBSERVE", "1") == "1"
+            self._handler = None
+            self._lf_client = None
+            if self._observe:
+                self._handler = get_langchain_callback_handler()
+                try:
+                    self._lf_client = get_client()
+                except Exception:
+                    self._lf_client = None
 
             log.info("DocumentAnalyzer initialized successfully")
 
@@ -45,97 +83,183 @@ class DocumentAnalyzer:
 
     def _normalize_to_dict(self, raw: Any) -> Dict[str, Any]:
         """Normalize chain output to a plain dict for consistent API responses."""
-        if isinstance(raw, BaseModel):
-            return raw.model_dump()
-        if isinstance(raw, dict):
+        if type(raw) is dict:
             return raw
-        if hasattr(raw, "model_dump"):
-            try:
-                return raw.model_dump()  # type: ignore[attr-defined]
-            except Exception:
-                pass
-        try:
-            return dict(raw)  # type: ignore[arg-type]
-        except Exception:
-            return {"value": str(raw)}
+        if isinstance(raw, BaseModel):
+            # Same output as model_dump(), minus its Python-level wrapper
+            return raw.__pydantic_serializer__.to_python(raw)
+        if isinstance(raw, Mapping):
+            return dict(raw)
+        return {"value": str(raw)}
 
     def analyze_document(self, document_text: str) -> dict:
         """
         Analyze a document's text and extract structured metadata & summary.
         """
         try:
+            cache_key = None
+            if self._cache is not None:
+                cache_key = make_key("analysis", self._model_name, document_text)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    log.info("Metadata analysis served from response cache")
+                    return dict(cached)
             log.info("Meta-data analysis chain initialized")
-            # Try to bind current Langfuse LangChain handler so this run is captured
             run_inputs = {
-                "format_instructions": self.pyd_parser.get_format_instructions(),
+                "format_instructions": self._format_instructions,
                 "document_text": document_text,
             }
-            try:
-                handler = CallbackHandler()
-            except Exception:
-                handler = None
+            client = self._lf_client
             # Pre-update current generation for automatic cost inference
             try:
-                client = get_client()
                 if client and hasattr(client, "update_current_generation"):
                     client.update_current_generation(
                         input=document_text,
-                        model=getattr(self.llm, "_dp_model_name", None)
-                        or "unknown-model",
+                        model=self._model_name,
                         metadata={"flow": "document_analysis"},
                     )
             except Exception:
                 log.warning("FAILED TO UPDATE CURRENT GENERATION INPUT/MODEL")
-            if handler:
-                raw = self.chain.invoke(run_inputs, config={"callbacks": [handler]})
-            else:
+            # Bind the Langfuse LangChain handler so this run is captured
+            if not self._handler and self._observe:
                 log.warning("NO LANGFUSE HANDLER AVAILABLE; RUNNING WITHOUT CALLBACKS")
-                raw = self.chain.invoke(run_inputs)
+            run_config = {"callbacks": [self._handler]} if self._handler else None
+            response_text = self._text_chain.invoke(run_inputs, config=run_config)
+            raw = self._parse_text(response_text, run_inputs, run_config)
             response = self._normalize_to_dict(raw)
-            # Post-update usage_details
-            try:
-                client = get_client()
-                provider = os.getenv(
-                    "CHAT_PROVIDER", os.getenv("LLM_PROVIDER", "openai")
-                )
-                model_name = (
-                    getattr(self.llm, "_dp_model_name", None) or "unknown-model"
-                )
-                in_toks = count_tokens(provider, model_name, document_text)
-                out_toks = count_tokens(provider, model_name, str(response))
-                if client and hasattr(client, "update_current_generation"):
-                    client.update_current_generation(
-                        usage_details={
-                            "input": in_toks,
-                            "output": out_toks,
-                        }
-                    )
-            except Exception:
-                log.warning("FAILED TO UPDATE CURRENT GENERATION USAGE DETAILS")
-            # Record usage via observed helper
-            try:
-                provider = os.getenv(
-                    "CHAT_PROVIDER", os.getenv("LLM_PROVIDER", "openai")
-                )
-                model_name = (
-                    getattr(self.llm, "_dp_model_name", None) or "unknown-model"
-                )
-                record_analysis(
-                    model=model_name,
-                    provider=provider,
+            if self._observe:
+                # usage_details must land while the route's generation span is
+                # still open; only record_analysis (own span) goes to the pool
+                self._update_usage(client, document_text, response_text)
+                submit_observability(
+                    record_analysis,
+                    model=self._model_name,
+                    provider=self._provider,
                     input_snippet=document_text,
-                    output_snippet=str(response),
+                    output_snippet=response_text,
                 )
-            except Exception:
-                pass
-            keys = []
-            if isinstance(response, dict):
-                try:
-                    keys = list(response.keys())
-                except Exception:
-                    keys = []
-            log.info(f"Metadata extraction successful; keys={keys}")
+            log.info(
+                "Metadata extraction successful",
+                nkeys=len(response) if isinstance(response, dict) else 0,
+            )
+            if cache_key is not None and isinstance(response, dict):
+                self._cache.set(cache_key, dict(response))
             return response
         except Exception as e:
             log.error(f"Metadata analysis failed: {e}")
             raise DocumentPortalException("Metadata extraction failed", sys)
+
+    def _update_usage(self, client, document_text: str, response_text: str) -> None:
+        # Post-update usage_details
+        try:
+            if client and hasattr(client, "update_current_generation"):
+                in_toks, out_toks = count_tokens_batch(
+                    self._provider, self._model_name, [document_text, response_text]
+                )
+                client.update_current_generation(
+                    usage_details={
+                        "input": in_toks,
+                        "output": out_toks,
+                    }
+                )
+        except Exception:
+            log.warning("FAILED TO UPDATE CURRENT GENERATION USAGE DETAILS")
+
+    def analyze_documents(self, texts: List[str]) -> List[dict]:
+        """
+        Analyze several documents, submitting them as one provider batch job.
+
+        Offline/bulk use only (see bulk.py): a batch job may take up to
+        ai.batch.timeout_seconds, so never call this from a request handler.
+        Documents already in the response cache are not resubmitted. Providers
+        with a Batch API (see batch.BATCH_PROVIDERS) get the remaining prompts
+        in a single job, and malformed answers go through the fixing/retry
+        parsers; documents the batch could not answer (or whose answer could
+        not be repaired), and all documents for other providers, go through
+        the regular chain.
+        """
+        if len(texts) <= 1:
+            return [self.analyze_document(t) for t in texts]
+        try:
+            provider = llm_meta(self.llm).provider or self._provider
+            model_name = self._model_name
+            responses: List[dict | None] = [None] * len(texts)
+            keys: List[str | None] = [None] * len(texts)
+            if self._cache is not None:
+                for i, text in enumerate(texts):
+                    keys[i] = make_key("analysis", model_name, text)
+                    cached = self._cache.get(keys[i])
+                    if cached is not None:
+                        responses[i] = dict(cached)
+            todo = [i for i, r in enumerate(responses) if r is None]
+            inputs = {
+                i: {
+                    "format_instructions": self._format_instructions,
+                    "document_text": texts[i],
+                }
+                for i in todo
+            }
+            batch_cfg = load_config().get("ai", {}).get("batch", {})
+            raws: Dict[int, Any] = {}
+            if (
+                len(todo) > 1
+                and batch_cfg.get("enabled", True)
+                and supports_batch(provider)
+            ):
+                try:
+                    completions = submit_batch(
+                        [
+                            [
+                                {
+                                    "role": _ROLES.get(m.type, "user"),
+                                    "content": m.content,
+                                }
+                                for m in self.prompt.format_messages(**inputs[i])
+                            ]
+                            for i in todo
+                        ],
+                        model_name,
+                        provider,
+                        max_tokens=getattr(self.llm, "max_tokens", None) or 1000,
+                        poll_interval=float(batch_cfg.get("poll_interval_seconds", 10)),
+                        timeout=float(batch_cfg.get("timeout_seconds", 3600)),
+                    )
+                    for i, text in zip(todo, completions):
+                        if text is None:
+                            continue
+                        try:
+                            raws[i] = self._parse_text(text, inputs[i])
+                        except Exception:
+                            pass
+                except Exception as e:
+                    log.warning(
+                        "Batch submission failed; falling back to chain calls",
+                        error=str(e),
+                    )
+            pending = [i for i in todo if i not in raws]
+            if pending:
+                for i, raw in zip(
+                    pending, self.chain.batch([inputs[i] for i in pending])
+                ):
+                    raws[i] = raw
+            for i in todo:
+                response = self._normalize_to_dict(raws[i])
+                responses[i] = response
+                if keys[i] is not None and isinstance(response, dict):
+                    self._cache.set(keys[i], dict(response))
+                if self._observe:
+                    submit_observability(
+                        record_analysis,
+                        model=model_name,
+                        provider=provider,
+                        input_snippet=texts[i],
+                        output_snippet=str(response),
+                    )
+            log.info(
+                f"Batch metadata extraction successful; documents={len(texts)}, "
+                f"cached={len(texts) - len(todo)}, via_chain={len(pending)}"
+            )
+            return responses  # type: ignore[return-value]
+        except Exception as e:
+            log.error(f"Batch metadata analysis failed: {e}")
+            raise DocumentPortalException("Batch metadata extraction failed", sys)
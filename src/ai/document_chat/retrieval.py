@@ -1,5 +1,9 @@
+import asyncio
+import functools
+import logging
 import os
 import sys
+import threading
 from operator import itemgetter
 from typing import Any, Dict, List
 
@@ -7,13 +11,25 @@ from langchain_community.vectorstores import FAISS
 from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import (
+    Runnable,
+    RunnableConfig,
+    RunnableLambda,
+    RunnableParallel,
+)
 
 from src.ai.prompt.prompt_library import PROMPT_REGISTRY
 from src.schemas.ai.models import PromptType
 from src.utils.config_loader import load_config
 from src.utils.exception.custom_exception import DocumentPortalException
 from src.utils.logger import GLOBAL_LOGGER as log
-from src.utils.model_loader import ModelLoader
+from src.utils.model_loader import (
+    clear_shared_models,
+    get_embeddings,
+    get_llm,
+    llm_meta,
+)
+from src.utils.ttl_cache import TTLCache, text_key
 
 """Conversational RAG chain (LCEL) with optional callback support for Langfuse.
 
@@ -23,6 +39,195 @@ direct custom trace/span helpers inside this class. This keeps the LCEL graph
 comprised only of Runnable-compatible components.
 """
 
+# (session, index, model, question+history digest) -> answer
+_ANSWER_CACHE = TTLCache()
+# Semantic tier: (session, index, model) -> recent [(unit question vector,
+# answer)], newest first; only history-free questions are stored
+_SEMANTIC_ANSWERS = TTLCache()
+_SEMANTIC_PER_SESSION = 64
+# ttl/maxsize come from config, applied by the first ConversationalRAG
+_ANSWER_CACHES_CONFIGURED = False
+_ANSWER_CACHES_LOCK = threading.Lock()
+
+# One lock per (index_path, index_name) so concurrent sessions opening the same
+# index wait for a single FAISS load instead of each reading it from disk.
+_VS_LOCKS: Dict[tuple, threading.Lock] = {}
+_VS_LOCKS_GUARD = threading.Lock()
+
+
+def _configure_answer_caches(rc_cfg: Dict[str, Any]) -> None:
+    """Size the process-wide answer caches from ai.response_cache, once."""
+    global _ANSWER_CACHES_CONFIGURED
+    if _ANSWER_CACHES_CONFIGURED:
+        return
+    with _ANSWER_CACHES_LOCK:
+        if _ANSWER_CACHES_CONFIGURED:
+            return
+        ttl = float(rc_cfg.get("ttl_seconds", _ANSWER_CACHE.ttl))
+        maxsize = int(rc_cfg.get("maxsize", _ANSWER_CACHE.maxsize))
+        for cache in (_ANSWER_CACHE, _SEMANTIC_ANSWERS):
+            cache.ttl = ttl
+            cache.maxsize = maxsize
+        _ANSWER_CACHES_CONFIGURED = True
+
+
+# Query-time search parameters from ai.vector_db.faiss, by faiss parameter name
+_SEARCH_PARAMS = {"nprobe": "nprobe", "efSearch": "hnsw_ef_search"}
+
+
+def _tune_index(index: Any) -> None:
+    """Apply configured search parameters (IVF nprobe, HNSW efSearch)."""
+    faiss_cfg = load_config().get("ai", {}).get("vector_db", {}).get("faiss", {})
+    params = {
+        name: int(faiss_cfg.get(key) or 0) for name, key in _SEARCH_PARAMS.items()
+    }
+    if not any(v > 0 for v in params.values()):
+        return
+    try:
+        import faiss  # type: ignore
+
+        space = faiss.ParameterSpace()
+    except Exception:
+        return
+    for name, value in params.items():
+        if value <= 0:
+            continue
+        try:
+            space.set_index_parameter(index, name, value)
+        except Exception:
+            # Parameter does not apply to this index type (e.g. flat)
+            pass
+
+
+@functools.lru_cache(maxsize=32)
+def _load_vs_cached(index_path: str, index_name: str, mtime: float | None):
+    # mtime is part of the key so a rebuilt index is reloaded, not reused
+    vs = FAISS.load_local(
+        index_path,
+        get_embeddings(),
+        index_name=index_name,
+        allow_dangerous_deserialization=True,  # ok if you trust the index
+    )
+    _tune_index(vs.index)
+    return vs
+
+
+def _index_mtime(index_path: str, index_name: str) -> float | None:
+    try:
+        return os.path.getmtime(os.path.join(index_path, f"{index_name}.faiss"))
+    except OSError:
+        return None
+
+
+def _load_vs(index_path: str, index_name: str):
+    """Return the process-wide shared FAISS vectorstore for an index."""
+    path = os.path.abspath(index_path)
+    with _VS_LOCKS_GUARD:
+        lock = _VS_LOCKS.setdefault((path, index_name), threading.Lock())
+    with lock:
+        return _load_vs_cached(path, index_name, _index_mtime(path, index_name))
+
+
+def _bound_retriever(config: RunnableConfig) -> Any:
+    return config["configurable"]["retriever"]
+
+
+def _retrieve(question: str, config: RunnableConfig) -> Any:
+    return _bound_retriever(config).invoke(question, config)
+
+
+async def _aretrieve(question: str, config: RunnableConfig) -> Any:
+    return await _bound_retriever(config).ainvoke(question, config)
+
+
+def _format_docs(docs) -> str:
+    """Format retrieved documents into a single context string."""
+    return "\n\n".join(getattr(d, "page_content", str(d)) for d in docs)
+
+
+def _fuse_docs(ranked: Dict[str, List[Any]]) -> List[Any]:
+    """Round-robin merge of the rewritten and raw retrieval results.
+
+    Takes the top hit of each list in turn, skipping duplicates, and keeps as
+    many documents as the longer list so the context size stays at ~k.
+    """
+    rewritten, raw = ranked["rewritten"], ranked["raw"]
+    limit = max(len(rewritten), len(raw))
+    seen: set = set()
+    fused: List[Any] = []
+    for pair in zip(rewritten, raw):
+        for d in pair:
+            key = getattr(d, "page_content", str(d))
+            if key not in seen:
+                seen.add(key)
+                fused.append(d)
+    longer = rewritten if len(rewritten) > len(raw) else raw
+    for d in longer[min(len(rewritten), len(raw)) :]:
+        key = getattr(d, "page_content", str(d))
+        if key not in seen:
+            seen.add(key)
+            fused.append(d)
+    return fused[:limit]
+
+
+def _chain_template(
+    contextualize_prompt: ChatPromptTemplate,
+    qa_prompt: ChatPromptTemplate,
+    llm: Any,
+    parallel_retrieve: bool = False,
+) -> Runnable:
+    """Build the RAG graph once with a late-bound retriever slot.
+
+    The retriever is read from config["configurable"]["retriever"], so
+    sessions bind theirs with .with_config() instead of rebuilding the graph.
+    With parallel_retrieve, the raw user input is retrieved concurrently with
+    the rewrite -> retrieve branch and both rankings are fused, so context
+    recall improves without adding a sequential step.
+    """
+    # 1) Rewrite user question with chat history context
+    question_rewriter = (
+        {
+            "input": itemgetter("input"),
+            "chat_history": itemgetter("chat_history"),
+        }
+        | contextualize_prompt
+        | llm
+        | StrOutputParser()
+    )
+
+    # 2) Retrieve docs for rewritten question
+    retrieve = RunnableLambda(_retrieve, afunc=_aretrieve)
+    if parallel_retrieve:
+        retrieve_docs = (
+            RunnableParallel(
+                rewritten=question_rewriter | retrieve,
+                raw=itemgetter("input") | retrieve,
+            )
+            | _fuse_docs
+            | _format_docs
+        )
+    else:
+        retrieve_docs = question_rewriter | retrieve | _format_docs
+
+    # 3) Answer using retrieved context + original input + chat history
+    return (
+        {
+            "context": retrieve_docs,
+            "input": itemgetter("input"),
+            "chat_history": itemgetter("chat_history"),
+        }
+        | qa_prompt
+        | llm
+        | StrOutputParser()
+    )
+
+
+def clear_vector_cache() -> None:
+    """Drop cached vectorstores, session RAGs and shared models (admin reload)."""
+    _session_rag_cached.cache_clear()
+    _load_vs_cached.cache_clear()
+    clear_shared_models()
+
 
 class ConversationalRAG:
     """LCEL-based Conversational RAG with lazy retriever initialization.
@@ -31,6 +236,7 @@ class ConversationalRAG:
         rag = ConversationalRAG(session_id="abc")
         rag.load_retriever_from_faiss(index_path="faiss_index/abc", k=5, index_name="index")
         answer = rag.invoke("What is ...?", chat_history=[])
+        answers = await rag.abatch([{"input": "Q1"}, {"input": "Q2"}])
     """
 
     def __init__(self, session_id: str | None, retriever=None):
@@ -40,6 +246,7 @@ class ConversationalRAG:
 
             # Load LLM and prompts once
             self.llm = self._load_llm()
+            self.model_name: str = llm_meta(self.llm).model_name or "unknown-model"
             self.contextualize_prompt: ChatPromptTemplate = PROMPT_REGISTRY[
                 PromptType.CONTEXTUALIZE_QUESTION.value
             ]
@@ -47,8 +254,31 @@ class ConversationalRAG:
                 PromptType.CONTEXT_QA.value
             ]
 
+            rc_cfg = self.cfg.get("ai", {}).get("response_cache", {})
+            self._cache = _ANSWER_CACHE if rc_cfg.get("enabled", True) else None
+            _configure_answer_caches(rc_cfg)
+            # Cosine similarity at which a paraphrased question reuses an
+            # answer; 0 turns the semantic tier off
+            self._semantic_threshold = (
+                float(rc_cfg.get("semantic_threshold", 0) or 0)
+                if self._cache is not None
+                else 0.0
+            )
+
+            self._chain_template = _chain_template(
+                self.contextualize_prompt,
+                self.qa_prompt,
+                self.llm,
+                parallel_retrieve=bool(
+                    self.cfg.get("ai", {})
+                    .get("retriever", {})
+                    .get("parallel_retrieve", False)
+                ),
+            )
+
             # Lazy pieces
             self.retriever = retriever
+            self._index_key: tuple | None = None
             self.chain = None
             if self.retriever is not None:
                 self._build_lcel_chain()
@@ -80,7 +310,6 @@ class ConversationalRAG:
                     f"FAISS index directory not found: {index_path}"
                 )
 
-            embeddings = ModelLoader().load_embeddings()
             # Resolve defaults from cached config
             if not index_name:
                 index_name = (
@@ -98,12 +327,8 @@ class ConversationalRAG:
                     .get("search_type", "similarity")
                 )
 
-            vectorstore = FAISS.load_local(
-                index_path,
-                embeddings,
-                index_name=index_name,
-                allow_dangerous_deserialization=True,  # ok if you trust the index
-            )
+            # Shared across sessions; only the retriever below is per-session
+            vectorstore = _load_vs(index_path, index_name)
 
             # Merge k into search_kwargs without clobbering provided keys
             if search_kwargs is None:
@@ -115,6 +340,16 @@ class ConversationalRAG:
                 search_type=search_type, search_kwargs=search_kwargs
             )
             self._build_lcel_chain()
+            index_mtime = _index_mtime(index_path, index_name)
+            # Identifies the index + retrieval settings for the answer cache; a
+            # rebuilt index changes mtime, so stale answers are not reused.
+            self._index_key = (
+                os.path.abspath(index_path),
+                index_name,
+                index_mtime,
+                search_type,
+                repr(sorted(search_kwargs.items())),
+            )
 
             log.info(
                 "FAISS retriever loaded successfully",
@@ -141,38 +376,104 @@ class ConversationalRAG:
         passed via API layer instrumentation.
         """
         try:
-            if self.chain is None:
-                raise DocumentPortalException(
-                    "RAG chain not initialized. Call load_retriever_from_faiss() before invoke().",
-                    sys,
-                )
-            chat_history = chat_history or []
-            payload = {"input": user_input, "chat_history": chat_history}
-            run_config = {"callbacks": callbacks} if callbacks else None
-            answer = self.chain.invoke(payload, config=run_config)  # type: ignore[arg-type]
-            if not answer:
-                log.warning(
-                    "No answer generated",
-                    user_input=user_input,
-                    session_id=self.session_id,
+            payload, run_config = self._prepare(user_input, chat_history, callbacks)
+            cache_key = self._answer_key(payload)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)  # type: ignore[union-attr]
+                if cached is not None:
+                    log.info("Answer served from cache", session_id=self.session_id)
+                    return cached
+            skey = self._semantic_key(payload)
+            qvec = None
+            if skey is not None:
+                cached, qvec = self._semantic_lookup(skey, user_input)
+                if cached is not None:
+                    return cached
+            answer = self.chain.invoke(payload, config=run_config)  # type: ignore[union-attr,arg-type]
+            result = self._finalize(user_input, answer, cache_key)
+            if answer and qvec is not None:
+                self._semantic_store(skey, qvec, result)  # type: ignore[arg-type]
+            return result
+        except Exception as e:
+            log.error("Failed to invoke ConversationalRAG", error=str(e))
+            raise DocumentPortalException("Invocation error in ConversationalRAG", sys)
+
+    async def ainvoke(
+        self,
+        user_input: str,
+        chat_history: List[BaseMessage] | None = None,
+        callbacks: List[Any] | None = None,
+    ) -> str:
+        """Async variant of invoke().
+
+        Runs the chain through LCEL's native ainvoke, so the LLM calls are
+        awaited and the FAISS retriever uses its async search path instead of
+        blocking the event loop.
+        """
+        try:
+            payload, run_config = self._prepare(user_input, chat_history, callbacks)
+            cache_key = self._answer_key(payload)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)  # type: ignore[union-attr]
+                if cached is not None:
+                    log.info("Answer served from cache", session_id=self.session_id)
+                    return cached
+            skey = self._semantic_key(payload)
+            qvec = None
+            if skey is not None:
+                cached, qvec = await asyncio.to_thread(
+                    self._semantic_lookup, skey, user_input
                 )
-                return "no answer generated."
-            log.info(
-                "Chain invoked successfully",
-                session_id=self.session_id,
-                user_input=user_input,
-                answer_preview=str(answer)[:150],
-            )
-            return str(answer)
+                if cached is not None:
+                    return cached
+            answer = await self.chain.ainvoke(payload, config=run_config)  # type: ignore[union-attr,arg-type]
+            result = self._finalize(user_input, answer, cache_key)
+            if answer and qvec is not None:
+                self._semantic_store(skey, qvec, result)  # type: ignore[arg-type]
+            return result
         except Exception as e:
             log.error("Failed to invoke ConversationalRAG", error=str(e))
             raise DocumentPortalException("Invocation error in ConversationalRAG", sys)
 
+    async def abatch(
+        self, inputs: List[Dict[str, Any]], callbacks: List[Any] | None = None
+    ) -> List[str | BaseException]:
+        """Answer several queries concurrently.
+
+        Each item is {"input": str, "chat_history": [...]} (history optional).
+        Results keep input order; a failed query yields its exception instead
+        of cancelling the others.
+        """
+        return await asyncio.gather(
+            *(
+                self.ainvoke(i["input"], i.get("chat_history"), callbacks)
+                for i in inputs
+            ),
+            return_exceptions=True,
+        )
+
+    def batch(
+        self, inputs: List[Dict[str, Any]], callbacks: List[Any] | None = None
+    ) -> List[str | BaseException]:
+        """Sync wrapper over abatch() for callers without an event loop.
+
+        Inside a running loop (e.g. an async FastAPI route) await abatch()
+        instead; this raises rather than blocking that loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.abatch(inputs, callbacks))
+        raise RuntimeError(
+            "ConversationalRAG.batch() called from a running event loop; "
+            "use 'await rag.abatch(...)' instead."
+        )
+
     # ---------- Internals ----------
 
     def _load_llm(self):
         try:
-            llm = ModelLoader().load_llm()
+            llm = get_llm()
             if not llm:
                 raise ValueError("LLM could not be loaded")
             log.info("LLM loaded successfully", session_id=self.session_id)
@@ -181,10 +482,100 @@ class ConversationalRAG:
             log.error("Failed to load LLM", error=str(e))
             raise DocumentPortalException("LLM loading error in ConversationalRAG", sys)
 
+    def _prepare(
+        self,
+        user_input: str,
+        chat_history: List[BaseMessage] | None,
+        callbacks: List[Any] | None,
+    ) -> tuple[Dict[str, Any], Dict[str, Any] | None]:
+        if self.chain is None:
+            raise DocumentPortalException(
+                "RAG chain not initialized. Call load_retriever_from_faiss() before invoke().",
+                sys,
+            )
+        payload = {"input": user_input, "chat_history": chat_history or []}
+        run_config = {"callbacks": callbacks} if callbacks else None
+        return payload, run_config
+
+    def _answer_key(self, payload: Dict[str, Any]) -> tuple | None:
+        if self._cache is None or self._index_key is None:
+            return None
+        history = [str(getattr(m, "content", m)) for m in payload["chat_history"]]
+        return (
+            self.session_id,
+            self._index_key,
+            self.model_name,
+            text_key(payload["input"], *history),
+        )
+
+    def _semantic_key(self, payload: Dict[str, Any]) -> tuple | None:
+        # Follow-up questions depend on history, so only first turns qualify
+        if (
+            self._semantic_threshold <= 0
+            or self._index_key is None
+            or payload["chat_history"]
+        ):
+            return None
+        return (
+            self.session_id,
+            self._index_key,
+            self.model_name,
+        )
+
+    def _semantic_lookup(self, skey: tuple, question: str) -> tuple[str | None, Any]:
+        """Return (cached answer or None, unit question vector or None)."""
+        try:
+            import numpy as np
+
+            vec = np.asarray(get_embeddings().embed_query(question), dtype="float32")
+            vec /= np.linalg.norm(vec) or 1.0
+        except Exception as e:
+            log.warning("Semantic cache lookup skipped", error=str(e))
+            return None, None
+        for other, answer in _SEMANTIC_ANSWERS.get(skey) or ():
+            if float(vec @ other) >= self._semantic_threshold:
+                log.info(
+                    "Answer served from semantic cache", session_id=self.session_id
+                )
+                return answer, vec
+        return None, vec
+
+    @staticmethod
+    def _semantic_store(skey: tuple, vec: Any, answer: str) -> None:
+        # Replace rather than mutate the list: readers may be iterating it
+        entries = _SEMANTIC_ANSWERS.get(skey) or []
+        _SEMANTIC_ANSWERS.set(skey, [(vec, answer), *entries][:_SEMANTIC_PER_SESSION])
+
+    def _finalize(
+        self, user_input: str, answer: Any, cache_key: tuple | None = None
+    ) -> str:
+        if not answer:
+            log.warning(
+                "No answer generated",
+                user_input=user_input,
+                session_id=self.session_id,
+            )
+            return "no answer generated."
+        answer = str(answer)
+        # Answer text only at DEBUG; INFO gets its length
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            preview: Dict[str, Any] = {"answer_preview": answer[:150]}
+        else:
+            preview = {"answer_chars": len(answer)}
+        log.info(
+            "Chain invoked successfully",
+            session_id=self.session_id,
+            user_input=user_input,
+            **preview,
+        )
+        if cache_key is not None:
+            self._cache.set(cache_key, answer)  # type: ignore[union-attr]
+        return answer
+
     @staticmethod
     def _format_docs(docs) -> str:
         """Format retrieved documents into a single context string."""
-        return "\n\n".join(getattr(d, "page_content", str(d)) for d in docs)
+        return _format_docs(docs)
 
     def _build_lcel_chain(self):
         try:
@@ -193,30 +584,9 @@ class ConversationalRAG:
                     "No retriever set before building chain", sys
                 )
 
-            # 1) Rewrite user question with chat history context
-            question_rewriter = (
-                {
-                    "input": itemgetter("input"),
-                    "chat_history": itemgetter("chat_history"),
-                }
-                | self.contextualize_prompt
-                | self.llm
-                | StrOutputParser()
-            )
-
-            # 2) Retrieve docs for rewritten question
-            retrieve_docs = question_rewriter | self.retriever | self._format_docs
-
-            # 3) Answer using retrieved context + original input + chat history
-            self.chain = (
-                {
-                    "context": retrieve_docs,
-                    "input": itemgetter("input"),
-                    "chat_history": itemgetter("chat_history"),
-                }
-                | self.qa_prompt
-                | self.llm
-                | StrOutputParser()
+            # Graph is prebuilt in __init__; only bind this session's retriever
+            self.chain = self._chain_template.with_config(
+                configurable={"retriever": self.retriever}
             )
 
             log.info("LCEL graph built successfully", session_id=self.session_id)
@@ -236,4 +606,40 @@ class ConversationalRAG:
     def clear(self) -> None:
         """Clear retriever and chain to free resources or reinitialize later."""
         self.retriever = None
+        self._index_key = None
         self.chain = None
+
+
+@functools.lru_cache(maxsize=32)
+def _session_rag_cached(
+    session_id: str | None,
+    index_path: str,
+    index_name: str,
+    k: int,
+    search_type: str,
+    mtime: float | None,
+) -> ConversationalRAG:
+    rag = ConversationalRAG(session_id=session_id)
+    rag.load_retriever_from_faiss(
+        index_path, k=k, index_name=index_name, search_type=search_type
+    )
+    return rag
+
+
+def get_session_rag(
+    session_id: str | None,
+    index_path: str,
+    index_name: str,
+    k: int,
+    search_type: str,
+) -> ConversationalRAG:
+    """Return a ready ConversationalRAG for an index, reused across queries.
+
+    Instances are kept per (session, index, k, search type) for the 32 most
+    recent combinations; the index mtime is part of the key, so a rebuilt
+    index gets a fresh retriever. Do not clear() a returned instance.
+    """
+    path = os.path.abspath(index_path)
+    return _session_rag_cached(
+        session_id, path, index_name, k, search_type, _index_mtime(path, index_name)
+    )
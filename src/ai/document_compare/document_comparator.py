@@ -1,32 +1,64 @@
+import json
 import os
 import sys
+from typing import Any, Iterator
 
 import pandas as pd
-from dotenv import load_dotenv
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.output_parsers import StrOutputParser
 from langfuse import get_client  # type: ignore
-from langfuse.langchain import CallbackHandler  # type: ignore
 from pydantic import BaseModel
 
 from llm_observability.src.tracing import record_comparison
 from src.ai.parsing.output_parsing import (
+    ChangeRowStream,
     build_structured_chain,
+    build_text_parser,
+    get_format_instructions,
     get_pydantic_parser,
 )
 from src.ai.prompt.prompt_library import PROMPT_REGISTRY
+from src.observability.langfuse_tracing import (
+    get_langchain_callback_handler,
+    submit_observability,
+)
 from src.schemas.ai.models import PromptType, SummaryResponse
+from src.utils.env_bootstrap import load_dotenv_once
 from src.utils.exception.custom_exception import DocumentPortalException
 from src.utils.logger import GLOBAL_LOGGER as log
-from src.utils.model_loader import ModelLoader
+from src.utils.model_loader import chat_provider, get_llm, llm_meta
+from src.utils.response_cache import get_response_cache, make_key
+from src.utils.token_counter import count_tokens_batch
+
+try:
+    import pyarrow as pa  # type: ignore
+except Exception:  # pragma: no cover
+    pa = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+# Resolved once at import; every comparator shares the same template
+_COMPARE_PROMPT = PROMPT_REGISTRY[PromptType.DOCUMENT_COMPARISON.value]
+
+
+def _rows_json(rows: list[dict]) -> str:
+    if orjson is not None:
+        return orjson.dumps(rows, default=str).decode()
+    return json.dumps(rows, default=str)
 
 
 class DocumentComparatorLLM:
     def __init__(self):
-        load_dotenv()
-        self.loader = ModelLoader()
-        self.llm = self.loader.load_llm()
-        self.parser = JsonOutputParser(pydantic_object=SummaryResponse)
-        self.prompt = PROMPT_REGISTRY[PromptType.DOCUMENT_COMPARISON.value]
+        load_dotenv_once()
+        self.llm = get_llm()
+        self.prompt = _COMPARE_PROMPT
+        # Fast path: raw model text streamed into ChangeRowStream; if that
+        # fails, the fixing/retry parsers repair the received text.
+        self._text_chain = self.prompt | self.llm | StrOutputParser()
+        self._parse_text = build_text_parser(self.prompt, self.llm, SummaryResponse)
 
         self._pyd_parser = get_pydantic_parser(SummaryResponse)
         self.chain = build_structured_chain(
@@ -35,115 +67,255 @@ class DocumentComparatorLLM:
             SummaryResponse,
             format_instruction_key="format_instruction",
         )
+        # Per-request constants, resolved once per comparator
+        self._format_instructions = get_format_instructions(SummaryResponse)
+        self._provider = chat_provider()
+        self._model_name = llm_meta(self.llm).model_name or "unknown-model"
+        # DP_OBSERVE=0 runs lean: no Langfuse handler, client or usage updates
+        self._observe = os.getenv("DP_OBSERVE", "1") == "1"
+        self._handler = None
+        self._lf_client = None
+        if self._observe:
+            self._handler = get_langchain_callback_handler()
+            try:
+                self._lf_client = get_client()
+            except Exception:
+                self._lf_client = None
+        # Content-addressed (model, prompt version, documents) rows cache
+        self._cache = get_response_cache()
         log.info("DocumentComparatorLLM initialized", model=self.llm)
 
     def compare_documents(self, combined_docs: str) -> pd.DataFrame:
-        try:
-            inputs = {
-                "combined_docs": combined_docs,
-                "format_instruction": self._pyd_parser.get_format_instructions(),
-            }
+        return self._format_response(self.compare_rows(combined_docs))
 
+    def compare_rows(self, combined_docs: str) -> list[dict]:
+        """Compare documents and return the change rows as plain dicts.
+
+        Same as compare_documents() without the DataFrame, for callers (the
+        API) that only serialize the rows again.
+        """
+        try:
+            cache_key = None
+            if self._cache is not None:
+                cache_key = make_key("comparison", self._model_name, combined_docs)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    log.info("Document comparison served from response cache")
+                    return cached
             log.info("Invoking document comparison LLM chain")
-            # Bind Langfuse LangChain handler via new pattern
-            try:
-                handler = CallbackHandler()
-            except Exception:
-                handler = None
+            handler = self._handler
+            client = self._lf_client
             # Pre-update current generation for automatic cost inference
             try:
-                client = get_client()
                 if client and hasattr(client, "update_current_generation"):
                     client.update_current_generation(
                         input=combined_docs,
-                        model=getattr(self.llm, "_dp_model_name", None)
-                        or "unknown-model",
+                        model=self._model_name,
                         metadata={"flow": "document_comparison"},
                     )
             except Exception:
                 log.warning("FAILED TO UPDATE CURRENT GENERATION INPUT/MODEL")
-            if handler:
-                raw = self.chain.invoke(inputs, config={"callbacks": [handler]})
-            else:
+            if not handler and self._observe:
                 log.warning("NO LANGFUSE HANDLER AVAILABLE; RUNNING WITHOUT CALLBACKS")
-                raw = self.chain.invoke(inputs)
-            log.info("Chain invoked successfully", response_preview=str(raw)[:200])
-
-            # Normalize to list[dict] for API schema compatibility
-            data: list = []
-            if isinstance(raw, BaseModel):
-                dumped = raw.model_dump()
-                if isinstance(dumped, dict) and "root" in dumped:
-                    data = dumped["root"]
-                elif isinstance(dumped, list):
-                    data = dumped
-                else:
-                    data = [dumped]
-            elif isinstance(raw, list):
-                data = raw
-            elif isinstance(raw, dict):
-                if "root" in raw and isinstance(raw["root"], list):
-                    data = raw["root"]
-                else:
-                    # Possibly a single row dict
-                    data = [raw]
-            else:
-                data = [raw]
+            run_config = {"callbacks": [handler]} if handler else None
+            raw_parts: list[str] = []
+            rows = self._collect_rows(combined_docs, run_config, raw_parts)
+            log.info("Chain invoked successfully", rows=len(rows))
 
-            # Ensure each row is a dict
-            rows: list[dict] = []
-            for item in data:
-                if isinstance(item, BaseModel):
-                    rows.append(item.model_dump())
-                elif isinstance(item, dict):
-                    rows.append(item)
-                else:
-                    try:
-                        rows.append(dict(item))  # type: ignore[arg-type]
-                    except Exception:
-                        rows.append({"value": str(item)})
-
-            df = self._format_response(rows)
-            # Post-update usage_details and record usage via observed helper
-            try:
-                client = get_client()
-                provider = os.getenv(
-                    "CHAT_PROVIDER", os.getenv("LLM_PROVIDER", "openai")
-                )
-                model_name = (
-                    getattr(self.llm, "_dp_model_name", None) or "unknown-model"
-                )
-                # Update usage_details for Langfuse
-                if client and hasattr(client, "update_current_generation"):
-                    from src.utils.token_counter import count_tokens as _ct
-
-                    in_toks = _ct(provider, model_name, combined_docs)
-                    out_toks = _ct(provider, model_name, df.to_json())
-                    client.update_current_generation(
-                        usage_details={
-                            "input": in_toks,
-                            "output": out_toks,
-                        }
-                    )
-                # Also log via our observed helper
-                record_comparison(
-                    model=model_name,
-                    provider=provider,
+            if cache_key is not None:
+                self._cache.set(cache_key, rows)
+            if self._observe:
+                # Count the model's own output (rows only if it sent none)
+                out_json = "".join(raw_parts) if raw_parts else _rows_json(rows)
+                # usage_details must land while the route's generation span is
+                # still open; only record_comparison (own span) goes to the pool
+                self._update_usage(client, combined_docs, out_json)
+                submit_observability(
+                    record_comparison,
+                    model=self._model_name,
+                    provider=self._provider,
                     left=combined_docs,
                     right="",
-                    result_text=df.to_json(),
+                    result_text=out_json,
                 )
-            except Exception:
-                pass
-            return df
+            return rows
         except Exception as e:
             log.error("Error in compare_documents", error=str(e))
             raise DocumentPortalException("Error comparing documents", sys)
 
+    def _update_usage(self, client, combined_docs: str, out_json: str) -> None:
+        try:
+            if client and hasattr(client, "update_current_generation"):
+                in_toks, out_toks = count_tokens_batch(
+                    self._provider, self._model_name, [combined_docs, out_json]
+                )
+                client.update_current_generation(
+                    usage_details={
+                        "input": in_toks,
+                        "output": out_toks,
+                    }
+                )
+        except Exception:
+            log.warning("FAILED TO UPDATE CURRENT GENERATION USAGE DETAILS")
+
+    def stream_rows(
+        self,
+        combined_docs: str,
+        config: Any = None,
+        raw_parts: list[str] | None = None,
+    ) -> Iterator[dict]:
+        """Yield comparison rows as the model streams them.
+
+        Rows are parsed incrementally from the streamed text, so the first one
+        is available after its closing brace rather than after the whole
+        response. If the stream yields no valid rows, the received text is
+        repaired by the fixing/retry parsers; if it turns invalid after some
+        rows were already yielded, streaming stops there with a warning.
+
+        When ``raw_parts`` is given, the streamed text chunks are appended to
+        it.
+        """
+        inputs = self._inputs(combined_docs)
+        parts = raw_parts if raw_parts is not None else []
+        parser = ChangeRowStream()
+        emitted = 0
+        try:
+            for row in self._stream_text_rows(inputs, config, parts, parser):
+                emitted += 1
+                yield row
+            if not parser.done:
+                raise ValueError("comparison output ended before the row list closed")
+        except ValueError as e:
+            if emitted:
+                log.warning(
+                    "Comparison stream stopped early", rows=emitted, error=str(e)
+                )
+                return
+            log.warning("Comparison output not valid rows; repairing it", error=str(e))
+            yield from self._repair_rows(parts, inputs, config)
+
+    def _collect_rows(
+        self, combined_docs: str, config: Any, raw_parts: list[str]
+    ) -> list[dict]:
+        """Return every row of one response, never a truncated list.
+
+        Unlike stream_rows(), nothing has been handed out yet, so a stream that
+        turns invalid or ends before the row list closes is handed whole to
+        the fixing/retry parsers instead.
+        """
+        inputs = self._inputs(combined_docs)
+        parser = ChangeRowStream()
+        try:
+            rows = list(
+                self._stream_text_rows(
+                    inputs, config, raw_parts, parser, whole_on_error=True
+                )
+            )
+            if parser.done:
+                return rows
+            log.warning(
+                "Comparison stream ended before the row list closed; repairing it",
+                rows=len(rows),
+            )
+        except ValueError as e:
+            log.warning("Comparison output not valid rows; repairing it", error=str(e))
+        return self._repair_rows(raw_parts, inputs, config)
+
+    def _repair_rows(
+        self, raw_parts: list[str], inputs: dict, config: Any
+    ) -> list[dict]:
+        # Parse the text already received (rest of the stream included) rather
+        # than paying for a second generation
+        return self._rows_from_structured(
+            self._parse_text("".join(raw_parts), inputs, config)
+        )
+
+    def _inputs(self, combined_docs: str) -> dict:
+        return {
+            "combined_docs": combined_docs,
+            "format_instruction": self._format_instructions,
+        }
+
+    def _stream_text_rows(
+        self,
+        inputs: dict,
+        config: Any,
+        raw_parts: list[str],
+        parser: ChangeRowStream,
+        *,
+        whole_on_error: bool = False,
+    ) -> Iterator[dict]:
+        """Feed streamed text into parser, yielding rows as they complete.
+
+        Chunks are appended to raw_parts. When parser raises ValueError, the
+        rest of the stream is still read into raw_parts (the repair parsers
+        need the whole answer) if no row was yielded yet or whole_on_error.
+        """
+        chunks = iter(self._text_chain.stream(inputs, config=config))
+        emitted = 0
+        for chunk in chunks:
+            raw_parts.append(chunk)
+            try:
+                rows = parser.feed(chunk)
+            except ValueError:
+                if whole_on_error or not emitted:
+                    raw_parts.extend(chunks)
+                raise
+            emitted += len(rows)
+            yield from rows
+            if parser.done:
+                return
+
+    @staticmethod
+    def _rows_from_structured(raw) -> list[dict]:
+        """Normalize structured-chain output to list[dict] for the API schema."""
+        data: list = []
+        if isinstance(raw, BaseModel):
+            dumped = raw.model_dump()
+            if isinstance(dumped, dict) and "root" in dumped:
+                data = dumped["root"]
+            elif isinstance(dumped, list):
+                data = dumped
+            else:
+                data = [dumped]
+        elif isinstance(raw, list):
+            data = raw
+        elif isinstance(raw, dict):
+            if "root" in raw and isinstance(raw["root"], list):
+                data = raw["root"]
+            else:
+                # Possibly a single row dict
+                data = [raw]
+        else:
+            data = [raw]
+
+        # Ensure each row is a dict
+        rows: list[dict] = []
+        for item in data:
+            if isinstance(item, BaseModel):
+                rows.append(item.model_dump())
+            elif isinstance(item, dict):
+                rows.append(item)
+            else:
+                try:
+                    rows.append(dict(item))  # type: ignore[arg-type]
+                except Exception:
+                    rows.append({"value": str(item)})
+        return rows
+
     def _format_response(self, rows: list[dict]) -> pd.DataFrame:  # type: ignore
         try:
-            df = pd.DataFrame(rows)
-            return df
+            if pa is not None:
+                try:
+                    # Arrow-backed columns skip object-dtype row inference
+                    return pa.Table.from_pylist(rows).to_pandas(
+                        types_mapper=pd.ArrowDtype
+                    )
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    # Mixed types in a column (e.g. list in one row, str in
+                    # another) need object dtype
+                    log.warning("Arrow could not type comparison rows", error=str(e))
+            return pd.DataFrame(rows)
         except Exception as e:
             log.error("Error formatting response into DataFrame", error=str(e))
-            DocumentPortalException("Error formatting response", sys)
+            raise DocumentPortalException("Error formatting response", sys)
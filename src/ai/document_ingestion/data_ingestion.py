@@ -9,29 +9,89 @@ Contains:
 - DocumentComparator: utilities for saving, reading, and combining PDFs for comparison.
 """
 
+import functools
 import hashlib
 import json
 import os
+import pickle
+import re
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
 
-import fitz  # PyMuPDF
 from langchain.schema import Document
-from langchain_community.vectorstores import FAISS
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from src.utils.config_loader import get_supported_extensions, load_config
 from src.utils.document_ops import (
     load_documents,
 )
 from src.utils.exception.custom_exception import DocumentPortalException
-from src.utils.file_io import generate_session_id, save_uploaded_files
+from src.utils.file_io import (
+    generate_session_id,
+    prune_upload_blobs,
+    save_upload_dedup,
+    save_uploaded_files,
+)
 from src.utils.logger import GLOBAL_LOGGER as log
 from src.utils.model_loader import ModelLoader
 
+if TYPE_CHECKING:  # pragma: no cover
+    from langchain_community.vectorstores import FAISS
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 SUPPORTED_EXTENSIONS = get_supported_extensions()
+# PyMuPDF releases the GIL while extracting, so PDFs are read in parallel
+_PDF_READ_WORKERS = int(load_config().get("data", {}).get("pdf_read_workers") or 0) or (
+    min(8, os.cpu_count() or 1)
+)
+
+# Vector storage precision -> faiss.index_factory spec (flat scalar quantizers)
+_PRECISION_SPECS = {"fp32": "", "fp16": "SQfp16", "int8": "SQ8"}
+
+
+# PyMuPDF, the FAISS store and the text splitter are imported on first use so
+# workers that never ingest (e.g. /health) don't pay for them at startup
+@functools.cache
+def _fitz() -> Any:
+    import fitz  # PyMuPDF
+
+    return fitz
+
+
+@functools.cache
+def _faiss_store() -> Any:
+    from langchain_community.vectorstores import FAISS
+
+    return FAISS
+
+
+@functools.cache
+def _text_splitter_cls() -> Any:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter
+
+
+def _chunk_digest(text: str) -> str:
+    # 128-bit blake2b: collision-safe for dedup within an index and faster
+    # than sha256; stdlib, so keys are identical on every host
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 # FAISS Manager (load-or-create)
@@ -47,25 +107,38 @@ class FaissManager:
         self.index_dir.mkdir(parents=True, exist_ok=True)
 
         self.meta_path = self.index_dir / "ingested_meta.json"
-        self._meta: Dict[str, Any] = {"rows": {}}  ## this is dict of rows
+        self._meta: Dict[str, Any] = {"rows": set()}  ## set of row fingerprints
 
         if self.meta_path.exists():
             try:
-                self._meta = json.loads(self.meta_path.read_text(encoding="utf-8")) or {
-                    "rows": {}
-                }  # load it if alrady there
+                meta = _loads(self.meta_path.read_bytes()) or {}
+                # Older files store rows as {fingerprint: true}; both load as a set
+                self._meta = {"rows": set(meta.get("rows") or ())}
             except Exception:
-                self._meta = {"rows": {}}  # init the empty one if dones not exists
+                self._meta = {"rows": set()}  # init the empty one if dones not exists
 
         self.model_loader = model_loader or ModelLoader()
         # Load index_name from config for consistent save/load
         cfg = load_config()
-        self.index_name = (
-            cfg.get("ai", {})
-            .get("vector_db", {})
-            .get("faiss", {})
-            .get("index_name", "index")
+        faiss_cfg = cfg.get("ai", {}).get("vector_db", {}).get("faiss", {})
+        self.index_name = faiss_cfg.get("index_name", "index")
+        # Optional index layout (IVF, HNSW, IVF-PQ, SQ8) for new indexes; an
+        # explicit index_factory wins over the storage precision shorthand
+        precision = str(faiss_cfg.get("precision") or "fp32").lower()
+        if precision not in _PRECISION_SPECS:
+            log.warning("Unknown FAISS precision; using fp32", precision=precision)
+        self.index_factory = faiss_cfg.get("index_factory") or _PRECISION_SPECS.get(
+            precision, ""
         )
+        self.embed_batch_size = max(1, int(faiss_cfg.get("embed_batch_size", 128)))
+        self.embed_concurrency = max(1, int(faiss_cfg.get("embed_concurrency", 4)))
+        # Full index saves are deferred until this many rows are pending
+        self._save_every = max(1, int(faiss_cfg.get("save_every", 500)))
+        self._dirty = 0
+        # Opt-in: move the index onto CUDA when faiss-gpu and a device exist
+        self.use_gpu = bool(faiss_cfg.get("use_gpu", False))
+        self._gpu_res: Any = None
+        self._on_gpu = False
         self.emb = self.model_loader.load_embeddings()
         self.vs: FAISS | None = None
 
@@ -77,100 +150,324 @@ class FaissManager:
 
     @staticmethod
     def _fingerprint(text: str, md: Dict[str, Any]) -> str:
+        # Uploads are saved under content-derived names (save_uploaded_files),
+        # so source + chunk digest is stable across re-uploads of a file
         src = md.get("source") or md.get("file_path")
         rid = md.get("row_id")
         if src is not None:
-            return f"{src}::{'' if rid is None else rid}"
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+            return f"{src}::{_chunk_digest(text) if rid is None else rid}"
+        return _chunk_digest(text)
+
+    @staticmethod
+    def _legacy_fingerprint(text: str, md: Dict[str, Any]) -> str | None:
+        """Pre-blake2b (sha256) key of a chunk, or None if it equals the current."""
+        src = md.get("source") or md.get("file_path")
+        if src is not None and md.get("row_id") is not None:
+            return None
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return digest if src is None else f"{src}::{digest[:16]}"
 
     def _save_meta(self) -> None:
-        self.meta_path.write_text(
-            json.dumps(self._meta, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        # Rows persist as a compact JSON array; temp file + replace keeps the
+        # meta intact if the process dies mid-write
+        data = _dumps({"rows": list(self._meta["rows"])})
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.meta_path)
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in embed_batch_size batches (one provider call each).
+
+        Batches are sent concurrently, up to embed_concurrency at a time; the
+        provider calls are network-bound, so threads overlap their latency.
+        """
+        n = self.embed_batch_size
+        batches = [texts[i : i + n] for i in range(0, len(texts), n)]
+        workers = min(self.embed_concurrency, len(batches))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(self.emb.embed_documents, batches))
+        else:
+            results = [self.emb.embed_documents(b) for b in batches]
+        return [v for batch in results for v in batch]
 
     def add_documents(self, docs: List[Document]) -> int:
         """Add new documents to the FAISS store, skipping those already seen.
 
+        Loads the on-disk index if needed, embeds only the unseen documents
+        (once, in batches) and creates the index from them when none exists.
+        The index is saved every ``save_every`` rows; call flush() when done.
         Returns the number of documents actually added.
         """
         if self.vs is None:
-            raise RuntimeError(
-                "Call load_or_create() before add_documents_idempotent()."
-            )
+            self._load_existing()
 
         new_docs: List[Document] = []
-
+        new_keys: set[str] = set()
+        seen = self._meta["rows"]
         for d in docs:
-            key = self._fingerprint(d.page_content, d.metadata or {})
-            if key in self._meta["rows"]:
+            md = d.metadata or {}
+            key = self._fingerprint(d.page_content, md)
+            if key in seen or key in new_keys:
+                continue
+            # Existing indexes may still hold sha256-based keys; only misses
+            # (about to be embedded anyway) pay for the second hash
+            legacy = self._legacy_fingerprint(d.page_content, md) if seen else None
+            if legacy is not None and legacy in seen:
+                seen.add(key)  # migrated on the next meta save
                 continue
-            self._meta["rows"][key] = True
+            new_keys.add(key)
             new_docs.append(d)
 
-        if new_docs:
-            self.vs.add_documents(new_docs)
-            self.vs.save_local(str(self.index_dir), index_name=self.index_name)
-            self._save_meta()
+        if not new_docs:
+            if self.vs is None:
+                raise DocumentPortalException(
+                    "No existing FAISS index and no data to create one", sys
+                )
+            return 0
+
+        texts = [d.page_content for d in new_docs]
+        metas = [d.metadata for d in new_docs]
+        pairs = list(zip(texts, self._embed(texts)))
+        if self.vs is None:
+            self.vs = self._create_from_embeddings(pairs, metas)
+            self._maybe_to_gpu()
+        else:
+            self.vs.add_embeddings(pairs, metadatas=metas)
+        # Only mark rows as ingested once they are actually in the index
+        seen.update(new_keys)
+        self._dirty += len(new_docs)
+        if self._dirty >= self._save_every:
+            self.flush()
         return len(new_docs)
 
-    def load_or_create(
-        self, texts: List[str] | None = None, metadatas: List[dict] | None = None
-    ) -> FAISS:
-        ## if we running first time then it will not go in this block
-        if self._exists():
-            self.vs = FAISS.load_local(
+    def flush(self) -> None:
+        """Write the index and ingest meta to disk if rows are pending.
+
+        Callers adding documents must flush once they are done; the meta is
+        only ever saved together with the index so the two stay consistent.
+        """
+        if not self._dirty or self.vs is None:
+            return
+        self._save_index()
+        self._save_meta()
+        self._dirty = 0
+
+    def _reset_index(self) -> None:
+        """Delete the on-disk index files and forget ingested rows."""
+        try:
+            (self.index_dir / f"{self.index_name}.faiss").unlink(missing_ok=True)
+            (self.index_dir / f"{self.index_name}.pkl").unlink(missing_ok=True)
+        except Exception:
+            # Best-effort cleanup; continue to rebuild
+            pass
+        self._meta = {"rows": set()}
+        self.vs = None
+        self._on_gpu = False
+
+    def _quarantine_index(self) -> None:
+        """Move unreadable index files aside (``*.corrupt``) and forget rows."""
+        for suffix in (".faiss", ".pkl"):
+            path = self.index_dir / f"{self.index_name}{suffix}"
+            if path.exists():
+                os.replace(path, path.with_name(path.name + ".corrupt"))
+        self._meta = {"rows": set()}
+        self.vs = None
+        self._on_gpu = False
+
+    def _maybe_to_gpu(self) -> None:
+        """Move self.vs.index to GPU 0 when use_gpu is set and CUDA is usable.
+
+        Falls back to the CPU index (with a warning) when faiss has no GPU
+        support, no device is visible, or the index type has no GPU version.
+        """
+        if not self.use_gpu or self.vs is None or self._on_gpu:
+            return
+        try:
+            import faiss  # type: ignore
+
+            if faiss.get_num_gpus() < 1:
+                raise RuntimeError("no CUDA device visible to faiss")
+            if self._gpu_res is None:
+                self._gpu_res = faiss.StandardGpuResources()
+            self.vs.index = faiss.index_cpu_to_gpu(self._gpu_res, 0, self.vs.index)
+            self._on_gpu = True
+            log.info("FAISS index moved to GPU", index_name=self.index_name)
+        except Exception as e:
+            log.warning("FAISS GPU unavailable; staying on CPU", error=str(e))
+            self.use_gpu = False  # don't retry on every load
+
+    def _save_index(self) -> None:
+        """save_local, writing a CPU copy when the live index is on the GPU."""
+        if not self._on_gpu:
+            self.vs.save_local(str(self.index_dir), index_name=self.index_name)
+            return
+        import faiss  # type: ignore
+
+        gpu_index = self.vs.index
+        self.vs.index = faiss.index_gpu_to_cpu(gpu_index)
+        try:
+            self.vs.save_local(str(self.index_dir), index_name=self.index_name)
+        finally:
+            self.vs.index = gpu_index
+
+    def _load_existing(self) -> FAISS | None:
+        """Load the on-disk index into self.vs.
+
+        Returns None (and clears the ingested-rows meta) when there is no
+        index, when it is corrupt (files are moved to ``*.corrupt``), or when
+        its embedding dimension no longer matches.
+        """
+        if not self._exists():
+            self._meta = {"rows": set()}
+            return None
+        # Open both files first so permission/IO problems surface as themselves
+        # instead of being mistaken for a corrupt index below
+        for suffix in (".faiss", ".pkl"):
+            with open(self.index_dir / f"{self.index_name}{suffix}", "rb"):
+                pass
+        try:
+            self.vs = _faiss_store().load_local(
                 str(self.index_dir),
                 embeddings=self.emb,
                 allow_dangerous_deserialization=True,
                 index_name=self.index_name,
             )
-            # Guard against dimension mismatch when switching embedding models/providers
-            try:
-                index_dim = getattr(self.vs.index, "d", None)  # type: ignore[attr-defined]
-                probe = self.emb.embed_query("dimension probe")
-                emb_dim = len(probe) if probe is not None else None
-                if (
-                    isinstance(index_dim, int)
-                    and isinstance(emb_dim, int)
-                    and index_dim != emb_dim
-                ):
-                    log.warning(
-                        "Embedding dimension mismatch detected; resetting FAISS index",
-                        index_dim=index_dim,
-                        embedding_dim=emb_dim,
-                        index_path=str(self.index_dir),
-                        index_name=self.index_name,
-                    )
-                    # Remove old incompatible index files and meta so we can rebuild
-                    try:
-                        (self.index_dir / f"{self.index_name}.faiss").unlink(
-                            missing_ok=True
-                        )  # type: ignore[arg-type]
-                        (self.index_dir / f"{self.index_name}.pkl").unlink(
-                            missing_ok=True
-                        )  # type: ignore[arg-type]
-                    except Exception:
-                        # Best-effort cleanup; continue to rebuild
-                        pass
-                    # Reset meta and fall through to create branch
-                    self._meta = {"rows": {}}
-                    self.vs = None  # type: ignore[assignment]
-                else:
-                    return self.vs
-            except Exception:
-                # If we cannot determine dims, proceed with loaded index
-                return self.vs
+        except (RuntimeError, EOFError, pickle.UnpicklingError, ValueError) as e:
+            # Truncated/corrupt files (faiss read error, broken pickle): keep
+            # them as *.corrupt and rebuild from the incoming documents. Other
+            # errors (ImportError after an upgrade, MemoryError, ...) propagate
+            # so a readable index is never discarded.
+            log.warning(
+                "Corrupt FAISS index; moved aside for rebuild",
+                index_path=str(self.index_dir),
+                index_name=self.index_name,
+                error=str(e),
+            )
+            self._quarantine_index()
+            return None
+        # Guard against dimension mismatch when switching embedding models/providers
+        try:
+            index_dim = getattr(self.vs.index, "d", None)  # type: ignore[attr-defined]
+            probe = self.emb.embed_query("dimension probe")
+            emb_dim = len(probe) if probe is not None else None
+            if (
+                isinstance(index_dim, int)
+                and isinstance(emb_dim, int)
+                and index_dim != emb_dim
+            ):
+                log.warning(
+                    "Embedding dimension mismatch detected; resetting FAISS index",
+                    index_dim=index_dim,
+                    embedding_dim=emb_dim,
+                    index_path=str(self.index_dir),
+                    index_name=self.index_name,
+                )
+                # Remove old incompatible index files and meta so we can rebuild
+                self._reset_index()
+        except Exception:
+            # If we cannot determine dims, proceed with loaded index
+            pass
+        self._on_gpu = False
+        self._maybe_to_gpu()
+        return self.vs
+
+    def load_or_create(
+        self, texts: List[str] | None = None, metadatas: List[dict] | None = None
+    ) -> FAISS:
+        ## if we running first time then it will not go in this block
+        if self._load_existing() is not None:
+            return self.vs  # type: ignore[return-value]
 
         if not texts:
             raise DocumentPortalException(
                 "No existing FAISS index and no data to create one", sys
             )
-        self.vs = FAISS.from_texts(
-            texts=texts, embedding=self.emb, metadatas=metadatas or []
+        self.vs = self._create_from_embeddings(
+            list(zip(texts, self._embed(texts))), metadatas
         )
-        self.vs.save_local(str(self.index_dir), index_name=self.index_name)
+        self._maybe_to_gpu()
+        self._save_index()
         return self.vs
 
+    def _create_from_embeddings(
+        self, pairs: List[Tuple[str, List[float]]], metadatas: List[dict] | None
+    ) -> FAISS:
+        """Create a new store from precomputed (text, vector) pairs.
+
+        Uses the configured faiss.index_factory layout (e.g. IVF, HNSW) when set,
+        falling back to a flat index when the quantizer cannot be trained,
+        which happens when there are fewer vectors than IVF lists / PQ centroids.
+        """
+        if not self.index_factory:
+            return _faiss_store().from_embeddings(pairs, self.emb, metadatas=metadatas)
+
+        import faiss  # type: ignore
+        import numpy as np
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+
+        x = np.asarray([v for _, v in pairs], dtype="float32")
+        try:
+            index = faiss.index_factory(x.shape[1], self.index_factory)
+            if not index.is_trained:
+                index.train(x)
+        except Exception as e:
+            log.warning(
+                "FAISS index_factory build failed; using flat index",
+                spec=self.index_factory,
+                vectors=len(pairs),
+                error=str(e),
+            )
+            return _faiss_store().from_embeddings(pairs, self.emb, metadatas=metadatas)
+        vs = _faiss_store()(
+            embedding_function=self.emb,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+        vs.add_embeddings(pairs, metadatas=metadatas)
+        log.info("FAISS index built", spec=self.index_factory, vectors=len(pairs))
+        return vs
+
+
+_PARA_RE = re.compile(r"\n{2,}")
+
+
+def _pack_paragraphs(
+    text: str, chunk_size: int, chunk_overlap: int, splitter: Any
+) -> List[str]:
+    """Greedily pack paragraphs into chunks of at most ``chunk_size`` chars.
+
+    Paragraphs (blank-line separated) are joined until the next one would
+    overflow; the next chunk starts with trailing paragraphs of the previous
+    one totalling at most ``chunk_overlap`` chars. Only paragraphs longer than
+    ``chunk_size`` go through the recursive splitter.
+    """
+    out: List[str] = []
+    buf: List[str] = []
+    buf_len = 0
+    for para in _PARA_RE.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        n = len(para)
+        if n > chunk_size:
+            if buf:
+                out.append("\n\n".join(buf))
+                buf, buf_len = [], 0
+            out.extend(splitter.split_text(para))
+            continue
+        if buf and buf_len + 2 + n > chunk_size:
+            out.append("\n\n".join(buf))
+            # Carry trailing paragraphs over as overlap, if they fit
+            while buf and (buf_len > chunk_overlap or buf_len + 2 + n > chunk_size):
+                buf_len -= len(buf.pop(0)) + (2 if buf else 0)
+        buf.append(para)
+        buf_len += n + (2 if len(buf) > 1 else 0)
+    if buf:
+        out.append("\n\n".join(buf))
+    return out
+
 
 class ChatIngestor:
     def __init__(
@@ -233,10 +530,15 @@ class ChatIngestor:
     def _split(
         self, docs: List[Document], chunk_size: int = 1000, chunk_overlap: int = 200
     ) -> List[Document]:
-        splitter = RecursiveCharacterTextSplitter(
+        splitter = _text_splitter_cls()(
             chunk_size=chunk_size, chunk_overlap=chunk_overlap
         )
-        chunks = splitter.split_documents(docs)
+        chunks: List[Document] = []
+        for doc in docs:
+            for text in _pack_paragraphs(
+                doc.page_content, chunk_size, chunk_overlap, splitter
+            ):
+                chunks.append(Document(page_content=text, metadata=dict(doc.metadata)))
         log.info(
             "Documents split",
             chunks=len(chunks),
@@ -252,6 +554,7 @@ class ChatIngestor:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         k: int = 5,
+        embed_batch_size: int | None = None,
     ):
         try:
             # Resolve defaults from config if caller used default values
@@ -277,19 +580,15 @@ class ChatIngestor:
 
             ## FAISS manager very very important class for the docchat
             fm = FaissManager(self.faiss_dir, self.model_loader)
+            if embed_batch_size:
+                fm.embed_batch_size = embed_batch_size
 
-            texts = [c.page_content for c in chunks]
-            metas = [c.metadata for c in chunks]
-
-            try:
-                vs = fm.load_or_create(texts=texts, metadatas=metas)
-            except Exception:
-                vs = fm.load_or_create(texts=texts, metadatas=metas)
-
+            # Loads or creates the index and embeds only unseen chunks, once
             added = fm.add_documents(chunks)
+            fm.flush()
             log.info("FAISS index updated", added=added, index=str(self.faiss_dir))
 
-            return vs.as_retriever(search_type="similarity", search_kwargs={"k": k})
+            return fm.vs.as_retriever(search_type="similarity", search_kwargs={"k": k})
 
         except Exception as e:
             log.exception("Failed to build retriever")
@@ -322,11 +621,8 @@ class DocHandler:
             if not filename.lower().endswith(".pdf"):
                 raise ValueError("Invalid file type. Only PDFs are allowed.")
             save_path = os.path.join(self.session_path, filename)
-            with open(save_path, "wb") as f:
-                if hasattr(uploaded_file, "read"):
-                    f.write(uploaded_file.read())
-                else:
-                    f.write(uploaded_file.getbuffer())
+            # Identical PDFs from earlier sessions are hard-linked, not rewritten
+            save_upload_dedup(uploaded_file, Path(save_path), Path(self.data_dir))
             log.info(
                 "PDF saved successfully",
                 file=filename,
@@ -340,13 +636,12 @@ class DocHandler:
 
     def read_pdf(self, pdf_path: str) -> str:
         try:
-            text_chunks = []
-            with fitz.open(pdf_path) as doc:
-                for page_num in range(doc.page_count):
-                    page = doc.load_page(page_num)
-                    text_chunks.append(
-                        f"\n--- Page {page_num + 1} ---\n{page.get_text()}"
-                    )  # type: ignore
+            with _fitz().open(pdf_path) as doc:
+                # Iterate pages directly; sort=False skips the layout-sort pass
+                text_chunks = [
+                    f"\n--- Page {n + 1} ---\n{page.get_text('text', sort=False)}"
+                    for n, page in enumerate(doc)
+                ]  # type: ignore
             text = "\n".join(text_chunks)
             log.info(
                 "PDF read successfully",
@@ -390,14 +685,18 @@ class DocumentComparator:
         try:
             ref_path = self.session_path / reference_file.name
             act_path = self.session_path / actual_file.name
-            for fobj, out in ((reference_file, ref_path), (actual_file, act_path)):
+            pairs = ((reference_file, ref_path), (actual_file, act_path))
+            for fobj, _ in pairs:
                 if not fobj.name.lower().endswith(".pdf"):
                     raise ValueError("Only PDF files are allowed.")
-                with open(out, "wb") as f:
-                    if hasattr(fobj, "read"):
-                        f.write(fobj.read())
-                    else:
-                        f.write(fobj.getbuffer())
+            # The two uploads are independent; stream them to disk concurrently
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                futures = [
+                    ex.submit(save_upload_dedup, fobj, out, self.base_dir)
+                    for fobj, out in pairs
+                ]
+                for fut in futures:
+                    fut.result()
             log.info(
                 "Files saved",
                 reference=str(ref_path),
@@ -411,15 +710,14 @@ class DocumentComparator:
 
     def read_pdf(self, pdf_path: Path) -> str:
         try:
-            with fitz.open(pdf_path) as doc:
+            with _fitz().open(pdf_path) as doc:
                 if doc.is_encrypted:
                     raise ValueError(f"PDF is encrypted: {pdf_path.name}")
                 parts = []
-                for page_num in range(doc.page_count):
-                    page = doc.load_page(page_num)
-                    text = page.get_text()  # type: ignore
-                    if text.strip():
-                        parts.append(f"\n --- Page {page_num + 1} --- \n{text}")
+                for n, page in enumerate(doc):
+                    text = page.get_text("text", sort=False)  # type: ignore
+                    if text and not text.isspace():
+                        parts.append(f"\n --- Page {n + 1} --- \n{text}")
             log.info("PDF read successfully", file=str(pdf_path), pages=len(parts))
             return "\n".join(parts)
         except Exception as e:
@@ -428,11 +726,20 @@ class DocumentComparator:
 
     def combine_documents(self) -> str:
         try:
-            doc_parts = []
-            for file in sorted(self.session_path.iterdir()):
-                if file.is_file() and file.suffix.lower() == ".pdf":
-                    content = self.read_pdf(file)
-                    doc_parts.append(f"Document: {file.name}\n{content}")
+            # scandir entries carry the file type from readdir: no stat per file
+            with os.scandir(self.session_path) as it:
+                pdf_files = sorted(
+                    Path(e.path)
+                    for e in it
+                    if e.is_file() and e.name.lower().endswith(".pdf")
+                )
+            if len(pdf_files) > 1:
+                workers = min(_PDF_READ_WORKERS, len(pdf_files))
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    texts = list(ex.map(self.read_pdf, pdf_files))
+            else:
+                texts = [self.read_pdf(f) for f in pdf_files]
+            doc_parts = [f"Document: {f.name}\n{t}" for f, t in zip(pdf_files, texts)]
             combined_text = "\n\n".join(doc_parts)
             log.info(
                 "Documents combined", count=len(doc_parts), session=self.session_id
@@ -446,12 +753,23 @@ class DocumentComparator:
 
     def clean_old_sessions(self, keep_latest: int = 3):
         try:
-            sessions = sorted(
-                [f for f in self.base_dir.iterdir() if f.is_dir()], reverse=True
-            )
+            with os.scandir(self.base_dir) as it:
+                # Dot dirs (the .blobs upload store) are not sessions
+                sessions = sorted(
+                    (
+                        Path(e.path)
+                        for e in it
+                        if e.is_dir() and not e.name.startswith(".")
+                    ),
+                    reverse=True,
+                )
             for folder in sessions[keep_latest:]:
                 shutil.rmtree(folder, ignore_errors=True)
                 log.info("Old session folder deleted", path=str(folder))
+            # Free stored uploads that only the deleted sessions referenced
+            pruned = prune_upload_blobs(self.base_dir)
+            if pruned:
+                log.info("Unreferenced upload blobs pruned", count=pruned)
         except Exception as e:
             log.error("Error cleaning old sessions", error=str(e))
             raise DocumentPortalException("Error cleaning old sessions", e) from e
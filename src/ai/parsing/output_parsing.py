@@ -5,26 +5,42 @@ Provides helpers to:
 - wrap with OutputFixingParser
 - optionally retry with RetryOutputParser using the original prompt
 - build a ready LCEL chain: prompt | llm | (fixing parser | base parser)
+- parse text the model already returned with the same fixing/retry parsers
+- incrementally extract comparison rows from streamed model text
 
 Behavior is config-driven via configs/config.yaml under ai.output_parsing.
 """
 
 from __future__ import annotations
 
-from typing import Any, Type
+import functools
+from typing import Any, Callable, Type
 
 from langchain.output_parsers import OutputFixingParser, RetryOutputParser
-from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_core.prompts import BasePromptTemplate
-from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 
+from src.ai.parsing.row_stream import ChangeRowStream  # noqa: F401 (re-export)
 from src.utils.config_loader import load_config
 
 
+@functools.cache
 def get_pydantic_parser(schema: Type[Any]) -> PydanticOutputParser:
+    # Parsers are stateless, so one per schema is shared process-wide
     return PydanticOutputParser(pydantic_object=schema)
 
 
+@functools.cache
+def get_format_instructions(schema: Type[Any]) -> str:
+    """Return the (constant) format instructions for a schema, built once.
+
+    get_format_instructions() walks and serializes the Pydantic JSON schema,
+    so callers should use this instead of calling it per request.
+    """
+    return get_pydantic_parser(schema).get_format_instructions()
+
+
 def wrap_with_fixer(parser: PydanticOutputParser, llm: Any) -> OutputFixingParser:
     return OutputFixingParser.from_llm(parser=parser, llm=llm)
 
@@ -33,6 +49,56 @@ def get_retry_parser(parser: PydanticOutputParser, llm: Any) -> RetryOutputParse
     return RetryOutputParser.from_llm(parser=parser, llm=llm)
 
 
+def _parsing_options() -> tuple[bool, bool, int]:
+    """Return (enable_fix, enable_retry, retry_max_attempts) from config."""
+    cfg = load_config()
+    op_cfg = (
+        cfg.get("ai", {}).get("output_parsing", {}) if isinstance(cfg, dict) else {}
+    )
+    return (
+        bool(op_cfg.get("enable_fix", True)),
+        bool(op_cfg.get("enable_retry", True)),
+        int(op_cfg.get("retry_max_attempts", 1)),
+    )
+
+
+def build_text_parser(
+    prompt: BasePromptTemplate, llm: Any, schema: Type[Any]
+) -> Callable[..., Any]:
+    """Return parse(text, inputs, config=None) for output the model already gave.
+
+    Tries the Pydantic parser first; on failure the same fixing and retry
+    parsers as build_structured_chain repair ``text`` (the retry parser with
+    the prompt rebuilt from ``inputs``). The original generation is never
+    re-run, so a malformed answer costs a repair call, not a second answer.
+    """
+    enable_fix, enable_retry, retry_max = _parsing_options()
+    base_parser = get_pydantic_parser(schema)
+    fixing_parser = wrap_with_fixer(base_parser, llm) if enable_fix else None
+    retry_parser = get_retry_parser(base_parser, llm) if enable_retry else None
+
+    def parse(text: str, inputs: dict, config: RunnableConfig | None = None) -> Any:
+        try:
+            return base_parser.parse(text)
+        except Exception as e:
+            last_err: Exception = e
+        if fixing_parser is not None:
+            try:
+                return fixing_parser.invoke(text, config=config)
+            except Exception as e:
+                last_err = e
+        if retry_parser is not None:
+            prompt_value = prompt.format_prompt(**inputs)
+            for _ in range(max(1, retry_max)):
+                try:
+                    return retry_parser.parse_with_prompt(text, prompt_value)
+                except Exception as e:  # noqa: PERF203 - intentional broad catch for retry loop
+                    last_err = e
+        raise last_err
+
+    return parse
+
+
 def build_structured_chain(
     prompt: BasePromptTemplate,
     llm: Any,
@@ -51,13 +117,7 @@ def build_structured_chain(
     requires plus the format_instructions key matching `format_instruction_key`.
     """
 
-    cfg = load_config()
-    op_cfg = (
-        cfg.get("ai", {}).get("output_parsing", {}) if isinstance(cfg, dict) else {}
-    )
-    enable_fix: bool = bool(op_cfg.get("enable_fix", True))
-    enable_retry: bool = bool(op_cfg.get("enable_retry", True))
-    retry_max: int = int(op_cfg.get("retry_max_attempts", 1))
+    enable_fix, enable_retry, retry_max = _parsing_options()
 
     base_parser = get_pydantic_parser(schema)
     parser_for_chain = wrap_with_fixer(base_parser, llm) if enable_fix else base_parser
@@ -70,14 +130,17 @@ def build_structured_chain(
 
     # Add a post-step retry using RetryOutputParser if parsing failed.
     retry_parser = get_retry_parser(base_parser, llm)
+    format_instructions = get_format_instructions(schema)
+    # Composed once; the retry path only invokes it
+    prompt_llm = prompt | llm | StrOutputParser()
 
-    def _invoke_with_retry(inputs: dict) -> Any:
+    def _invoke_with_retry(inputs: dict, config: RunnableConfig | None = None) -> Any:
         # Ensure format instructions are present for the base parser
         inputs = dict(inputs)
-        inputs.setdefault(format_instruction_key, base_parser.get_format_instructions())
+        inputs.setdefault(format_instruction_key, format_instructions)
 
         try:
-            return chain.invoke(inputs)
+            return chain.invoke(inputs, config=config)
         except Exception:
             # Build the original prompt value to supply to parse_with_prompt
             prompt_value = prompt.format_prompt(**inputs)
@@ -85,7 +148,7 @@ def build_structured_chain(
             for _ in range(max(1, retry_max)):
                 try:
                     # Requires the raw LLM text; here we re-ask the model via prompt | llm
-                    completion = (prompt | llm).invoke(inputs)
+                    completion = prompt_llm.invoke(inputs, config=config)
                     # Retry parser uses the erroneous output with the prompt; pass completion
                     return retry_parser.parse_with_prompt(completion, prompt_value)
                 except Exception as e:  # noqa: PERF203 - intentional broad catch for retry loop
@@ -0,0 +1,85 @@
+"""Incremental extraction of comparison rows from streamed model text.
+
+Kept free of LangChain imports so the parser can be used (and tested) on its
+own; output_parsing re-exports ChangeRowStream.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+_WHITESPACE = " \t\r\n"
+
+
+def _check_row(obj: Any) -> Dict[str, str]:
+    if (
+        isinstance(obj, dict)
+        and isinstance(obj.get("Page"), str)
+        and isinstance(obj.get("Changes"), str)
+    ):
+        return {"Page": obj["Page"], "Changes": obj["Changes"]}
+    raise ValueError("Invalid comparison row: expected Page/Changes strings")
+
+
+class ChangeRowStream:
+    """Incrementally extract rows from a streamed JSON array of rows.
+
+    feed() takes the next text chunk and returns the rows completed by it.
+    Objects are decoded with json.JSONDecoder.raw_decode as soon as they are
+    whole, so the first row is available long before the array closes.
+    The array starts at the first ``[`` followed by ``{`` or ``]``, so
+    brackets in preamble text are skipped. ``done`` turns True once the
+    closing bracket is seen; a stream that ends before that is truncated.
+    Raises ValueError for a complete element that is not a Page/Changes row.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._started = False
+        self._decoder = json.JSONDecoder()
+        self.done = False
+
+    def _find_start(self) -> bool:
+        buf = self._buf
+        start = buf.find("[")
+        while start >= 0:
+            nxt = start + 1
+            while nxt < len(buf) and buf[nxt] in _WHITESPACE:
+                nxt += 1
+            if nxt >= len(buf):
+                # Cannot tell yet whether this bracket opens the array
+                self._buf = buf[start:]
+                return False
+            if buf[nxt] in "{]":
+                self._buf = buf[start + 1 :]
+                return True
+            start = buf.find("[", start + 1)
+        self._buf = ""  # no candidate; preamble text is dropped
+        return False
+
+    def feed(self, chunk: str) -> List[Dict[str, str]]:
+        rows: List[Dict[str, str]] = []
+        if self.done:
+            return rows
+        self._buf += chunk
+        if not self._started:
+            if not self._find_start():
+                return rows
+            self._started = True
+        buf, pos = self._buf, 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                self.done = True
+                break
+            try:
+                obj, pos = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element still incomplete; wait for more text
+            rows.append(_check_row(obj))
+        self._buf = buf[pos:]
+        return rows
@@ -1,5 +1,9 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
+# Bump whenever a prompt below changes; it is part of response cache keys so
+# answers produced by an older prompt are not served.
+PROMPT_VERSION = 1
+
 # Prompt for document analysis
 document_analysis_prompt = ChatPromptTemplate.from_template("""
 You are a highly capable assistant trained to analyze and summarize documents.
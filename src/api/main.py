@@ -3,7 +3,7 @@ from typing import Dict
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -16,8 +16,14 @@ from src.schemas.api.ouput import HealthResponse
 from src.utils.config_loader import load_config
 from src.utils.env_bootstrap import bootstrap_env
 from src.utils.logger import GLOBAL_LOGGER as log
+from src.utils.model_loader import start_warmup
 from src.utils.semantic_cache import maybe_init_semantic_cache
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 # Load API configuration
 bootstrap_env(required=["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_REGION"])
 _cfg = load_config()
@@ -41,9 +47,14 @@ app = FastAPI(
     docs_url=f"{API_VERSION_END_POINT}/docs",
     openapi_url=f"{API_VERSION_END_POINT}/openapi.json",
     openapi_tags=_api_tags,
+    # orjson renders large payloads (e.g. /compare rows) several times faster
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
 )
 
-from src.observability.langfuse_tracing import flush_langfuse_events
+from src.observability.langfuse_tracing import (
+    close_observability,
+    flush_langfuse_events,
+)
 
 
 @app.on_event("startup")
@@ -54,9 +65,16 @@ def _startup_init_observability():  # pragma: no cover (startup hook)
         log.error("Langfuse startup init failed", error=str(e))
 
 
+@app.on_event("startup")
+def _startup_warmup_models():  # pragma: no cover (startup hook)
+    # Build the shared LLM/embeddings off the request path (DP_WARMUP=0 skips)
+    start_warmup()
+
+
 @app.on_event("shutdown")
 def _shutdown_flush_langfuse():
     try:
+        close_observability()  # drain background usage/record calls first
         flush_langfuse_events()  # logs flush status
     except Exception as e:
         log.error("Langfuse flush failed on shutdown", error=str(e))
@@ -1,6 +1,8 @@
+import functools
 from typing import Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from langfuse import observe  # type: ignore
 
 from src.ai.document_analyzer.data_analysis import DocumentAnalyzer
@@ -12,16 +14,26 @@ from src.utils.logger import GLOBAL_LOGGER as log
 router = APIRouter(prefix="/analyze", tags=["analyze"])
 
 
+@functools.lru_cache(maxsize=1)
+def get_analyzer() -> DocumentAnalyzer:
+    """Process-wide DocumentAnalyzer, built on first use and shared by requests."""
+    return DocumentAnalyzer()
+
+
 @router.post("", response_model=AnalyzeResponse)
 @observe()
-async def analyze_document(file: UploadFile = File(...)) -> Any:
+async def analyze_document(
+    file: UploadFile = File(...),
+    analyzer: DocumentAnalyzer = Depends(get_analyzer),
+) -> Any:
     try:
         log.info(f"Received file for analysis: {file.filename}")
+        # DocHandler stays per request: it owns this upload's session dir
         dh = DocHandler()
-        saved_path = dh.save_pdf(FastAPIFileAdapter(file))
-        text = read_pdf_via_handler(dh, saved_path)
-        analyzer = DocumentAnalyzer()
-        result = analyzer.analyze_document(text)
+        # Save, PDF extraction and the LLM call block; keep them off the loop
+        saved_path = await run_in_threadpool(dh.save_pdf, FastAPIFileAdapter(file))
+        text = await run_in_threadpool(read_pdf_via_handler, dh, saved_path)
+        result = await run_in_threadpool(analyzer.analyze_document, text)
         log.info("Document analysis complete.")
         return result
     except HTTPException:
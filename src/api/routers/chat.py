@@ -1,20 +1,26 @@
+import functools
 import os
+from pathlib import Path
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
 from llm_observability.src.tracing import (
     record_chat_generation,
     record_embedding_batch,
     run_chat_rag,
 )
-from src.ai.document_chat.retrieval import ConversationalRAG
+from src.ai.document_chat.retrieval import get_session_rag
 from src.ai.document_ingestion.data_ingestion import ChatIngestor
+from src.observability.langfuse_tracing import submit_observability
 from src.schemas.api.input import ChatIndexParams, ChatQueryParams
 from src.schemas.api.ouput import ChatIndexResponse, ChatQueryResponse
 from src.utils.config_loader import load_config
 from src.utils.document_ops import FastAPIFileAdapter
 from src.utils.logger import GLOBAL_LOGGER as log
+from src.utils.model_loader import chat_provider, normalize_provider
+from src.utils.ttl_cache import TTLCache
 
 # Note: Langfuse callbacks are handled inside services.tracing; no direct context use here.
 
@@ -31,6 +37,9 @@ UPLOAD_BASE = (
 FAISS_INDEX_NAME = (
     _cfg.get("ai", {}).get("vector_db", {}).get("faiss", {}).get("index_name", "index")
 )
+FAISS_BASE_PATH = Path(FAISS_BASE)
+# Index dirs recently seen to exist; repeat queries skip the stat() call
+_INDEX_DIRS_OK = TTLCache(maxsize=1024, ttl=60.0)
 RETRIEVER_TOP_K = _cfg.get("ai", {}).get("retriever", {}).get("top_k", 10)
 RETRIEVER_SEARCH_TYPE = (
     _cfg.get("ai", {}).get("retriever", {}).get("search_type", "similarity")
@@ -43,6 +52,34 @@ RETRIEVER_CHUNK_OVERLAP = (
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+# Providers/models are resolved on first use rather than at import: main.py
+# imports the routers before bootstrap_env() loads .env
+@functools.lru_cache(maxsize=1)
+def _embedding_target() -> tuple[str, str]:
+    provider = normalize_provider(os.getenv("EMBEDDING_PROVIDER", "openai"))
+    emb_cfg = _cfg.get("ai", {}).get("embedding_model", {}).get(provider, {})
+    return provider, emb_cfg.get("model_name", "embedding-model")
+
+
+def _record_embedding_usage(wrapped: List[FastAPIFileAdapter], session_id: str) -> None:
+    # Embedding usage recording via observed service helper
+    try:
+        provider, emb_model = _embedding_target()
+        texts: list[str] = []
+        for f in wrapped:
+            try:
+                texts.append(f.read_text())
+            except Exception:
+                continue
+        # Uploads are read above, while the request still owns them; token
+        # counting and the usage record run off the request path
+        submit_observability(
+            record_embedding_batch, emb_model, provider, texts, session_id=session_id
+        )
+    except Exception:  # pragma: no cover
+        pass
+
+
 @router.post("/index", response_model=ChatIndexResponse)
 async def chat_build_index(
     files: List[UploadFile] = File(...),
@@ -53,34 +90,24 @@ async def chat_build_index(
             f"Indexing chat session. Session ID: {params.session_id}, Files: {[f.filename for f in files]}"
         )
         wrapped = [FastAPIFileAdapter(f) for f in files]
-        ci = ChatIngestor(
+        # Saving, loading, embedding and FAISS writes all block; run them in
+        # the threadpool so the event loop keeps serving other requests
+        ci = await run_in_threadpool(
+            ChatIngestor,
             temp_base=UPLOAD_BASE,
             faiss_base=FAISS_BASE,
             use_session_dirs=params.use_session_dirs,
             session_id=params.session_id or None,
         )
-        ci.built_retriver(
+        await run_in_threadpool(
+            ci.built_retriver,
             wrapped,
             chunk_size=params.chunk_size,
             chunk_overlap=params.chunk_overlap,
             k=params.k,
+            embed_batch_size=params.embed_batch_size,
         )
-        # Embedding usage recording via observed service helper
-        try:
-            provider = os.getenv("EMBEDDING_PROVIDER", "openai")
-            if provider == "azure":
-                provider = "azure-openai"
-            emb_cfg = _cfg.get("ai", {}).get("embedding_model", {}).get(provider, {})
-            emb_model = emb_cfg.get("model_name", "embedding-model")
-            texts: list[str] = []
-            for f in wrapped:
-                try:
-                    texts.append(f.read_text())
-                except Exception:
-                    continue
-            record_embedding_batch(emb_model, provider, texts, session_id=ci.session_id)
-        except Exception:  # pragma: no cover
-            pass
+        await run_in_threadpool(_record_embedding_usage, wrapped, ci.session_id)
         log.info(f"Index created successfully for session: {ci.session_id}")
         return {
             "session_id": ci.session_id,
@@ -108,40 +135,42 @@ async def chat_query(
                 detail="session_id is required when use_session_dirs=True",
             )
 
-        index_dir = (
-            os.path.join(FAISS_BASE, params.session_id)
+        index_dir = str(
+            FAISS_BASE_PATH / params.session_id  # type: ignore[operator]
             if params.use_session_dirs
-            else FAISS_BASE
-        )  # type: ignore
-        if not os.path.isdir(index_dir):
-            raise HTTPException(
-                status_code=404, detail=f"FAISS index not found at: {index_dir}"
-            )
+            else FAISS_BASE_PATH
+        )
+        if _INDEX_DIRS_OK.get(index_dir) is None:
+            if not os.path.isdir(index_dir):
+                raise HTTPException(
+                    status_code=404, detail=f"FAISS index not found at: {index_dir}"
+                )
+            _INDEX_DIRS_OK.set(index_dir, True)
 
-        rag = ConversationalRAG(session_id=params.session_id)
-        rag.load_retriever_from_faiss(
+        # Index load and the RAG chain block (disk, network); keep them off the
+        # loop. Repeat queries for a session reuse its loaded RAG.
+        rag = await run_in_threadpool(
+            get_session_rag,
+            params.session_id,
             index_dir,
-            k=params.k,
-            index_name=FAISS_INDEX_NAME,
-            search_type=RETRIEVER_SEARCH_TYPE,
+            FAISS_INDEX_NAME,
+            params.k,
+            RETRIEVER_SEARCH_TYPE,
         )
         # Run under an observed helper which attaches the Langfuse handler
-        response = run_chat_rag(
-            rag, params.question, session_id=params.session_id, k=params.k
+        response = await run_in_threadpool(
+            run_chat_rag, rag, params.question, session_id=params.session_id, k=params.k
+        )
+        # Record usage via observed helper (no deprecated langfuse_context), in
+        # the background so it stays off the response path
+        submit_observability(
+            record_chat_generation,
+            model=rag.model_name,
+            provider=chat_provider(),
+            prompt=params.question,
+            response_text=str(response),
+            session_id=params.session_id,
         )
-        # Record usage via observed helper (no deprecated langfuse_context)
-        try:
-            provider = os.getenv("CHAT_PROVIDER", os.getenv("LLM_PROVIDER", "openai"))
-            model_name = getattr(rag.llm, "_dp_model_name", None) or "unknown-model"
-            record_chat_generation(
-                model=model_name,
-                provider=provider,
-                prompt=params.question,
-                response_text=str(response),
-                session_id=params.session_id,
-            )
-        except Exception:
-            pass
         log.info("Chat query handled successfully.")
 
         return {
@@ -1,6 +1,10 @@
+import functools
+import json
 from typing import Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from langfuse import observe  # type: ignore
 
 from src.ai.document_compare.document_comparator import DocumentComparatorLLM
@@ -9,28 +13,86 @@ from src.schemas.api.ouput import CompareResponse
 from src.utils.document_ops import FastAPIFileAdapter
 from src.utils.logger import GLOBAL_LOGGER as log
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 router = APIRouter(prefix="/compare", tags=["compare"])
 
 
+def _sse_data(payload: Any) -> bytes:
+    """Encode one SSE ``data:`` event (orjson when available)."""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(payload) + b"\n\n"
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+@functools.lru_cache(maxsize=1)
+def get_comparator_llm() -> DocumentComparatorLLM:
+    """Process-wide DocumentComparatorLLM (chains, parsers, handler) built once."""
+    return DocumentComparatorLLM()
+
+
 @router.post("", response_model=CompareResponse)
 @observe()
 async def compare_documents(
-    reference: UploadFile = File(...), actual: UploadFile = File(...)
+    reference: UploadFile = File(...),
+    actual: UploadFile = File(...),
+    comp: DocumentComparatorLLM = Depends(get_comparator_llm),
 ) -> Any:
     try:
         log.info(f"Comparing files: {reference.filename} vs {actual.filename}")
         dc = DocumentComparator()
-        ref_path, act_path = dc.save_uploaded_files(
-            FastAPIFileAdapter(reference), FastAPIFileAdapter(actual)
+        # Save, PDF extraction and the LLM call block; keep them off the loop
+        ref_path, act_path = await run_in_threadpool(
+            dc.save_uploaded_files,
+            FastAPIFileAdapter(reference),
+            FastAPIFileAdapter(actual),
         )
         _ = ref_path, act_path
-        combined_text = dc.combine_documents()
-        comp = DocumentComparatorLLM()
-        df = comp.compare_documents(combined_text)
+        combined_text = await run_in_threadpool(dc.combine_documents)
+        # Rows go out as the dicts the model produced; no DataFrame round trip
+        rows = await run_in_threadpool(comp.compare_rows, combined_text)
         log.info("Document comparison completed.")
-        return {"rows": df.to_dict(orient="records"), "session_id": dc.session_id}
+        return {"rows": rows, "session_id": dc.session_id}
     except HTTPException:
         raise
     except Exception as e:
         log.exception("Comparison failed")
         raise HTTPException(status_code=500, detail=f"Comparison failed: {e}")
+
+
+@router.post("/stream")
+async def compare_documents_stream(
+    reference: UploadFile = File(...),
+    actual: UploadFile = File(...),
+    comp: DocumentComparatorLLM = Depends(get_comparator_llm),
+) -> StreamingResponse:
+    """Server-Sent Events variant of /compare: one `data:` event per row."""
+    try:
+        log.info(f"Streaming comparison: {reference.filename} vs {actual.filename}")
+        dc = DocumentComparator()
+        await run_in_threadpool(
+            dc.save_uploaded_files,
+            FastAPIFileAdapter(reference),
+            FastAPIFileAdapter(actual),
+        )
+        combined_text = await run_in_threadpool(dc.combine_documents)
+    except Exception as e:
+        log.exception("Comparison failed")
+        raise HTTPException(status_code=500, detail=f"Comparison failed: {e}")
+
+    def events():
+        yield f"event: session\ndata: {json.dumps({'session_id': dc.session_id})}\n\n"
+        try:
+            for row in comp.stream_rows(combined_text):
+                yield _sse_data(row)
+        except Exception as e:
+            log.exception("Comparison stream failed")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    # Sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -5,11 +5,23 @@ Soft-fails if env/config disabled or keys missing.
 
 from __future__ import annotations
 
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from langfuse import get_client  # type: ignore
 from langfuse.langchain import CallbackHandler  # type: ignore
 
 from src.utils.logger import GLOBAL_LOGGER as log
 
+# Usage updates / record_* calls run here so Langfuse I/O never holds a response
+_OBSERVABILITY_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+# One CallbackHandler per process; it keys per-run state by run_id
+_HANDLER: Any = None
+_HANDLER_LOCK = threading.Lock()
+
 
 def init_langfuse() -> None:
     """
@@ -46,15 +58,65 @@ def flush_langfuse_events() -> None:
         log.error(f"Langfuse flush error: {e}")
 
 
+def submit_observability(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """
+    Run an observability call (a record_* helper) in the background.
+    The caller's context is copied so Langfuse/OTel still see the current trace.
+    Only submit calls that open their own span: attributes set on the caller's
+    span (e.g. update_current_generation) are dropped once that span has ended,
+    which it usually has by the time the pool runs the call.
+    Errors are logged, never raised; after close_observability() calls run inline.
+    """
+
+    def _run() -> None:
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            log.warning("Background observability call failed", error=str(e))
+
+    global _OBSERVABILITY_POOL
+    ctx = contextvars.copy_context()
+    with _POOL_LOCK:
+        if _OBSERVABILITY_POOL is None:
+            _OBSERVABILITY_POOL = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="obs"
+            )
+        try:
+            _OBSERVABILITY_POOL.submit(ctx.run, _run)
+            return
+        except RuntimeError:
+            # Pool already shut down (app stopping)
+            pass
+    ctx.run(_run)
+
+
+def close_observability() -> None:
+    """
+    Wait for pending background observability calls; run on app shutdown
+    before flushing Langfuse so their events are included.
+    """
+    global _OBSERVABILITY_POOL
+    with _POOL_LOCK:
+        pool, _OBSERVABILITY_POOL = _OBSERVABILITY_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
 def get_langchain_callback_handler():
     """
-    Returns a new Langfuse CallbackHandler for use in LangChain config callbacks.
+    Returns the shared Langfuse CallbackHandler for LangChain config callbacks,
+    building it on first use. Returns None if it cannot be created.
     """
-    try:
-        return CallbackHandler()
-    except Exception as e:
-        log.error(f"Failed to create Langfuse CallbackHandler: {e}")
-        return None
+    global _HANDLER
+    if _HANDLER is None:
+        with _HANDLER_LOCK:
+            if _HANDLER is None:
+                try:
+                    _HANDLER = CallbackHandler()
+                except Exception as e:
+                    log.error(f"Failed to create Langfuse CallbackHandler: {e}")
+                    return None
+    return _HANDLER
 
 
 __all__ = [
@@ -63,4 +125,6 @@ __all__ = [
     "CallbackHandler",
     "get_langchain_callback_handler",
     "flush_langfuse_events",
+    "submit_observability",
+    "close_observability",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 """Pydantic input models for API endpoints."""
 
 
-from fastapi import Form
+from fastapi import Form, HTTPException
 from pydantic import BaseModel, Field, model_validator
 
 from src.utils.config_loader import load_config
@@ -13,6 +13,8 @@ _retriever = _cfg.get("ai", {}).get("retriever", {})
 _DEF_TOP_K = int(_retriever.get("top_k", 10))
 _DEF_CHUNK_SIZE = int(_retriever.get("chunk_size", 1000))
 _DEF_CHUNK_OVERLAP = int(_retriever.get("chunk_overlap", 200))
+# Provider cap on inputs per embedding request (OpenAI: 2048)
+_MAX_EMBED_BATCH = 2048
 
 
 class AnalyzeParams(BaseModel):
@@ -42,6 +44,12 @@ class ChatIndexParams(BaseModel):
         default=_DEF_CHUNK_OVERLAP, ge=0, description="Text splitter chunk overlap"
     )
     k: int = Field(default=_DEF_TOP_K, ge=1, description="Retriever top-k")
+    embed_batch_size: int | None = Field(
+        default=None,
+        ge=1,
+        le=_MAX_EMBED_BATCH,
+        description="Chunks per embedding request (defaults to config)",
+    )
 
     @model_validator(mode="after")
     def _validate_chunks(self) -> "ChatIndexParams":
@@ -54,16 +62,24 @@ class ChatIndexParams(BaseModel):
         cls,
         session_id: str | None = Form(None),
         use_session_dirs: bool = Form(True),
-        chunk_size: int = Form(_DEF_CHUNK_SIZE),
-        chunk_overlap: int = Form(_DEF_CHUNK_OVERLAP),
-        k: int = Form(_DEF_TOP_K),
+        chunk_size: int = Form(_DEF_CHUNK_SIZE, ge=1),
+        chunk_overlap: int = Form(_DEF_CHUNK_OVERLAP, ge=0),
+        k: int = Form(_DEF_TOP_K, ge=1),
+        embed_batch_size: int | None = Form(None, ge=1, le=_MAX_EMBED_BATCH),
     ) -> "ChatIndexParams":
-        return cls(
+        # FastAPI has already validated the form fields (types and bounds), so
+        # skip a second pydantic pass and only check the cross-field rule
+        if chunk_overlap >= chunk_size:
+            raise HTTPException(
+                status_code=422, detail="chunk_overlap must be less than chunk_size"
+            )
+        return cls.model_construct(
             session_id=session_id,
             use_session_dirs=use_session_dirs,
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             k=k,
+            embed_batch_size=embed_batch_size,
         )
 
 
@@ -84,9 +100,9 @@ class ChatQueryParams(BaseModel):
         question: str = Form(...),
         session_id: str | None = Form(None),
         use_session_dirs: bool = Form(True),
-        k: int = Form(_DEF_TOP_K),
+        k: int = Form(_DEF_TOP_K, ge=1),
     ) -> "ChatQueryParams":
-        return cls(
+        return cls.model_construct(
             question=question,
             session_id=session_id,
             use_session_dirs=use_session_dirs,
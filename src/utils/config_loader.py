@@ -5,14 +5,31 @@ These utilities provide a single point to read configuration values from
 supported file extensions).
 """
 
-from typing import Any, Dict, Iterable, Set
+import functools
+from typing import Any, Dict, FrozenSet, Iterable, Set
 
 import yaml
 
+from src.utils.logger import GLOBAL_LOGGER as log
 
+# libyaml's C loader parses several times faster; pure-Python builds lack it
+_SAFE_LOADER = getattr(yaml, "CSafeLoader", None)
+
+
+def _parse_yaml(stream: Any) -> Any:
+    if _SAFE_LOADER is not None:
+        return yaml.load(stream, Loader=_SAFE_LOADER)
+    return yaml.safe_load(stream)
+
+
+@functools.lru_cache(maxsize=4)
 def load_config(config_path: str = "configs/config.yaml") -> Dict[str, Any]:
     """Load configuration YAML into a nested dictionary.
 
+    The file is parsed once per path and the same dictionary is returned on
+    later calls, so callers must treat it as read-only. Use
+    ``invalidate_config()`` to force a re-read.
+
     Args:
         config_path: Path to the YAML config file.
 
@@ -20,18 +37,29 @@ def load_config(config_path: str = "configs/config.yaml") -> Dict[str, Any]:
         A dictionary with the parsed configuration.
     """
     with open(config_path, encoding="utf-8") as file:
-        config = yaml.safe_load(file)
+        config = _parse_yaml(file)
+    # Once per path (cached); shows if libyaml is missing and parsing is slow
+    log.info(
+        "Config loaded",
+        path=config_path,
+        yaml_loader="CSafeLoader" if _SAFE_LOADER is not None else "SafeLoader",
+    )
     return config
 
 
-def get_supported_extensions() -> Set[str]:
+def invalidate_config() -> None:
+    """Drop cached configs so the next ``load_config()`` re-reads the file."""
+    load_config.cache_clear()
+
+
+def get_supported_extensions() -> FrozenSet[str]:
     """Return supported file extensions from config with sane defaults.
 
     Each extension is normalized to lowercase and guaranteed to start with a
     leading dot (e.g., ".pdf").
 
     Returns:
-        A set of normalized extensions.
+        A frozenset of normalized extensions.
     """
     cfg = load_config()
     raw: Iterable[str] = cfg.get("data", {}).get(
@@ -45,4 +73,4 @@ def get_supported_extensions() -> Set[str]:
         if not e.startswith("."):
             e = f".{e}"
         norm.add(e)
-    return norm
+    return frozenset(norm)
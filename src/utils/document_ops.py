@@ -3,7 +3,7 @@ from __future__ import annotations
 """Document helpers: loaders, concatenators, and adapters for FastAPI files."""
 
 from pathlib import Path
-from typing import Iterable, List
+from typing import BinaryIO, Iterable, List
 
 from fastapi import UploadFile
 from langchain.schema import Document
@@ -15,6 +15,13 @@ from src.utils.logger import GLOBAL_LOGGER as log
 
 SUPPORTED_EXTENSIONS = get_supported_extensions()
 
+# Extension -> loader factory; anything else is skipped by load_documents
+_LOADERS = {
+    ".pdf": lambda p: PyPDFLoader(str(p)),
+    ".docx": lambda p: Docx2txtLoader(str(p)),
+    ".txt": lambda p: TextLoader(str(p), encoding="utf-8"),
+}
+
 
 def load_documents(paths: Iterable[Path]) -> List[Document]:
     """Load documents from filesystem using appropriate loaders.
@@ -28,17 +35,11 @@ def load_documents(paths: Iterable[Path]) -> List[Document]:
     docs: List[Document] = []
     try:
         for p in paths:
-            ext = p.suffix.lower()
-            if ext == ".pdf":
-                loader = PyPDFLoader(str(p))
-            elif ext == ".docx":
-                loader = Docx2txtLoader(str(p))
-            elif ext == ".txt":
-                loader = TextLoader(str(p), encoding="utf-8")
-            else:
+            make_loader = _LOADERS.get(p.suffix.lower())
+            if make_loader is None:
                 log.warning("Unsupported extension skipped", path=str(p))
                 continue
-            docs.extend(loader.load())
+            docs.extend(make_loader(p).load())
         log.info("Documents loaded", count=len(docs))
         return docs
     except Exception as e:
@@ -73,16 +74,26 @@ def concat_for_comparison(ref_docs: List[Document], act_docs: List[Document]) ->
 class FastAPIFileAdapter:
     """Adapt FastAPI UploadFile to a minimal interface used by our I/O helpers.
 
-    Provides a ``name`` attribute and a ``getbuffer()`` method to read bytes.
+    Provides a ``name`` attribute, a ``getbuffer()`` method to read bytes and
+    ``open()`` for streaming the upload without loading it into memory.
     """
 
     def __init__(self, uf: UploadFile):
         self._uf = uf
         self.name = uf.filename
+        self._buf: bytes | None = None
 
     def getbuffer(self) -> bytes:
+        # Read the spooled file at most once; later calls reuse the bytes.
+        # Savers stream through open() instead and never materialize it.
+        if self._buf is None:
+            self._uf.file.seek(0)
+            self._buf = self._uf.file.read()
+        return self._buf
+
+    def open(self) -> BinaryIO:
         self._uf.file.seek(0)
-        return self._uf.file.read()
+        return self._uf.file
 
 
 def read_pdf_via_handler(handler, path: str) -> str:
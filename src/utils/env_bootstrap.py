@@ -12,6 +12,25 @@ from typing import Iterable
 
 from src.utils.logger import GLOBAL_LOGGER as log
 
+_DOTENV_LOADED = False
+
+
+def load_dotenv_once() -> bool:
+    """Load .env into os.environ on the first call only; later calls are no-ops.
+
+    Returns True if this call loaded a .env file. Existing variables are never
+    overridden, so re-reading the file could not change anything.
+    """
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return False
+    _DOTENV_LOADED = True
+    try:
+        from dotenv import load_dotenv  # type: ignore
+    except Exception:
+        return False
+    return bool(load_dotenv())
+
 
 def _set_if_missing(key: str, value: str | None) -> None:
     if value and key not in os.environ:
@@ -29,14 +48,8 @@ def bootstrap_env(
     env = os.getenv("ENV", "local").lower()
 
     # Local .env for developer convenience
-    if env != "production":
-        try:
-            from dotenv import load_dotenv  # type: ignore
-
-            if load_dotenv():
-                log.info("Loaded .env file for local environment")
-        except Exception:
-            pass
+    if env != "production" and load_dotenv_once():
+        log.info("Loaded .env file for local environment")
 
     # Expand JSON bundle (if present). This supports storing AWS vars in Secrets Manager
     raw = os.getenv(api_keys_env)
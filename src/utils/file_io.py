@@ -2,10 +2,13 @@ from __future__ import annotations
 
 """File I/O helpers for saving uploads and generating session IDs."""
 
+import hashlib
+import os
+import secrets
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterable, List
+from typing import Any, Iterable, Iterator, List
 from zoneinfo import ZoneInfo
 
 from src.utils.config_loader import get_supported_extensions
@@ -14,6 +17,11 @@ from src.utils.logger import GLOBAL_LOGGER as log
 
 SUPPORTED_EXTENSIONS = get_supported_extensions()
 
+_COPY_CHUNK = 1 << 20  # 1 MiB
+# Content-addressed store of saved uploads (hard links named by SHA-256)
+_BLOB_DIR = ".blobs"
+_SESSION_TZ = ZoneInfo("America/Los_Angeles")
+
 
 # ----------------------------- #
 # Helpers (file I/O + loading)  #
@@ -27,17 +35,138 @@ def generate_session_id(prefix: str = "session") -> str:
     Returns:
         A unique session identifier string.
     """
-    tz = ZoneInfo("America/Los_Angeles")
-    return (
-        f"{prefix}_{datetime.now(tz).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-    )
+    # token_hex(4): same 8 hex chars as a uuid4 prefix, without the UUID object
+    return f"{prefix}_{datetime.now(_SESSION_TZ):%Y%m%d_%H%M%S}_{secrets.token_hex(4)}"
+
+
+def _upload_source(uploaded: Any) -> Any:
+    """Return the synchronous byte source behind an upload object."""
+    if hasattr(uploaded, "open"):
+        return uploaded.open()
+    inner = getattr(uploaded, "file", None)
+    if inner is not None and hasattr(inner, "read"):
+        # Starlette/FastAPI UploadFile: read() is async, .file is the
+        # spooled temp file it wraps
+        if hasattr(inner, "seek"):
+            inner.seek(0)
+        return inner
+    return uploaded
+
+
+def _iter_upload(uploaded: Any) -> Iterator[bytes | memoryview]:
+    """Yield an upload's bytes in chunks without reading it all into memory.
+
+    Sources with ``readinto()`` are read into one reused buffer and yielded as
+    memoryview slices of it, each valid only until the next chunk is requested.
+    """
+    src = _upload_source(uploaded)
+    if hasattr(src, "readinto"):
+        buf = bytearray(_COPY_CHUNK)
+        view = memoryview(buf)
+        n = src.readinto(buf)
+        while n:
+            yield view[:n]
+            n = src.readinto(buf)
+    elif hasattr(src, "read"):
+        try:
+            chunk = src.read(_COPY_CHUNK)
+        except TypeError:
+            # read() without a size argument: whole payload at once
+            yield src.read()
+            return
+        while chunk:
+            yield chunk
+            chunk = src.read(_COPY_CHUNK)
+    else:
+        yield bytes(src.getbuffer())  # fallback
+
+
+def stream_upload(uploaded: Any, out: Path) -> str:
+    """Write an upload to ``out`` in chunks and return its SHA-256 hex digest."""
+    h = hashlib.sha256()
+    with open(out, "wb") as f:
+        for chunk in _iter_upload(uploaded):
+            h.update(chunk)
+            f.write(chunk)
+    return h.hexdigest()
+
+
+def _blob_path(index_dir: Path, digest: str) -> Path:
+    return Path(index_dir) / _BLOB_DIR / digest
+
+
+def save_upload_dedup(uploaded: Any, save_path: Path, index_dir: Path) -> Path:
+    """Save an upload to ``save_path``, reusing identical content already stored.
+
+    The upload is hashed while it streams to a temp file. ``index_dir/.blobs``
+    holds one hard link per stored content, named by its SHA-256 digest: when
+    that blob exists, ``save_path`` becomes another link to it and the temp
+    file is dropped, so a lookup is a single ``stat``. Otherwise the temp file
+    is published as the blob and moved to ``save_path``. Linking is atomic, so
+    concurrent workers need no lock. If linking fails (e.g. across devices)
+    the new copy is kept.
+
+    Args:
+        uploaded: Upload exposing ``open()``, ``.file``, ``read()`` or
+            ``getbuffer()``.
+        save_path: Destination path for this upload.
+        index_dir: Directory whose blob store is shared by related sessions.
+
+    Returns:
+        ``save_path``.
+    """
+    save_path = Path(save_path)
+    tmp = save_path.with_name(f".{save_path.name}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        digest = stream_upload(uploaded, tmp)
+        blob = _blob_path(index_dir, digest)
+        if blob.exists():
+            try:
+                if save_path.exists() and os.path.samefile(blob, save_path):
+                    return save_path  # same content already at this path
+                save_path.unlink(missing_ok=True)
+                os.link(blob, save_path)
+                log.info(
+                    "Duplicate upload linked", saved_as=str(save_path), blob=str(blob)
+                )
+                return save_path
+            except OSError:
+                pass
+        else:
+            try:
+                blob.parent.mkdir(exist_ok=True)
+                os.link(tmp, blob)  # FileExistsError if another worker won
+            except OSError:
+                pass
+        os.replace(tmp, save_path)
+        return save_path
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def prune_upload_blobs(index_dir: Path) -> int:
+    """Delete blobs no session file links to any more; return how many.
+
+    A blob whose link count is 1 is referenced only by the blob store itself
+    (its session folders were removed), so its bytes can be freed.
+    """
+    removed = 0
+    try:
+        with os.scandir(Path(index_dir) / _BLOB_DIR) as it:
+            for entry in it:
+                if entry.is_file() and entry.stat().st_nlink <= 1:
+                    Path(entry.path).unlink(missing_ok=True)
+                    removed += 1
+    except FileNotFoundError:
+        pass
+    return removed
 
 
 def save_uploaded_files(uploaded_files: Iterable[Any], target_dir: Path) -> List[Path]:
     """Persist uploaded files to disk and return their local paths.
 
-    This accepts objects that expose either a ``read()`` method (like FastAPI's
-    UploadFile) or a ``getbuffer()`` method (as in our adapters).
+    This accepts FastAPI's UploadFile (streamed from its ``.file``), objects
+    with a ``read()`` method, or a ``getbuffer()`` method (as in our adapters).
 
     Args:
         uploaded_files: An iterable of uploaded file-like objects.
@@ -55,14 +184,20 @@ def save_uploaded_files(uploaded_files: Iterable[Any], target_dir: Path) -> List
             if ext not in SUPPORTED_EXTENSIONS:
                 log.warning("Unsupported file skipped", filename=name)
                 continue
-            # Save using a random name to avoid collisions while keeping extension
-            fname = f"{uuid.uuid4().hex[:8]}{ext}"
-            out = target_dir / fname
-            with open(out, "wb") as f:
-                if hasattr(uf, "read"):
-                    f.write(uf.read())
+            # Stream to a temp name while hashing, then name the file by its
+            # content so a re-upload maps to the same path (and FAISS rows)
+            tmp = target_dir / f".{uuid.uuid4().hex[:8]}{ext}.part"
+            try:
+                digest = stream_upload(uf, tmp)
+                out = target_dir / f"{digest[:16]}{ext}"
+                if out.exists():
+                    log.info("Duplicate upload reused", uploaded=name)
                 else:
-                    f.write(uf.getbuffer())  # fallback
+                    os.replace(tmp, out)
+            finally:
+                tmp.unlink(missing_ok=True)
+            if out in saved:
+                continue
             saved.append(out)
             log.info("File saved for ingestion", uploaded=name, saved_as=str(out))
         return saved
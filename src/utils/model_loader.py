@@ -1,24 +1,32 @@
 """Helpers to load embeddings and LLMs based on config + environment."""
 
+import atexit
+import functools
+import hashlib
 import json
+import logging
 import os
+import queue
 import sys
-from typing import List
-
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_groq import ChatGroq
-from langchain_openai import (
-    AzureChatOpenAI,
-    AzureOpenAIEmbeddings,
-    ChatOpenAI,
-    OpenAIEmbeddings,
-)
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings
 
 from src.utils.config_loader import load_config
+from src.utils.env_bootstrap import load_dotenv_once
 from src.utils.exception.custom_exception import DocumentPortalException
 from src.utils.logger.custom_logging import CustomLogger
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 def maybe_wrap_llm(
     llm, provider: str, model: str
@@ -28,6 +36,98 @@ def maybe_wrap_llm(
 
 log = CustomLogger().get_logger(__name__)
 
+_LLM_CACHE_READY = False
+
+# Credentials each provider's client is built from, by provider key
+_EMBEDDING_SECRETS = {
+    "google": ("GOOGLE_API_KEY",),
+    "openai": ("OPENAI_API_KEY",),
+    "azure-openai": (
+        "AZURE_OPENAI_API_KEY",
+        "AZURE_OPENAI_API_INSTANCE_NAME",
+        "AZURE_OPENAI_API_VERSION",
+        "AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME",
+    ),
+}
+_LLM_SECRETS = {
+    "google": ("GOOGLE_API_KEY",),
+    "groq": ("GROQ_API_KEY",),
+    "openai": ("OPENAI_API_KEY",),
+    "azure-openai": (
+        "AZURE_OPENAI_API_KEY",
+        "AZURE_OPENAI_API_INSTANCE_NAME",
+        "AZURE_OPENAI_API_DEPLOYMENT_NAME",
+        "AZURE_OPENAI_API_VERSION",
+    ),
+}
+
+# Built clients keyed by (kind, provider, model settings, credential digest):
+# every ModelLoader reuses one SDK client (and its connection pool) per
+# configuration, and rotated credentials produce a new key.
+_CLIENTS: Dict[tuple, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Provider/model a loaded LLM was built for, attached to it as ``_dp_meta``
+_ProviderMeta = namedtuple("_ProviderMeta", ["provider", "model_name"])
+_NO_META = _ProviderMeta(None, None)
+
+
+def llm_meta(llm: Any) -> _ProviderMeta:
+    """Return the provider/model metadata load_llm() attached to ``llm``."""
+    return getattr(llm, "_dp_meta", None) or _NO_META
+
+
+def _credential_digest(api_keys: "ApiKeyManager", names: tuple) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    for value in api_keys.get_many(names).values():
+        h.update(value.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _maybe_enable_llm_cache(config: Dict[str, Any]) -> None:
+    """Install an exact-match LLM cache when enabled.
+
+    ``ai.response_cache.llm_calls`` selects ``memory`` (bounded, in-process) or
+    ``sqlite``; env DP_LLM_CACHE overrides it (``1``/``sqlite``, ``memory`` or
+    ``0``). Runs once per process and never replaces a cache that is already
+    set (e.g. the Redis semantic cache installed at API startup).
+    """
+    global _LLM_CACHE_READY
+    if _LLM_CACHE_READY:
+        return
+    _LLM_CACHE_READY = True
+    cache_cfg = config.get("ai", {}).get("response_cache", {})
+    mode = os.getenv("DP_LLM_CACHE") or str(cache_cfg.get("llm_calls", "off"))
+    mode = {"1": "sqlite", "0": "off"}.get(mode, mode.lower())
+    if mode not in ("memory", "sqlite"):
+        return
+    try:
+        from langchain.globals import get_llm_cache, set_llm_cache
+
+        if get_llm_cache() is not None:
+            log.info("LLM cache already configured; skipping", mode=mode)
+            return
+        if mode == "memory":
+            from langchain_core.caches import InMemoryCache
+
+            maxsize = int(cache_cfg.get("llm_calls_maxsize", 1024))
+            set_llm_cache(InMemoryCache(maxsize=maxsize))
+            log.info("In-memory LLM cache enabled", maxsize=maxsize)
+            return
+        from langchain_community.cache import SQLiteCache
+
+        path = os.getenv("DP_LLM_CACHE_PATH", ".llm_cache.db")
+        set_llm_cache(SQLiteCache(database_path=path))
+        log.info("SQLite LLM cache enabled", path=path)
+    except Exception as e:
+        log.warning("Failed to enable LLM cache", mode=mode, error=str(e))
+
+
+@functools.lru_cache(maxsize=8)
+def _azure_endpoint(instance: str) -> str:
+    return f"https://{instance}.openai.azure.com/"
+
 
 class ApiKeyManager:
     """Centralized API key/env var loader with JSON bundle support.
@@ -46,7 +146,7 @@ class ApiKeyManager:
         raw = os.getenv(env_name)
         if raw:
             try:
-                parsed = json.loads(raw)
+                parsed = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 if not isinstance(parsed, dict):
                     raise ValueError("API keys env is not a valid JSON object")
                 for k, v in parsed.items():
@@ -60,15 +160,25 @@ class ApiKeyManager:
 
         # Minimal fallback: individual env vars for configured keys only
         for key in self._known_keys:
-            if key not in self._store and os.getenv(key):
-                self._store[key] = os.getenv(key, "")
+            if key not in self._store:
+                val = os.getenv(key)
+                if val:
+                    self._store[key] = val
 
-        masked = {k: (v[:6] + "..." if v else "") for k, v in self._store.items() if v}
-        if masked:
-            log.info("API keys loaded", keys=masked)
+        # Mask only when the INFO line would actually be emitted
+        if logging.getLogger(__name__).isEnabledFor(logging.INFO):
+            masked = {k: v[:6] + "..." for k, v in self._store.items() if v}
+            if masked:
+                log.info("API keys loaded", keys=masked)
 
     def get(self, key: str, default: str | None = None) -> str | None:
-        return self._store.get(key, os.getenv(key, default))
+        val = self._store.get(key)
+        return val if val is not None else os.getenv(key, default)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return {key: value} for several keys in one pass ("" when unset)."""
+        store = self._store
+        return {k: store.get(k) or os.getenv(k, "") for k in keys}
 
     def require(self, keys: str | List[str]) -> str | None:
         """Ensure required env var(s) exist.
@@ -85,191 +195,491 @@ class ApiKeyManager:
                 )
             return val
 
-        missing = [k for k in keys if not self.get(k)]
+        self.require_many(keys)
+        return None
+
+    def require_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Like get_many(), but raise if any key is missing or empty."""
+        values = self.get_many(keys)
+        missing = [k for k, v in values.items() if not v]
         if missing:
             log.error("Missing required keys", missing_keys=missing)
             raise DocumentPortalException("Missing required API keys/vars", sys)
-        return None
+        return values
+
+
+@functools.lru_cache(maxsize=1)
+def get_api_key_manager() -> ApiKeyManager:
+    """Process-wide ApiKeyManager; the API_KEYS bundle is parsed once."""
+    return ApiKeyManager()
+
+
+# ---------- Provider builders ----------
+# Each takes the provider's credentials (already validated) and model settings.
+# Provider SDKs are imported only for the provider actually in use.
+
+
+def _google_embeddings(keys: Dict[str, str], model_name: str):
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(
+        model=model_name, google_api_key=keys["GOOGLE_API_KEY"]
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _http_clients() -> Dict[str, Any]:
+    """Shared httpx client for the OpenAI/Azure wrappers (empty without httpx).
+
+    One sync pool per process, so LLM and embedding calls to the same host
+    reuse keep-alive connections instead of each SDK client opening its own.
+    No async client is shared: an httpx.AsyncClient is bound to the event loop
+    that first uses it, and callers such as ConversationalRAG.batch() run a new
+    loop per call, so the SDK keeps building its own async client.
+    """
+    try:
+        import httpx  # type: ignore
+    except Exception:  # pragma: no cover
+        return {}
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    client = httpx.Client(limits=limits, timeout=60)
+    atexit.register(client.close)
+    return {"http_client": client}
+
+
+def _openai_embeddings(keys: Dict[str, str], model_name: str):
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=model_name, openai_api_key=keys["OPENAI_API_KEY"], **_http_clients()
+    )
+
+
+def _azure_embeddings(keys: Dict[str, str], model_name: str):
+    # For Azure embeddings, you must set a dedicated embedding deployment;
+    # use the Azure-specific embeddings wrapper per docs
+    from langchain_openai import AzureOpenAIEmbeddings
+
+    return AzureOpenAIEmbeddings(
+        model=model_name,
+        azure_endpoint=_azure_endpoint(keys["AZURE_OPENAI_API_INSTANCE_NAME"]),
+        azure_deployment=keys["AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME"],
+        openai_api_version=keys["AZURE_OPENAI_API_VERSION"],
+        api_key=keys["AZURE_OPENAI_API_KEY"],
+        **_http_clients(),
+    )
+
+
+def _google_llm(
+    keys: Dict[str, str], model_name: str, temperature: float, max_tokens: int
+):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+        google_api_key=keys["GOOGLE_API_KEY"],
+    )
+
+
+def _groq_llm(keys: Dict[str, str], model_name: str, temperature: float, _: int):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        model=model_name, api_key=keys["GROQ_API_KEY"], temperature=temperature
+    )
+
+
+def _openai_llm(
+    keys: Dict[str, str], model_name: str, temperature: float, max_tokens: int
+):
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model_name,
+        api_key=keys["OPENAI_API_KEY"],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **_http_clients(),
+    )
+
+
+def _azure_llm(
+    keys: Dict[str, str], model_name: str, temperature: float, max_tokens: int
+):
+    # Azure OpenAI chat via Azure-specific wrapper per docs
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        azure_endpoint=_azure_endpoint(keys["AZURE_OPENAI_API_INSTANCE_NAME"]),
+        azure_deployment=keys["AZURE_OPENAI_API_DEPLOYMENT_NAME"],
+        openai_api_version=keys["AZURE_OPENAI_API_VERSION"],
+        openai_api_key=keys["AZURE_OPENAI_API_KEY"],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **_http_clients(),
+    )
+
+
+_EMBEDDING_BUILDERS = {
+    "google": _google_embeddings,
+    "openai": _openai_embeddings,
+    "azure-openai": _azure_embeddings,
+}
+# Providers whose embed_query(text) equals embed_documents([text])[0]; Google
+# embeds queries and documents with different task types, so it is excluded
+_BATCHABLE_EMBEDDINGS = frozenset({"openai", "azure-openai"})
+
+
+class _BatchingEmbeddings(Embeddings):
+    """Coalesce concurrent embed_query() calls into one embed_documents() call.
+
+    Queries queued within ``window_s`` of the first one (up to ``batch_size``)
+    are embedded by a background thread in a single request; everything else
+    is delegated to the wrapped model.
+    """
+
+    def __init__(self, inner: Embeddings, batch_size: int, window_s: float) -> None:
+        self._inner = inner
+        self._batch_size = batch_size
+        self._window_s = window_s
+        self._queue: queue.Queue = queue.Queue()
+        threading.Thread(target=self._run, name="embed-batcher", daemon=True).start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut.result()
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self._window_s
+            while len(items) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                vectors = self._inner.embed_documents([text for text, _ in items])
+            except Exception as e:
+                for _, fut in items:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), vector in zip(items, vectors):
+                fut.set_result(vector)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+_LLM_BUILDERS = {
+    "google": _google_llm,
+    "groq": _groq_llm,
+    "openai": _openai_llm,
+    "azure-openai": _azure_llm,
+}
+
+
+# Back-compat: 'azure' is accepted, but config blocks are keyed 'azure-openai'
+_PROVIDER_ALIASES = {"azure": "azure-openai"}
+
+
+def normalize_provider(provider_key: str | None) -> str | None:
+    """Map provider aliases (e.g. 'azure') to their config/builder key."""
+    return _PROVIDER_ALIASES.get(provider_key, provider_key)
+
+
+_EnvSnapshot = namedtuple(
+    "_EnvSnapshot", ["env", "llm_provider", "embedding_provider", "chat_provider"]
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _env_settings() -> _EnvSnapshot:
+    """Provider-related env vars, read and normalized once.
+
+    Resolved on first use rather than at import, so values loaded from .env
+    at startup are seen. Call _refresh_env() after changing them at runtime.
+    """
+    llm_provider = os.getenv("LLM_PROVIDER")
+    return _EnvSnapshot(
+        env=os.getenv("ENV", "local").lower(),
+        llm_provider=normalize_provider(llm_provider),
+        embedding_provider=normalize_provider(os.getenv("EMBEDDING_PROVIDER")),
+        chat_provider=os.getenv("CHAT_PROVIDER", llm_provider or "openai"),
+    )
+
+
+def chat_provider() -> str:
+    """Provider for usage/cost attribution: CHAT_PROVIDER, else LLM_PROVIDER."""
+    return _env_settings().chat_provider
+
+
+def _refresh_env() -> None:
+    _env_settings.cache_clear()
+
+
+_DOTENV_LOADED = False
+
+
+def _ensure_dotenv() -> None:
+    """Load .env once per process outside production (prod relies on env/Secrets)."""
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    _DOTENV_LOADED = True
+    if _env_settings().env != "production":
+        load_dotenv_once()
+        _refresh_env()  # providers may come from .env
+        log.info("Running in LOCAL mode: .env loaded")
+    else:
+        log.info("Running in PRODUCTION mode")
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderSpec:
+    """Resolved provider settings for one model kind (LLM or embeddings)."""
+
+    provider_key: str
+    model_name: str | None
+    temperature: float | None = None
+    max_tokens: int | None = None
 
 
 class ModelLoader:
     """Load embedding and LLM models configured via YAML and env vars."""
 
     def __init__(self) -> None:
-        # Only load .env locally; in prod rely on env/Secrets
-        if os.getenv("ENV", "local").lower() != "production":
-            load_dotenv()
-            log.info("Running in LOCAL mode: .env loaded")
-        else:
-            log.info("Running in PRODUCTION mode")
+        _ensure_dotenv()
 
-        self.api_keys = ApiKeyManager()
+        self.api_keys = get_api_key_manager()
         self.config = load_config()
+        # ProviderSpec per kind ("llm"/"embeddings"), resolved on first use so
+        # an embeddings-only caller does not need LLM settings
+        self._specs: Dict[str, ProviderSpec] = {}
         log.info(
             "Configuration loaded successfully", config_keys=list(self.config.keys())
         )
 
-    def load_embeddings(self):
-        """Load and return the embedding model based on provider configuration."""
-        try:
-            log.info("Loading embedding model...")
-
-            embedding_block = self.config["ai"]["embedding_model"]
-
+    def _spec(self, kind: str) -> ProviderSpec:
+        spec = self._specs.get(kind)
+        if spec is not None:
+            return spec
+        if kind == "embeddings":
+            block = self.config["ai"]["embedding_model"]
             provider_key = self.api_keys.require("EMBEDDING_PROVIDER")
-            # Back-compat: allow 'azure' but prefer 'azure-openai' config key
-            if provider_key == "azure":
-                provider_key = "azure-openai"
-            if provider_key not in embedding_block:
+        else:
+            block = self.config["ai"]["llm"]
+            provider_key = self.api_keys.require("LLM_PROVIDER")
+        provider_key = normalize_provider(provider_key)
+        if provider_key not in block:
+            if kind == "embeddings":
                 log.error(
                     "Embedding provider not found in config", provider_key=provider_key
                 )
                 raise ValueError(
                     f"Embedding provider '{provider_key}' not found in config"
                 )
+            log.error("LLM provider not found in config", provider_key=provider_key)
+            raise ValueError(f"Provider '{provider_key}' not found in config")
+        cfg = block[provider_key]
+        if kind == "embeddings":
+            spec = ProviderSpec(provider_key, cfg.get("model_name"))
+        else:
+            spec = ProviderSpec(
+                provider_key,
+                cfg.get("model_name"),
+                cfg.get("temperature", 0.2),
+                cfg.get("max_output_tokens", 2048),
+            )
+        self._specs[kind] = spec
+        return spec
 
-            embedding_config = embedding_block[provider_key]
-            model_name = embedding_config.get("model_name")
-
-            log.info("Loading embedding model", provider=provider_key, model=model_name)
+    def load_embeddings(self):
+        """Load and return the embedding model based on provider configuration.
 
-            if provider_key == "google":
-                self.api_keys.require(["GOOGLE_API_KEY"])
-                return GoogleGenerativeAIEmbeddings(
-                    model=model_name, google_api_key=self.api_keys.get("GOOGLE_API_KEY")
-                )
-            elif provider_key == "openai":
-                self.api_keys.require(["OPENAI_API_KEY"])
-                return OpenAIEmbeddings(
-                    model=model_name, openai_api_key=self.api_keys.get("OPENAI_API_KEY")
-                )
-            elif provider_key == "azure-openai":
-                # For Azure embeddings, you must set a dedicated embedding deployment
-                self.api_keys.require(
-                    [
-                        "AZURE_OPENAI_API_KEY",
-                        "AZURE_OPENAI_API_INSTANCE_NAME",
-                        "AZURE_OPENAI_API_VERSION",
-                        "AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME",
-                    ]
-                )
-                deployment = self.api_keys.get(
-                    "AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME"
-                )
-                api_key = self.api_keys.get("AZURE_OPENAI_API_KEY")
-                instance = self.api_keys.get("AZURE_OPENAI_API_INSTANCE_NAME")
-                api_version = self.api_keys.get("AZURE_OPENAI_API_VERSION")
-                azure_endpoint = f"https://{instance}.openai.azure.com/"
-                # Use Azure-specific embeddings wrapper per docs
-                return AzureOpenAIEmbeddings(
-                    model=model_name,
-                    azure_endpoint=azure_endpoint,
-                    azure_deployment=deployment,
-                    openai_api_version=api_version,
-                    api_key=api_key,
+        The client is built once per provider/model/credentials and reused by
+        later calls, from any ModelLoader.
+        """
+        try:
+            log.info("Loading embedding model...")
+            spec = self._spec("embeddings")
+            secrets = _EMBEDDING_SECRETS.get(spec.provider_key, ())
+            key = ("embeddings", spec, _credential_digest(self.api_keys, secrets))
+            with _CLIENTS_LOCK:
+                cached = _CLIENTS.get(key)
+            if cached is not None:
+                return cached
+
+            log.info(
+                "Loading embedding model",
+                provider=spec.provider_key,
+                model=spec.model_name,
+            )
+            emb = self._build_embeddings(spec.provider_key, spec.model_name)
+            block = self.config["ai"]["embedding_model"]
+            window_ms = float(block.get("batch_window_ms", 0) or 0)
+            if window_ms > 0 and spec.provider_key in _BATCHABLE_EMBEDDINGS:
+                batch_size = int(block.get("batch_size", 64))
+                emb = _BatchingEmbeddings(emb, batch_size, window_ms / 1000)
+                log.info(
+                    "Embedding query batching enabled",
+                    window_ms=window_ms,
+                    batch_size=batch_size,
                 )
-            else:
-                log.error("Unsupported embedding provider", provider=provider_key)
-                raise ValueError(f"Unsupported embedding provider: {provider_key}")
+            with _CLIENTS_LOCK:
+                return _CLIENTS.setdefault(key, emb)
 
         except Exception as e:
             log.error("Error loading embedding model", error=str(e))
             raise DocumentPortalException("Failed to load embedding model", sys)
 
-    def load_llm(self):
-        """Load and return the LLM model based on provider configuration."""
+    def _build_embeddings(self, provider_key: str, model_name: str | None):
+        builder = _EMBEDDING_BUILDERS.get(provider_key)
+        if builder is None:
+            log.error("Unsupported embedding provider", provider=provider_key)
+            raise ValueError(f"Unsupported embedding provider: {provider_key}")
+        return builder(
+            self.api_keys.require_many(_EMBEDDING_SECRETS[provider_key]), model_name
+        )
 
-        llm_block = self.config["ai"]["llm"]
+    def load_llm(self):
+        """Load and return the LLM model based on provider configuration.
 
+        Like load_embeddings(), the client is built once per provider, model
+        settings and credentials and then reused.
+        """
         log.info("Loading LLM...")
+        _maybe_enable_llm_cache(self.config)
 
-        provider_key = self.api_keys.require("LLM_PROVIDER")
-        # Back-compat: allow 'azure' but prefer 'azure-openai' config key
-        if provider_key == "azure":
-            provider_key = "azure-openai"
-        if provider_key not in llm_block:
-            log.error("LLM provider not found in config", provider_key=provider_key)
-            raise ValueError(f"Provider '{provider_key}' not found in config")
-
-        llm_config = llm_block[provider_key]
-        model_name = llm_config.get("model_name")
-        temperature = llm_config.get("temperature", 0.2)
-        max_tokens = llm_config.get("max_output_tokens", 2048)
+        spec = self._spec("llm")
+        secrets = _LLM_SECRETS.get(spec.provider_key, ())
+        key = ("llm", spec, _credential_digest(self.api_keys, secrets))
+        with _CLIENTS_LOCK:
+            cached = _CLIENTS.get(key)
+        if cached is not None:
+            return cached
 
         log.info(
             "Loading LLM",
-            provider=provider_key,
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
+            provider=spec.provider_key,
+            model=spec.model_name,
+            temperature=spec.temperature,
+            max_tokens=spec.max_tokens,
         )
-
-        if provider_key == "google":
-            self.api_keys.require(["GOOGLE_API_KEY"])
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                google_api_key=self.api_keys.get("GOOGLE_API_KEY"),
-            )
-            # attach metadata
-            setattr(llm, "_dp_provider", provider_key)
-            setattr(llm, "_dp_model_name", model_name)
-            return llm
-
-        elif provider_key == "groq":
-            self.api_keys.require(["GROQ_API_KEY"])
-            llm = ChatGroq(
-                model=model_name,
-                api_key=self.api_keys.get("GROQ_API_KEY"),
-                temperature=temperature,
-            )
-            setattr(llm, "_dp_provider", provider_key)
-            setattr(llm, "_dp_model_name", model_name)
-            return llm
-
-        elif provider_key == "openai":
-            self.api_keys.require(["OPENAI_API_KEY"])
-            llm = ChatOpenAI(
-                model=model_name,
-                api_key=self.api_keys.get("OPENAI_API_KEY"),
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            setattr(llm, "_dp_provider", provider_key)
-            setattr(llm, "_dp_model_name", model_name)
-            return llm
-
-        elif provider_key == "azure-openai":
-            # Azure OpenAI chat via Azure-specific wrapper per docs
-            self.api_keys.require(
-                [
-                    "AZURE_OPENAI_API_KEY",
-                    "AZURE_OPENAI_API_INSTANCE_NAME",
-                    "AZURE_OPENAI_API_DEPLOYMENT_NAME",
-                    "AZURE_OPENAI_API_VERSION",
-                ]
-            )
-            api_key = self.api_keys.get("AZURE_OPENAI_API_KEY")
-            instance = self.api_keys.get("AZURE_OPENAI_API_INSTANCE_NAME")
-            deployment = self.api_keys.get("AZURE_OPENAI_API_DEPLOYMENT_NAME")
-            api_version = self.api_keys.get("AZURE_OPENAI_API_VERSION")
-            azure_endpoint = f"https://{instance}.openai.azure.com/"
-            llm = AzureChatOpenAI(
-                azure_endpoint=azure_endpoint,
-                azure_deployment=deployment,
-                openai_api_version=api_version,
-                openai_api_key=api_key,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            setattr(llm, "_dp_provider", provider_key)
-            setattr(llm, "_dp_model_name", model_name)
-            return llm
-
-        else:
+        llm = self._build_llm(
+            spec.provider_key, spec.model_name, spec.temperature, spec.max_tokens
+        )
+        # attach metadata
+        llm._dp_meta = _ProviderMeta(spec.provider_key, spec.model_name)
+        with _CLIENTS_LOCK:
+            return _CLIENTS.setdefault(key, llm)
+
+    def _build_llm(
+        self,
+        provider_key: str,
+        model_name: str | None,
+        temperature: float | None,
+        max_tokens: int | None,
+    ):
+        builder = _LLM_BUILDERS.get(provider_key)
+        if builder is None:
             log.error("Unsupported LLM provider", provider=provider_key)
             raise ValueError(f"Unsupported LLM provider: {provider_key}")
+        keys = self.api_keys.require_many(_LLM_SECRETS[provider_key])
+        return builder(keys, model_name, temperature, max_tokens)
+
+
+# Shared model clients, one per provider, so the analyzer, comparator and RAG
+# chain reuse a single instance instead of each building their own.
+_LLM_LOCK = threading.Lock()
+_EMBEDDINGS_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_llm(provider: str | None):
+    return ModelLoader().load_llm()
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_embeddings(provider: str | None):
+    return ModelLoader().load_embeddings()
+
+
+def get_llm():
+    """Return the process-wide LLM for the configured LLM_PROVIDER."""
+    with _LLM_LOCK:
+        return _shared_llm(_env_settings().llm_provider)
+
+
+def get_embeddings():
+    """Return the process-wide embeddings for the configured EMBEDDING_PROVIDER."""
+    with _EMBEDDINGS_LOCK:
+        return _shared_embeddings(_env_settings().embedding_provider)
+
+
+def clear_shared_models() -> None:
+    """Drop shared models, built clients and keys so the next call rebuilds them."""
+    get_api_key_manager.cache_clear()
+    _refresh_env()
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+    with _LLM_LOCK:
+        _shared_llm.cache_clear()
+    with _EMBEDDINGS_LOCK:
+        _shared_embeddings.cache_clear()
+
+
+def _warm_tokenizer() -> None:
+    """Load the tokenizer used for usage accounting of the configured LLM."""
+    from src.utils.token_counter import count_tokens
+
+    env = _env_settings()
+    llm_cfg = load_config().get("ai", {}).get("llm", {}).get(env.llm_provider, {})
+    count_tokens(env.chat_provider, llm_cfg.get("model_name") or "", "warmup")
+
+
+def _warm(name: str, fn) -> None:
+    try:
+        fn()
+        log.info("Model warmup complete", model=name)
+    except Exception as e:
+        # Not fatal: the request path retries the load and reports errors
+        log.warning("Model warmup failed", model=name, error=str(e))
+
+
+def warmup() -> None:
+    """Build the shared LLM and embeddings so the first request finds them ready.
+
+    The LLM, embeddings and tokenizer load concurrently: each is dominated by
+    imports and client/encoding setup that overlap well across threads.
+    """
+    _ensure_dotenv()  # once, before the workers read provider settings
+    tasks = (
+        ("llm", get_llm),
+        ("embeddings", get_embeddings),
+        ("tokenizer", _warm_tokenizer),
+    )
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        for name, fn in tasks:
+            pool.submit(_warm, name, fn)
+
+
+def start_warmup() -> threading.Thread | None:
+    """Run warmup() in a daemon thread unless DP_WARMUP=0."""
+    if os.getenv("DP_WARMUP", "1") != "1":
+        return None
+    t = threading.Thread(target=warmup, name="model-warmup", daemon=True)
+    t.start()
+    return t
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""Content-addressed cache for LLM responses, shared across sessions.
+
+Keys combine the flow, model name, PROMPT_VERSION and a BLAKE3 fingerprint
+of the input text (blake2b when the blake3 package is unavailable), so an
+identical document analyzed by any session is answered from cache and a
+prompt change invalidates old entries. Values are JSON.
+
+Backend: Redis when REDIS_URL is configured (shared by all workers),
+otherwise the in-process TTL cache. Redis errors are logged and treated as
+cache misses (and Redis is skipped for a short back-off) so the request path
+never fails or stalls because of the cache.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import time
+from typing import Any
+
+from src.ai.prompt.prompt_library import PROMPT_VERSION
+from src.utils.config_loader import load_config
+from src.utils.logger import GLOBAL_LOGGER as log
+from src.utils.ttl_cache import TTLCache
+
+try:
+    import blake3  # type: ignore
+except Exception:  # pragma: no cover
+    blake3 = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+_REDIS_BACKOFF_SECONDS = 30.0
+
+
+def fingerprint(text: str) -> str:
+    data = text.encode("utf-8", "surrogatepass")
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def make_key(flow: str, model_name: str, text: str) -> str:
+    return f"dp:resp:{flow}:{model_name}:v{PROMPT_VERSION}:{fingerprint(text)}"
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class ResponseCache:
+    def __init__(
+        self, redis_url: str | None = None, ttl: float = 86400, maxsize: int = 256
+    ):
+        self.ttl = ttl
+        self._redis = None
+        self._down_until = 0.0
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        if redis_url:
+            try:
+                import redis  # type: ignore
+
+                self._redis = redis.Redis.from_url(
+                    redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            except Exception as e:
+                log.warning("Response cache Redis unavailable", error=str(e))
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    def _redis_usable(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._down_until
+
+    def _redis_failed(self, op: str, e: Exception) -> None:
+        self._down_until = time.monotonic() + _REDIS_BACKOFF_SECONDS
+        log.warning(f"Response cache {op} failed", error=str(e))
+
+    def get(self, key: str) -> Any:
+        if self._redis is None:
+            return self._local.get(key)
+        if not self._redis_usable():
+            return None
+        try:
+            raw = self._redis.get(key)
+        except Exception as e:
+            self._redis_failed("get", e)
+            return None
+        return _loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        if self._redis is None:
+            self._local.set(key, value)
+            return
+        if not self._redis_usable():
+            return
+        try:
+            self._redis.set(key, _dumps(value), ex=int(self.ttl))
+        except Exception as e:
+            self._redis_failed("set", e)
+
+
+@functools.lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide response cache, or None when disabled."""
+    rc_cfg = load_config().get("ai", {}).get("response_cache", {})
+    if not rc_cfg.get("enabled", True):
+        return None
+    try:
+        from src.utils.model_loader import get_api_key_manager
+
+        redis_url = get_api_key_manager().get("REDIS_URL")
+    except Exception:
+        redis_url = os.getenv("REDIS_URL")
+    cache = ResponseCache(
+        redis_url=redis_url,
+        ttl=float(rc_cfg.get("shared_ttl_seconds", 86400)),
+        maxsize=int(rc_cfg.get("maxsize", 256)),
+    )
+    log.info("Response cache initialized", backend=cache.backend)
+    return cache
@@ -1,6 +1,8 @@
+import functools
 import os
 from urllib.parse import urlparse
 
+from src.utils.env_bootstrap import load_dotenv_once
 from src.utils.logger import GLOBAL_LOGGER as log
 
 
@@ -9,65 +11,73 @@ def _load_embeddings_for_provider(cfg: dict, provider: str):
 
     Supports providers: "openai", "google", "azure-openai" ("azure" alias allowed).
     Reads model name from cfg["ai"]["embedding_model"][provider].model_name and
-    validates required env vars via ApiKeyManager.
+    builds it with ModelLoader's provider builders, validating the required
+    env vars via ApiKeyManager.
     """
     # Late import to avoid heavy deps if not used
-    from src.utils.model_loader import ApiKeyManager
-
-    if provider == "azure":
-        provider = "azure-openai"
+    from src.utils.model_loader import (
+        _EMBEDDING_BUILDERS,
+        _EMBEDDING_SECRETS,
+        get_api_key_manager,
+        normalize_provider,
+    )
 
+    provider = normalize_provider(provider)
     embedding_block = cfg.get("ai", {}).get("embedding_model", {})
     if provider not in embedding_block:
         raise ValueError(
             f"Embedding provider '{provider}' not found in config.ai.embedding_model"
         )
+    builder = _EMBEDDING_BUILDERS.get(provider)
+    if builder is None:
+        raise ValueError(f"Unsupported embedding provider: {provider}")
 
-    model_name = embedding_block[provider].get("model_name")
-    keys = ApiKeyManager()
+    keys = get_api_key_manager().require_many(_EMBEDDING_SECRETS[provider])
+    return builder(keys, embedding_block[provider].get("model_name"))
 
-    if provider == "openai":
-        keys.require(["OPENAI_API_KEY"])
-        from langchain_openai import OpenAIEmbeddings
 
-        return OpenAIEmbeddings(
-            model=model_name, openai_api_key=keys.get("OPENAI_API_KEY")
-        )
+# Set once a semantic cache has been installed; repeat init calls (workers,
+# tests, app startup) then return without building another cache
+_CACHE_INITIALIZED = False
 
-    if provider == "google":
-        keys.require(["GOOGLE_API_KEY"])
-        from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-        return GoogleGenerativeAIEmbeddings(
-            model=model_name, google_api_key=keys.get("GOOGLE_API_KEY")
-        )
+def reset_semantic_cache() -> None:
+    """Allow the next init_semantic_cache() call to install a new cache."""
+    global _CACHE_INITIALIZED
+    _CACHE_INITIALIZED = False
 
-    if provider == "azure-openai":
-        # Azure embeddings require a dedicated embedding deployment name
-        keys.require(
-            [
-                "AZURE_OPENAI_API_KEY",
-                "AZURE_OPENAI_API_INSTANCE_NAME",
-                "AZURE_OPENAI_API_VERSION",
-                "AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME",
-            ]
-        )
-        from langchain_openai import AzureOpenAIEmbeddings
-
-        deployment = keys.get("AZURE_OPENAI_API_EMBEDDING_DEPLOYMENT_NAME")
-        api_key = keys.get("AZURE_OPENAI_API_KEY")
-        instance = keys.get("AZURE_OPENAI_API_INSTANCE_NAME")
-        api_version = keys.get("AZURE_OPENAI_API_VERSION")
-        azure_endpoint = f"https://{instance}.openai.azure.com/"
-        return AzureOpenAIEmbeddings(
-            model=model_name,
-            azure_endpoint=azure_endpoint,
-            azure_deployment=deployment,
-            openai_api_version=api_version,
-            api_key=api_key,
-        )
 
-    raise ValueError(f"Unsupported embedding provider: {provider}")
+@functools.lru_cache(maxsize=8)
+def _safe_redis_host(redis_url: str) -> str:
+    """scheme://host[:port] of a Redis URL, without credentials, for logging."""
+    try:
+        p = urlparse(redis_url)
+        port = p.port
+    except Exception:
+        return "(unparsed)"
+    return f"{p.scheme}://{p.hostname or '?'}{f':{port}' if port else ''}"
+
+
+@functools.lru_cache(maxsize=1)
+def _semantic_cache_cls() -> tuple[type, bool]:
+    """Resolve the RedisSemanticCache class once: (class, accepts redis_client)."""
+    # Try dedicated package submodule first; fallback to community cache
+    try:
+        from langchain_redis.cache import RedisSemanticCache  # type: ignore
+
+        return RedisSemanticCache, True
+    except Exception:
+        from langchain_community.cache import RedisSemanticCache  # type: ignore
+
+        return RedisSemanticCache, False
+
+
+@functools.lru_cache(maxsize=4)
+def _redis_client(redis_url: str):
+    """Process-wide Redis client (and connection pool) per URL."""
+    from redis import Redis
+
+    return Redis.from_url(redis_url, max_connections=32)
 
 
 def init_semantic_cache(
@@ -78,17 +88,15 @@ def init_semantic_cache(
     This sets a global cache via langchain.globals.set_llm_cache().
     embedding_provider: one of "openai", "google", "azure-openai".
     If cfg is provided, the embedding model_name is read from it; otherwise defaults may be used.
+    No-op once a cache is installed (see reset_semantic_cache()).
     """
+    global _CACHE_INITIALIZED
+    if _CACHE_INITIALIZED:
+        return
     try:
         from langchain.globals import set_llm_cache
 
-        # Try dedicated package submodule first; fallback to community cache
-        try:
-            from langchain_redis.cache import RedisSemanticCache  # type: ignore
-        except Exception:
-            from langchain_community.cache import (  # type: ignore
-                RedisSemanticCache,
-            )
+        cache_cls, accepts_client = _semantic_cache_cls()
 
         if cfg is None:
             # Minimal fallback: construct a tiny cfg from env provider
@@ -103,20 +111,15 @@ def init_semantic_cache(
             if k in cache_cfg:
                 extras[k] = cache_cfg[k]
 
-        cache = RedisSemanticCache(redis_url=redis_url, embeddings=emb, **extras)  # type: ignore
+        if accepts_client:
+            # Reuse one connection pool instead of a new client per init
+            extras["redis_client"] = _redis_client(redis_url)
+        cache = cache_cls(redis_url=redis_url, embeddings=emb, **extras)
+        _CACHE_INITIALIZED = True
         set_llm_cache(cache)
-        # Avoid logging full redis_url (may include credentials). Log sanitized host only.
-        try:
-            _p = urlparse(redis_url)
-            _host = _p.hostname or "?"
-            _port = _p.port
-            _scheme = _p.scheme
-            _safe = f"{_scheme}://{_host}{(':' + str(_port)) if _port else ''}"
-        except Exception:
-            _safe = "(unparsed)"
         log.info(
             "Semantic cache initialized",
-            redis_host=_safe,
+            redis_host=_safe_redis_host(redis_url),
             embedding_provider=embedding_provider,
         )
     except Exception as e:
@@ -125,19 +128,12 @@ def init_semantic_cache(
 
 def maybe_init_semantic_cache(cfg: dict) -> None:
     """Initialize Redis semantic cache if enabled in config."""
-    # Load local .env in non-production environments
-    try:
-        if os.getenv("ENV", "local").lower() != "production":
-            try:
-                from dotenv import load_dotenv  # type: ignore
-
-                load_dotenv()
-                log.info("Loaded .env for semantic cache initialization")
-            except Exception:
-                # If dotenv missing, continue; env may already be set by other means
-                pass
-    except Exception:
-        pass
+    if _CACHE_INITIALIZED:
+        return
+    is_prod = os.getenv("ENV", "local").lower() == "production"
+    # Load local .env in non-production environments (no-op if already loaded)
+    if not is_prod and load_dotenv_once():
+        log.info("Loaded .env for semantic cache initialization")
 
     ai_cfg = cfg.get("ai", {})
     cache_cfg = ai_cfg.get("semantic_cache", {})
@@ -149,10 +145,11 @@ def maybe_init_semantic_cache(cfg: dict) -> None:
     # Prefer secure secret loading: API_KEYS bundle -> env -> YAML fallback
     redis_url: str | None = None
     _redis_source = ""
+    _akm = None
     try:
-        from src.utils.model_loader import ApiKeyManager
+        from src.utils.model_loader import get_api_key_manager
 
-        _akm = ApiKeyManager()
+        _akm = get_api_key_manager()
         redis_url = _akm.get("REDIS_URL")
         if redis_url:
             _redis_source = "secret"
@@ -170,7 +167,7 @@ def maybe_init_semantic_cache(cfg: dict) -> None:
             _redis_source = "yaml"
 
     # In production, avoid silently falling back to localhost if no secret/env was provided
-    if os.getenv("ENV", "local").lower() == "production" and _redis_source == "yaml":
+    if is_prod and _redis_source == "yaml":
         # Log a concise warning and skip semantic cache init to avoid misleading failures
         log.warning(
             "Semantic cache not initialized: REDIS_URL missing in secrets/env; skipping in production"
@@ -180,9 +177,7 @@ def maybe_init_semantic_cache(cfg: dict) -> None:
     provider = cache_cfg.get("embedding_provider", "openai")
     # Allow overriding provider via secrets/env (e.g., EMBEDDING_PROVIDER=azure-openai)
     try:
-        from src.utils.model_loader import ApiKeyManager as _AKM
-
-        _prov_override = _AKM().get("EMBEDDING_PROVIDER")
+        _prov_override = _akm.get("EMBEDDING_PROVIDER") if _akm else None
     except Exception:
         _prov_override = None
     if not _prov_override:
@@ -191,22 +186,11 @@ def maybe_init_semantic_cache(cfg: dict) -> None:
         )
     if _prov_override:
         provider = _prov_override
-    # Normalize alias
-    if provider == "azure":
-        provider = "azure-openai"
     # Small debug to help ops understand where REDIS_URL was sourced from (no credentials included)
-    try:
-        _p = urlparse(redis_url)
-        _host = _p.hostname or "?"
-        _port = _p.port
-        _scheme = _p.scheme
-        _safe = f"{_scheme}://{_host}{(':' + str(_port)) if _port else ''}"
-    except Exception:
-        _safe = "(unparsed)"
     log.info(
         "Initializing semantic cache",
         redis_source=_redis_source,
-        redis_host=_safe,
+        redis_host=_safe_redis_host(redis_url),
         embedding_provider=provider,
     )
     init_semantic_cache(redis_url=redis_url, embedding_provider=provider, cfg=cfg)
@@ -11,42 +11,100 @@ Dependencies are optional; this module soft-fails to heuristic when missing.
 
 from __future__ import annotations
 
+import os
+import re
+from functools import lru_cache
+from typing import List, Sequence
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover
+    tiktoken = None  # type: ignore
+
+_OPENAI_PROVIDERS = {"openai", "azure-openai", "azure"}
+
+
+# o-series and 4o/4.1 use o200k_base; GPT-3.5/4 and the text-embedding-3 /
+# ada embeddings use cl100k_base
+_O200K_MODELS = re.compile(r"gpt-4o|gpt-4\.1|o1")
+
 
 def _openai_encoding_for_model(model: str) -> str:
-    name = (model or "").lower()
-    # o-series and 4o generally use o200k_base
-    if "gpt-4o" in name or "gpt-4.1" in name or "gpt-4.1" in name or "o1" in name:
+    if _O200K_MODELS.search((model or "").lower()):
         return "o200k_base"
-    # embeddings (text-embedding-3-*) use cl100k_base
-    if "text-embedding-3" in name or "text-embedding-ada" in name:
-        return "cl100k_base"
-    # default GPT-3.5/4 tokenizer
     return "cl100k_base"
 
 
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    return tiktoken.get_encoding(_openai_encoding_for_model(model))
+
+
 def _count_tokens_tiktoken(model: str, text: str) -> int | None:
+    if tiktoken is None:
+        return None
     try:
-        import tiktoken  # type: ignore
-
-        encoding_name = _openai_encoding_for_model(model)
-        enc = tiktoken.get_encoding(encoding_name)
-        return len(enc.encode(text or ""))
+        return len(_encoding(model).encode_ordinary(text or ""))
     except Exception:
         return None
 
 
+def _heuristic(text: str) -> int:
+    s = text or ""
+    return max(1, len(s) // 4) if s else 0
+
+
+def estimate_tokens_heuristic(texts: Sequence[str]) -> List[int]:
+    """Apply the len//4 heuristic (min 1 for non-empty text) to many texts.
+
+    Uses one vectorized NumPy pass over the lengths when NumPy is available.
+    """
+    if np is None or not texts:
+        return [_heuristic(t) for t in texts]
+    lengths = np.fromiter(
+        (len(t) if t else 0 for t in texts), dtype=np.int64, count=len(texts)
+    )
+    est = np.maximum(lengths // 4, 1)
+    est[lengths == 0] = 0
+    return est.tolist()
+
+
 def count_tokens(provider: str, model: str, text: str) -> int:
     """Count tokens for a given provider/model/text.
 
     Currently robust for OpenAI/Azure via tiktoken; falls back to heuristic otherwise.
     """
+    if not text:
+        return 0
     prov = (provider or "").lower()
     # Treat azure-openai like openai for tokenization purposes
-    if prov in {"openai", "azure-openai", "azure"}:
+    if prov in _OPENAI_PROVIDERS:
         tok = _count_tokens_tiktoken(model, text)
         if tok is not None:
             return tok
     # TODO: Optionally add transformers-based tokenizers for Llama-family if needed.
     # Fallback heuristic
-    s = text or ""
-    return max(1, len(s) // 4) if s else 0
+    return _heuristic(text)
+
+
+def count_tokens_batch(provider: str, model: str, texts: Sequence[str]) -> List[int]:
+    """Count tokens for several texts in one call.
+
+    For OpenAI-family providers all texts are encoded by tiktoken's threaded
+    encode_ordinary_batch; otherwise (or if tiktoken is unavailable) the
+    len//4 heuristic is applied to all texts at once, matching count_tokens.
+    """
+    if tiktoken is not None and (provider or "").lower() in _OPENAI_PROVIDERS:
+        try:
+            encoded = _encoding(model).encode_ordinary_batch(
+                [t or "" for t in texts], num_threads=min(8, os.cpu_count() or 1)
+            )
+            return [len(e) for e in encoded]
+        except Exception:
+            pass
+    return estimate_tokens_heuristic(texts)
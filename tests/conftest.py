@@ -0,0 +1,34 @@
+import sys
+import types
+from pathlib import Path
+
+# Ensure the project 'src' directory is importable when running tests without installation
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Lightweight stubs so tests don't require full runtime deps. Installed here,
+# once, before any test module imports src; setdefault keeps real packages
+# when they are installed.
+_yaml_stub = types.ModuleType("yaml")
+# Provide a minimal safe_load returning defaults used by get_supported_extensions
+_yaml_stub.safe_load = lambda _file: {
+    "data": {"supported_extensions": [".pdf", ".docx", ".txt"]}
+}
+sys.modules.setdefault("yaml", _yaml_stub)
+
+
+class _DummyLogger:
+    def info(self, *_, **__):
+        pass
+
+    def warning(self, *_, **__):
+        pass
+
+    def error(self, *_, **__):
+        pass
+
+
+_logger_stub = types.ModuleType("src.utils.logger")
+_logger_stub.GLOBAL_LOGGER = _DummyLogger()
+sys.modules.setdefault("src.utils.logger", _logger_stub)
@@ -1,44 +1,23 @@
+import io
+import json
 import re
-import sys
+import types
 from pathlib import Path
 
 import pytest
 
-# Ensure the project 'src' directory is importable when running tests without installation
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-
-# Lightweight stubs so tests don't require full runtime deps
-import types
-
-if "yaml" not in sys.modules:
-    sys.modules["yaml"] = types.ModuleType("yaml")
-    # Provide a minimal safe_load returning defaults used by get_supported_extensions
-    setattr(
-        sys.modules["yaml"],
-        "safe_load",
-        lambda _file: {"data": {"supported_extensions": [".pdf", ".docx", ".txt"]}},
-    )
-
-if "src.utils.logger" not in sys.modules:
-    logger_stub = types.ModuleType("src.utils.logger")
-
-    class _DummyLogger:
-        def info(self, *_, **__):
-            pass
-
-        def warning(self, *_, **__):
-            pass
-
-        def error(self, *_, **__):
-            pass
-
-    logger_stub.GLOBAL_LOGGER = _DummyLogger()
-    sys.modules["src.utils.logger"] = logger_stub
-
 import src.utils.config_loader as config_loader
+from src.ai.document_analyzer import batch
+from src.ai.parsing.row_stream import ChangeRowStream
 from src.utils import file_io
+from src.utils.ttl_cache import TTLCache, text_key
+
+
+def make_upload(name: str, data: bytes) -> io.BytesIO:
+    """File-like upload fake: BytesIO (read/readinto/getbuffer/seek) with a name."""
+    upload = io.BytesIO(data)
+    upload.name = name
+    return upload
 
 
 def test_supported_extensions_normalization(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -70,16 +49,8 @@ def test_save_uploaded_files_filters_and_writes(
     # Restrict allowed extensions for this test
     monkeypatch.setattr(file_io, "SUPPORTED_EXTENSIONS", {".pdf"}, raising=False)
 
-    class DummyUpload:
-        def __init__(self, name: str, data: bytes):
-            self.name = name
-            self._data = data
-
-        def read(self) -> bytes:
-            return self._data
-
-    ok = DummyUpload("report.pdf", b"hello")
-    skip = DummyUpload("malware.exe", b"nope")
+    ok = make_upload("report.pdf", b"hello")
+    skip = make_upload("malware.exe", b"nope")
 
     saved = file_io.save_uploaded_files([ok, skip], tmp_path)
     assert len(saved) == 1
@@ -124,15 +95,7 @@ def test_save_uploaded_files_skips_unsupported(
 ) -> None:
     monkeypatch.setattr(file_io, "SUPPORTED_EXTENSIONS", {".txt"}, raising=False)
 
-    class DummyUpload:
-        def __init__(self, name: str, data: bytes):
-            self.name = name
-            self._data = data
-
-        def read(self) -> bytes:
-            return self._data
-
-    pdf = DummyUpload("notes.pdf", b"pdf")
+    pdf = make_upload("notes.pdf", b"pdf")
     saved = file_io.save_uploaded_files([pdf], tmp_path)
     assert saved == []
     print("SUCCESS: test_save_uploaded_files_skips_unsupported")
@@ -145,3 +108,345 @@ def test_get_supported_extensions_default_when_missing(
     exts = config_loader.get_supported_extensions()
     assert exts == {".pdf", ".docx", ".txt"}
     print("SUCCESS: test_get_supported_extensions_default_when_missing")
+
+
+def test_ttl_cache_expiry_and_lru(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Entries expire after ttl and the least recently used entry is evicted."""
+    now = [100.0]
+    monkeypatch.setattr("src.utils.ttl_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    now[0] += 11
+    assert cache.get("a") is None
+    assert text_key("q", "h") != text_key("qh")
+    print("SUCCESS: test_ttl_cache_expiry_and_lru")
+
+
+def test_save_upload_dedup_links_identical_content(tmp_path: Path) -> None:
+    """A second upload with the same bytes is hard-linked to the first copy."""
+    first = tmp_path / "s1" / "a.pdf"
+    second = tmp_path / "s2" / "b.pdf"
+    first.parent.mkdir()
+    second.parent.mkdir()
+
+    file_io.save_upload_dedup(io.BytesIO(b"same-bytes"), first, tmp_path)
+    file_io.save_upload_dedup(io.BytesIO(b"same-bytes"), second, tmp_path)
+
+    assert second.read_bytes() == b"same-bytes"
+    assert second.stat().st_ino == first.stat().st_ino
+    assert not list(tmp_path.rglob("*.part"))
+    print("SUCCESS: test_save_upload_dedup_links_identical_content")
+
+
+def test_prune_upload_blobs_keeps_referenced_content(tmp_path: Path) -> None:
+    """Blobs are freed once no saved upload links to them any more."""
+    kept = tmp_path / "s1" / "a.pdf"
+    dropped = tmp_path / "s2" / "b.pdf"
+    kept.parent.mkdir()
+    dropped.parent.mkdir()
+    file_io.save_upload_dedup(io.BytesIO(b"keep"), kept, tmp_path)
+    file_io.save_upload_dedup(io.BytesIO(b"drop"), dropped, tmp_path)
+    assert len(list((tmp_path / ".blobs").iterdir())) == 2
+
+    dropped.unlink()
+    assert file_io.prune_upload_blobs(tmp_path) == 1
+    assert file_io.prune_upload_blobs(tmp_path) == 0
+    assert kept.read_bytes() == b"keep"
+    print("SUCCESS: test_prune_upload_blobs_keeps_referenced_content")
+
+
+def test_load_config_is_cached_until_invalidated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cfg_file = tmp_path / "config.yaml"
+    cfg_file.write_text("data: {}\n", encoding="utf-8")
+    calls = []
+    monkeypatch.setattr(
+        config_loader, "_parse_yaml", lambda f: calls.append(f) or {"data": {}}
+    )
+
+    first = config_loader.load_config(str(cfg_file))
+    assert config_loader.load_config(str(cfg_file)) is first
+    assert len(calls) == 1
+    config_loader.invalidate_config()
+    config_loader.load_config(str(cfg_file))
+    assert len(calls) == 2
+    config_loader.invalidate_config()
+    print("SUCCESS: test_load_config_is_cached_until_invalidated")
+
+
+def test_change_row_stream_chunks_preamble_and_truncation() -> None:
+    """Rows split across chunks parse; preamble '[' is skipped; truncation shows."""
+    text = (
+        'Changes [see below]:\n```json\n[{"Page": "1", "Changes": "a ]"}, '
+        '{"Page": "2", "Changes": "b"}]\n```'
+    )
+    for size in (1, 7, len(text)):
+        parser = ChangeRowStream()
+        rows = []
+        for i in range(0, len(text), size):
+            rows.extend(parser.feed(text[i : i + size]))
+        assert parser.done
+        assert rows == [
+            {"Page": "1", "Changes": "a ]"},
+            {"Page": "2", "Changes": "b"},
+        ]
+
+    truncated = ChangeRowStream()
+    partial = truncated.feed('[{"Page": "1", "Changes": "a"}, {"Page": "2", "Cha')
+    assert partial == [{"Page": "1", "Changes": "a"}]
+    assert not truncated.done
+
+    with pytest.raises(ValueError):
+        ChangeRowStream().feed('[{"Page": 1}]')
+    print("SUCCESS: test_change_row_stream_chunks_preamble_and_truncation")
+
+
+class _FakeBatchClient:
+    """In-memory stand-in for the OpenAI files/batches API used by submit_batch."""
+
+    def __init__(self, final_status: str, output_lines: list[str]) -> None:
+        self.uploaded = b""
+        self.cancelled = False
+        self._statuses = ["validating", "in_progress", final_status]
+        self._output = "\n".join(output_lines)
+        client = self
+
+        class _Files:
+            def create(self, file, purpose):
+                client.uploaded = file[1].read()
+                return types.SimpleNamespace(id="file-in")
+
+            def content(self, file_id):
+                assert file_id == "file-out"
+                return types.SimpleNamespace(text=client._output)
+
+        class _Batches:
+            def create(self, **_):
+                return client._batch()
+
+            def retrieve(self, batch_id):
+                return client._batch()
+
+            def cancel(self, batch_id):
+                client.cancelled = True
+
+        self.files = _Files()
+        self.batches = _Batches()
+
+    def _batch(self):
+        status = self._statuses.pop(0) if len(self._statuses) > 1 else self._statuses[0]
+        return types.SimpleNamespace(
+            id="batch-1",
+            status=status,
+            output_file_id="file-out" if status == "completed" else None,
+        )
+
+
+def _batch_line(custom_id: str, content: str) -> str:
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {"body": {"choices": [{"message": {"content": content}}]}},
+        }
+    )
+
+
+def test_submit_batch_maps_results_by_custom_id(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Results come back in request order; unanswered items are None."""
+    fake = _FakeBatchClient("completed", [_batch_line("2", "c"), _batch_line("0", "a")])
+    monkeypatch.setattr(batch, "_client", lambda provider: fake)
+    msgs = [[{"role": "user", "content": str(i)}] for i in range(3)]
+
+    out = batch.submit_batch(msgs, "gpt-4o-mini", "openai", poll_interval=0)
+
+    assert out == ["a", None, "c"]
+    sent = [json.loads(line) for line in fake.uploaded.decode().splitlines()]
+    assert [r["custom_id"] for r in sent] == ["0", "1", "2"]
+    assert sent[0]["body"]["model"] == "gpt-4o-mini"
+    print("SUCCESS: test_submit_batch_maps_results_by_custom_id")
+
+
+def test_submit_batch_failure_and_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failed job raises RuntimeError; an unfinished one is cancelled."""
+    msgs = [[{"role": "user", "content": "x"}]]
+    monkeypatch.setattr(batch, "_client", lambda p: _FakeBatchClient("failed", []))
+    with pytest.raises(RuntimeError):
+        batch.submit_batch(msgs, "m", "openai", poll_interval=0)
+
+    stuck = _FakeBatchClient("in_progress", [])
+    monkeypatch.setattr(batch, "_client", lambda p: stuck)
+    with pytest.raises(TimeoutError):
+        batch.submit_batch(msgs, "m", "openai", poll_interval=0, timeout=0)
+    assert stuck.cancelled
+    assert batch.supports_batch("Groq") and not batch.supports_batch("google")
+    print("SUCCESS: test_submit_batch_failure_and_timeout")
+
+
+class _FakeEmbeddings:
+    """Maps each question to a fixed vector."""
+
+    def __init__(self, vectors: dict) -> None:
+        self.vectors = vectors
+
+    def embed_query(self, text: str) -> list:
+        return self.vectors[text]
+
+
+def _semantic_rag(monkeypatch: pytest.MonkeyPatch, threshold: float):
+    """ConversationalRAG with only the semantic-cache state set (no LLM)."""
+    pytest.importorskip("numpy")
+    retrieval = pytest.importorskip("src.ai.document_chat.retrieval")
+    monkeypatch.setattr(retrieval, "_SEMANTIC_ANSWERS", TTLCache(ttl=60, maxsize=8))
+    rag = object.__new__(retrieval.ConversationalRAG)
+    rag.session_id = "s1"
+    rag.model_name = "m"
+    rag._index_key = ("faiss_index/s1", "index")
+    rag._semantic_threshold = threshold
+    return retrieval, rag
+
+
+def test_semantic_cache_off_by_default_and_for_follow_ups(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Threshold 0 disables the tier; questions with history never use it."""
+    _, rag = _semantic_rag(monkeypatch, 0.0)
+    assert rag._semantic_key({"input": "q", "chat_history": []}) is None
+
+    rag._semantic_threshold = 0.9
+    assert rag._semantic_key({"input": "q", "chat_history": []}) is not None
+    assert rag._semantic_key({"input": "q", "chat_history": ["earlier"]}) is None
+    print("SUCCESS: test_semantic_cache_off_by_default_and_for_follow_ups")
+
+
+def test_semantic_lookup_and_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A close paraphrase reuses the answer; a distant question does not."""
+    retrieval, rag = _semantic_rag(monkeypatch, 0.9)
+    emb = _FakeEmbeddings(
+        {
+            "what is the fee?": [1.0, 0.0, 0.0],
+            "what's the fee?": [0.99, 0.1, 0.0],
+            "who signed it?": [0.0, 1.0, 0.0],
+        }
+    )
+    monkeypatch.setattr(retrieval, "get_embeddings", lambda: emb)
+    skey = rag._semantic_key({"input": "what is the fee?", "chat_history": []})
+
+    answer, vec = rag._semantic_lookup(skey, "what is the fee?")
+    assert answer is None and abs(float(vec @ vec) - 1.0) < 1e-6
+    rag._semantic_store(skey, vec, "$10")
+
+    assert rag._semantic_lookup(skey, "what's the fee?")[0] == "$10"
+    assert rag._semantic_lookup(skey, "who signed it?")[0] is None
+
+    # Newest first, capped per session
+    for i in range(retrieval._SEMANTIC_PER_SESSION + 1):
+        rag._semantic_store(skey, vec, str(i))
+    entries = retrieval._SEMANTIC_ANSWERS.get(skey)
+    assert len(entries) == retrieval._SEMANTIC_PER_SESSION
+    assert entries[0][1] == str(retrieval._SEMANTIC_PER_SESSION)
+    print("SUCCESS: test_semantic_lookup_and_store")
+
+
+def test_semantic_lookup_skips_when_embedding_fails(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An embedding error degrades to a cache miss instead of failing."""
+    retrieval, rag = _semantic_rag(monkeypatch, 0.9)
+
+    def boom():
+        raise RuntimeError("embeddings unavailable")
+
+    monkeypatch.setattr(retrieval, "get_embeddings", boom)
+    assert rag._semantic_lookup(("s1",), "q") == (None, None)
+    print("SUCCESS: test_semantic_lookup_skips_when_embedding_fails")
+
+
+class _FakeTextChain:
+    """Streams fixed text chunks; counts generations."""
+
+    def __init__(self, chunks: list) -> None:
+        self.chunks = chunks
+        self.calls = 0
+
+    def stream(self, inputs: dict, config=None):
+        self.calls += 1
+        yield from self.chunks
+
+
+def _comparator(chunks: list):
+    mod = pytest.importorskip("src.ai.document_compare.document_comparator")
+    comp = object.__new__(mod.DocumentComparatorLLM)
+    comp._format_instructions = "fmt"
+    comp._text_chain = _FakeTextChain(chunks)
+    comp.repaired = []
+
+    def parse_text(text: str, inputs: dict, config=None):
+        comp.repaired.append(text)
+        return [{"Page": "1", "Changes": "fixed"}]
+
+    comp._parse_text = parse_text
+    return comp
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ['[{"Page": "1", "Changes": "a"}', ", "],  # ends before the list closes
+        ['[{"Page": 1, ', '"Changes": "a"}', ", more text]"],  # invalid row
+    ],
+)
+def test_comparison_repairs_received_text_without_regenerating(chunks: list) -> None:
+    """Bad comparison output is repaired from the full received text."""
+    comp = _comparator(chunks)
+    raw_parts: list = []
+
+    rows = comp._collect_rows("docs", None, raw_parts)
+
+    assert rows == [{"Page": "1", "Changes": "fixed"}]
+    assert comp.repaired == ["".join(chunks)] and raw_parts == chunks
+    assert comp._text_chain.calls == 1
+    assert list(_comparator(chunks).stream_rows("docs")) != []
+    print("SUCCESS: test_comparison_repairs_received_text_without_regenerating")
+
+
+def test_format_response_handles_mixed_type_rows() -> None:
+    """Rows Arrow cannot type (list vs str) still become a DataFrame."""
+    pytest.importorskip("pyarrow")
+    comp = _comparator([])
+    rows = [{"Page": "1", "Changes": ["a", "b"]}, {"Page": "2", "Changes": "c"}]
+
+    df = comp._format_response(rows)
+
+    assert list(df["Page"]) == ["1", "2"]
+    assert list(df["Changes"]) == [["a", "b"], "c"]
+    print("SUCCESS: test_format_response_handles_mixed_type_rows")
+
+
+def test_faiss_manager_matches_legacy_sha256_fingerprints() -> None:
+    """Chunks recorded under pre-blake2b keys are not embedded again."""
+    mod = pytest.importorskip("src.ai.document_ingestion.data_ingestion")
+    fm = object.__new__(mod.FaissManager)
+    old_doc = types.SimpleNamespace(page_content="old", metadata={"source": "a.pdf"})
+    new_doc = types.SimpleNamespace(page_content="new", metadata={"source": "a.pdf"})
+    legacy = fm._legacy_fingerprint("old", old_doc.metadata)
+    fm._meta = {"rows": {legacy}}
+    added: list = []
+    fm.vs = types.SimpleNamespace(
+        add_embeddings=lambda pairs, metadatas: added.extend(p[0] for p in pairs)
+    )
+    fm.emb = types.SimpleNamespace(embed_documents=lambda b: [[0.0] for _ in b])
+    fm.embed_batch_size, fm.embed_concurrency = 8, 1
+    fm._dirty, fm._save_every = 0, 100
+
+    assert fm.add_documents([old_doc, new_doc]) == 1
+    assert added == ["new"]
+    assert fm._fingerprint("old", old_doc.metadata) in fm._meta["rows"]
+    print("SUCCESS: test_faiss_manager_matches_legacy_sha256_fingerprints")